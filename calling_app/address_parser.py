@@ -0,0 +1,193 @@
+"""
+Розбір юридичних адрес на область/район і побудова довідника (газетира)
+область -> райони з частотами.
+
+Адреси читаються порціями з будь-якого аліасу БД, порції розбираються
+в пулі процесів, результати агрегуються. Модуль не імпортує моделі на рівні
+модуля, тож його можна використовувати в дочірніх процесах без django.setup().
+"""
+import json
+import os
+import re
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+REGION_PATTERN = re.compile(r"(\w+)\s*обл")
+DISTRICT_PATTERN = re.compile(r"(\w+)\s*р-н")
+
+# Категорії результату розбору
+PARSED = "parsed"
+EMPTY = "empty"
+NO_REGION = "no_region"
+NO_DISTRICT = "no_district"
+NO_REGION_DISTRICT = "no_region_district"
+
+CATEGORY_LABELS = {
+    PARSED: "Розпізнано",
+    EMPTY: "Порожня адреса",
+    NO_REGION: "Немає області",
+    NO_DISTRICT: "Немає району",
+    NO_REGION_DISTRICT: "Немає ні області, ні району",
+}
+
+_SAMPLES_PER_CATEGORY = 3
+
+# (область, район) -> кількість; категорія -> кількість; категорія -> приклади адрес
+ChunkResult = Tuple[Counter, Counter, Dict[str, List[str]]]
+
+
+def parse_address(address: Optional[str]) -> Tuple[Optional[str], Optional[str], str]:
+    """
+    Повертає (область, район, категорія) для однієї адреси.
+    """
+    if not address or not address.strip():
+        return None, None, EMPTY
+
+    region_match = REGION_PATTERN.search(address)
+    district_match = DISTRICT_PATTERN.search(address)
+    region = region_match.group(1) if region_match else None
+    district = district_match.group(1) if district_match else None
+
+    if region and district:
+        return region, district, PARSED
+    if district:
+        return None, district, NO_REGION
+    if region:
+        return region, None, NO_DISTRICT
+    return None, None, NO_REGION_DISTRICT
+
+
+def parse_chunk(addresses: List[Optional[str]]) -> ChunkResult:
+    """
+    Розбирає порцію адрес. Виконується в дочірньому процесі, тому повертає
+    лише компактні лічильники, а не розібрані рядки.
+    """
+    pairs: Counter = Counter()
+    categories: Counter = Counter()
+    samples: Dict[str, List[str]] = defaultdict(list)
+    for address in addresses:
+        region, district, category = parse_address(address)
+        categories[category] += 1
+        if category == PARSED:
+            pairs[(region, district)] += 1
+        elif category != EMPTY and len(samples[category]) < _SAMPLES_PER_CATEGORY:
+            samples[category].append(address)
+    return pairs, categories, dict(samples)
+
+
+def build_gazetteer(
+    chunks: Iterable[List[Optional[str]]], workers: Optional[int] = None
+) -> Tuple[Dict[str, Counter], Counter, Dict[str, List[str]]]:
+    """
+    Агрегує результати розбору порцій у словник область -> Counter(район -> частота).
+
+    :param chunks: ітератор порцій адрес
+    :param workers: кількість процесів (1 — без пулу, у поточному процесі)
+    :return: (газетир, лічильник категорій, приклади нерозпізнаних адрес)
+    """
+    gazetteer: Dict[str, Counter] = defaultdict(Counter)
+    categories: Counter = Counter()
+    samples: Dict[str, List[str]] = defaultdict(list)
+
+    def merge(result: ChunkResult) -> None:
+        pairs, chunk_categories, chunk_samples = result
+        for (region, district), count in pairs.items():
+            gazetteer[region][district] += count
+        categories.update(chunk_categories)
+        for category, items in chunk_samples.items():
+            free = _SAMPLES_PER_CATEGORY - len(samples[category])
+            samples[category].extend(items[:max(0, free)])
+
+    if workers == 1:
+        for chunk in chunks:
+            merge(parse_chunk(chunk))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # обмежене вікно задач, щоб не вичитати всю таблицю наперед
+            window = (workers or os.cpu_count() or 1) * 2
+            pending = []
+            for chunk in chunks:
+                pending.append(pool.submit(parse_chunk, chunk))
+                if len(pending) >= window:
+                    merge(pending.pop(0).result())
+            for future in pending:
+                merge(future.result())
+
+    return dict(gazetteer), categories, dict(samples)
+
+
+def iter_alias_addresses(
+    alias: str = "default", table: Optional[str] = None, column: Optional[str] = None, chunk_size: int = 5000
+) -> Iterator[List[Optional[str]]]:
+    """
+    Потоково читає адреси з аліасу БД порціями.
+    Без table/column читає Company.legal_address, інакше — довільну таблицю
+    (наприклад, стару таблицю companies.address).
+    """
+    from django.db import connections
+
+    if table is None:
+        from .models import Company
+
+        qs = Company.objects.using(alias).values_list("legal_address", flat=True)
+        chunk: List[Optional[str]] = []
+        for address in qs.iterator(chunk_size=chunk_size):
+            chunk.append(address)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+        return
+
+    connection = connections[alias]
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT {qn(column or 'address')} FROM {qn(table)}")
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield [row[0] for row in rows]
+
+
+def write_gazetteer(
+    gazetteer: Dict[str, Counter], path: str, counts_path: Optional[str] = None, min_count: int = 1
+) -> int:
+    """
+    Зберігає газетир у форматі, який читає scripts/region_add.py:
+    {"Область": ["Район", ...]}. Райони, що трапились рідше за min_count, відкидаються.
+    Частоти за бажанням зберігаються окремим файлом. Повертає кількість районів.
+    """
+    result = {}
+    for region in sorted(gazetteer):
+        districts = sorted(d for d, count in gazetteer[region].items() if count >= min_count)
+        if districts:
+            result[region] = districts
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=4)
+
+    if counts_path:
+        counts = {region: dict(gazetteer[region].most_common()) for region in sorted(gazetteer)}
+        with open(counts_path, "w", encoding="utf-8") as f:
+            json.dump(counts, f, ensure_ascii=False, indent=4)
+
+    return sum(len(districts) for districts in result.values())
+
+
+def format_report(categories: Counter, samples: Dict[str, List[str]]) -> List[str]:
+    """
+    Зведений звіт по категоріях замість друку кожної нерозпізнаної адреси.
+    """
+    total = sum(categories.values()) or 1
+    lines = []
+    for category, label in CATEGORY_LABELS.items():
+        count = categories.get(category, 0)
+        if not count:
+            continue
+        lines.append(f"{label}: {count} ({count * 100 / total:.1f}%)")
+        for address in samples.get(category, []):
+            lines.append(f"    напр.: {address}")
+    return lines
@@ -1,3 +1,262 @@
-from django.contrib import admin
+"""
+Адмінка для всіх моделей calling_app, розрахована на таблиці у сотні тисяч рядків.
 
-# Register your models here.
+- list_select_related — FK у списку підтягуються одним JOIN, без N+1;
+- autocomplete_fields для Company/Phone/ContactPerson/Holding/Call — AJAX-пошук
+  замість <select> на всю таблицю;
+- search_fields лише по індексованих полях: "=" (точний збіг) і "^" (префікс,
+  LIKE 'x%' використовує індекс), без '%x%' по всій таблиці;
+- show_full_result_count = False — без другого COUNT(*) "з N усього";
+- EstimatedCountPaginator для великих таблиць — кількість рядків без фільтра
+  береться зі статистики БД замість COUNT(*);
+- масові дії — один UPDATE на вибірку (журнал змін і updated_at компаній
+  пишуться так само set-based).
+"""
+from typing import Optional
+
+from django.contrib import admin, messages
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+from . import changelog
+from .bulk_actions import apply_bulk_action
+from .merge import merge_companies
+from .models import (
+    Call, CallPlan, ChangeLogEntry, ChangeLogSequence, Company, CompanyEmail, CompanyNameBand, CompanyStatus, ContactPerson, Crop,
+    District, Holding, Phone, Region, StockItem, Warehouse,
+)
+from .utils import ESTIMATE_MIN_ROWS, estimated_rows, touch_companies
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Без фільтрів і пошуку — кількість рядків зі статистики БД (якщо таблиця велика),
+    з фільтрами — звичайний COUNT(*) по відібраних рядках.
+    """
+
+    @cached_property
+    def count(self) -> int:
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and not queryset.query.where:
+            estimate = estimated_rows(queryset.model, queryset.db)
+            if estimate is not None and estimate >= ESTIMATE_MIN_ROWS:
+                return estimate
+        return super().count
+
+
+class TunedAdmin(admin.ModelAdmin):
+    show_full_result_count = False
+    list_per_page = 50
+
+
+def bulk_update(queryset: QuerySet, company_ids: Optional[QuerySet] = None, **values) -> int:
+    """
+    Один UPDATE вибірки адмінки. update() не надсилає сигналів, тож журнал змін
+    (до UPDATE — фільтр вибірки може залежати від полів, що змінюються) і
+    updated_at пов'язаних компаній пишуться тут.
+    """
+    with transaction.atomic():
+        changelog.record_queryset(queryset, "update", values)
+        if company_ids is not None:
+            touch_companies(Company.objects.filter(pk__in=company_ids))
+        return queryset.update(**values)
+
+
+# -----------------------
+# Довідники
+# -----------------------
+@admin.register(Holding)
+class HoldingAdmin(TunedAdmin):
+    list_display = ("name",)
+    search_fields = ("^name",)
+
+
+@admin.register(Region)
+class RegionAdmin(TunedAdmin):
+    list_display = ("region",)
+    search_fields = ("^region",)
+
+
+@admin.register(District)
+class DistrictAdmin(TunedAdmin):
+    list_display = ("district", "region")
+    list_select_related = ("region",)
+    list_filter = ("region",)
+    search_fields = ("^district",)
+
+
+@admin.register(CompanyStatus)
+class CompanyStatusAdmin(TunedAdmin):
+    list_display = ("status_name",)
+
+
+@admin.register(Crop)
+class CropAdmin(TunedAdmin):
+    list_display = ("name",)
+    search_fields = ("^name",)
+
+
+# -----------------------
+# Компанії та контакти
+# -----------------------
+@admin.register(Company)
+class CompanyAdmin(TunedAdmin):
+    list_display = ("edrpou", "name", "hectares", "holding", "status", "region")
+    list_select_related = ("holding", "status", "region")
+    list_filter = ("status", "region")
+    search_fields = ("=edrpou", "^name")
+    autocomplete_fields = ("holding", "region", "district")
+    readonly_fields = ("updated_at",)
+    paginator = EstimatedCountPaginator
+    actions = ["merge_selected", "detach_from_holding"]
+
+    @admin.action(description="Злити вибрані компанії (основна — найстаріша)")
+    def merge_selected(self, request, queryset):
+        ids = list(queryset.order_by("id").values_list("id", flat=True))
+        if len(ids) < 2:
+            self.message_user(request, "Виберіть щонайменше дві компанії", level=messages.WARNING)
+            return
+        keep = merge_companies(ids[0], ids[1:])
+        self.message_user(request, f"До {keep.edrpou} злито компаній: {len(ids) - 1}", level=messages.SUCCESS)
+
+    @admin.action(description="Вилучити вибрані компанії з холдингу")
+    def detach_from_holding(self, request, queryset):
+        count = apply_bulk_action("holding", queryset, {"holding": None})
+        self.message_user(request, f"Вилучено з холдингу компаній: {count}", level=messages.SUCCESS)
+
+
+@admin.register(CompanyNameBand)
+class CompanyNameBandAdmin(TunedAdmin):
+    """Похідний LSH-індекс назв (build_name_index) — лише перегляд."""
+    list_display = ("company", "band", "hash")
+    list_select_related = ("company",)
+    search_fields = ("=company__edrpou",)
+    paginator = EstimatedCountPaginator
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(CompanyEmail)
+class CompanyEmailAdmin(TunedAdmin):
+    list_display = ("email",)
+    search_fields = ("^email",)
+    autocomplete_fields = ("companies",)
+
+
+@admin.register(ContactPerson)
+class ContactPersonAdmin(TunedAdmin):
+    list_display = ("full_name", "position")
+    search_fields = ("^full_name",)
+    autocomplete_fields = ("companies",)
+    paginator = EstimatedCountPaginator
+
+
+@admin.register(Phone)
+class PhoneAdmin(TunedAdmin):
+    list_display = ("number", "status", "contact")
+    list_select_related = ("contact",)
+    list_filter = ("status",)
+    search_fields = ("^number",)
+    autocomplete_fields = ("contact", "companies")
+    paginator = EstimatedCountPaginator
+    actions = ["mark_active", "mark_inactive"]
+
+    def _set_status(self, request, queryset, status: str):
+        count = bulk_update(queryset, company_ids=Phone.companies.through.objects.filter(
+            phone_id__in=queryset.values("pk")).values("company_id"), status=status)
+        self.message_user(request, f"Змінено телефонів: {count}", level=messages.SUCCESS)
+
+    @admin.action(description="Позначити телефони активними")
+    def mark_active(self, request, queryset):
+        self._set_status(request, queryset, "on")
+
+    @admin.action(description="Позначити телефони неактивними")
+    def mark_inactive(self, request, queryset):
+        self._set_status(request, queryset, "off")
+
+
+# -----------------------
+# Дзвінки
+# -----------------------
+@admin.register(Call)
+class CallAdmin(TunedAdmin):
+    list_display = ("datetime", "phone", "duration_seconds")
+    list_select_related = ("phone",)
+    search_fields = ("=phone__number",)
+    autocomplete_fields = ("phone", "company")
+    ordering = ("-pk",)
+    paginator = EstimatedCountPaginator
+
+
+@admin.register(CallPlan)
+class CallPlanAdmin(TunedAdmin):
+    list_display = ("planned_datetime", "company", "phone", "status")
+    list_select_related = ("company", "phone")
+    list_filter = ("status",)
+    search_fields = ("=company__edrpou", "=phone__number")
+    autocomplete_fields = ("company", "phone", "call")
+    ordering = ("-pk",)
+    paginator = EstimatedCountPaginator
+    actions = ["deactivate"]
+
+    @admin.action(description="Деактивувати вибрані плани")
+    def deactivate(self, request, queryset):
+        count = bulk_update(queryset, company_ids=queryset.values("company_id"), status="off")
+        self.message_user(request, f"Деактивовано планів: {count}", level=messages.SUCCESS)
+
+
+# -----------------------
+# Склади
+# -----------------------
+@admin.register(Warehouse)
+class WarehouseAdmin(TunedAdmin):
+    list_display = ("name", "capacity_tons", "transport_type", "region")
+    list_select_related = ("region",)
+    list_filter = ("transport_type", "region")
+    search_fields = ("^name",)
+    autocomplete_fields = ("owners", "clients", "region", "district")
+
+
+@admin.register(StockItem)
+class StockItemAdmin(TunedAdmin):
+    list_display = ("company", "crop", "quantity")
+    list_select_related = ("company", "crop")
+    list_filter = ("crop",)
+    search_fields = ("=company__edrpou",)
+    autocomplete_fields = ("company",)
+    paginator = EstimatedCountPaginator
+
+
+# -----------------------
+# Журнал змін
+# -----------------------
+class ReadOnlyAdmin(TunedAdmin):
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ChangeLogEntry)
+class ChangeLogEntryAdmin(ReadOnlyAdmin):
+    """Журнал лише для читання: споживачі синхронізуються за номерами записів."""
+    list_display = ("seq", "model", "object_id", "action", "changed_at")
+    list_filter = ("model", "action")
+    search_fields = ("=object_id",)
+    ordering = ("-pk",)
+    paginator = EstimatedCountPaginator
+
+
+@admin.register(ChangeLogSequence)
+class ChangeLogSequenceAdmin(ReadOnlyAdmin):
+    """Лічильник seq журналу (changelog.sequence_committed)."""
+    list_display = ("last_seq",)
@@ -1,6 +1,30 @@
+import os
+import sys
+
 from django.apps import AppConfig
 
 
+def serves_requests() -> bool:
+    """
+    Чи обслуговує процес HTTP-запити (WSGI/ASGI-сервер або runserver), а не
+    management-команду (migrate, test, import_companies, ...) чи pytest.
+    """
+    program = os.path.basename(sys.argv[0]) if sys.argv else ""
+    if program in ("manage.py", "django-admin", "__main__.py"):
+        if sys.argv[1:2] != ["runserver"]:
+            return False
+        # з автоперезавантаженням запити обслуговує дочірній процес (RUN_MAIN)
+        return os.environ.get("RUN_MAIN") == "true" or "--noreload" in sys.argv
+    return "pytest" not in program and "py.test" not in program
+
+
 class CallingAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'calling_app'
+
+    def ready(self):
+        from . import signals, sqlite_profile  # noqa: F401
+        from .prefix_index import warm_company_index
+
+        if serves_requests():
+            warm_company_index()
@@ -0,0 +1,254 @@
+"""
+Бенчмарки гарячих шляхів на згенерованому наборі даних (див. dataset.py).
+
+Кожен випадок виконується warmup + repeat разів; звіт містить перцентилі
+затримки (p50/p95/p99), кількість SQL-запитів за один прогін і пік пам'яті
+Python (tracemalloc, окремий прогін — щоб трасування не спотворювало час).
+Результати зберігаються в JSON і порівнюються з попереднім baseline.
+
+Випадки:
+- search:*          search_in_queryset vs quick_search_companies для різних запитів;
+- list:*            get_filtered_sorted_companies_context для кожного стовпця сортування
+                    (холодний кеш списку);
+- company_page:*    сторінка компаній з найбільшою кількістю телефонів;
+- company_links:*   show_all_company_links для компаній у холдингах;
+- import:*          import_companies з CSV (у транзакції, що відкочується).
+"""
+import csv
+import math
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from django.contrib.auth.models import AnonymousUser
+from django.db import transaction
+from django.db.models import Count
+from django.test import RequestFactory
+
+from . import utils
+from .dataset import company_name, legal_address, phone_number
+from .middleware import QueryCounter, record_queries
+from .models import Company
+
+SEARCH_QUERIES = {
+    "edrpou_prefix": "0001",
+    "word": "агро",
+    "surname": "Шевченко",
+    "phone": "+38067",
+    "address": "вул. Садова",
+    "no_match": "жжжжж",
+}
+IMPORT_ROWS = 2000
+PAGE_COMPANIES = 3
+
+# відносне сповільнення p50, що вважається регресією (і мінімальне в мс — щоб не реагувати на шум)
+DEFAULT_THRESHOLD = 0.2
+MIN_DELTA_MS = 1.0
+
+
+class Case(NamedTuple):
+    name: str
+    run: Callable[[], object]
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Перцентиль за найближчим рангом."""
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1))]
+
+
+def measure(case: Case, repeat: int = 10, warmup: int = 1) -> Dict[str, float]:
+    for _ in range(warmup):
+        case.run()
+
+    timings = []
+    counter = QueryCounter()
+    with record_queries(counter):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            case.run()
+            timings.append((time.perf_counter() - start) * 1000)
+
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    case.run()
+    peak = tracemalloc.get_traced_memory()[1]
+    if not tracing:
+        tracemalloc.stop()
+
+    return {
+        "runs": repeat,
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p95_ms": round(percentile(timings, 95), 3),
+        "p99_ms": round(percentile(timings, 99), 3),
+        "mean_ms": round(sum(timings) / len(timings), 3),
+        "queries": round(counter.count / repeat, 1),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+# -----------------------
+# Випадки
+# -----------------------
+def _request(path: str = "/", **params):
+    request = RequestFactory().get(path, params)
+    request.user = AnonymousUser()
+    return request
+
+
+def _evaluate_search(qs) -> None:
+    qs.count()
+    list(qs[:20])
+
+
+def search_cases() -> List[Case]:
+    cases = []
+    for shape, query in SEARCH_QUERIES.items():
+        cases.append(Case(f"search:full:{shape}", lambda q=query: _evaluate_search(
+            utils.search_in_queryset(Company.objects.all(), q))))
+        cases.append(Case(f"search:quick:{shape}", lambda q=query: _evaluate_search(
+            utils.quick_search_companies(Company.objects.all(), q))))
+    return cases
+
+
+def list_cases() -> List[Case]:
+    from .views_utils import _company_headers, get_filtered_sorted_companies_context
+
+    def run(sort: str) -> None:
+        utils.SearchHash = {}   # холодний кеш списку — інакше міряється лише сортування в пам'яті
+        get_filtered_sorted_companies_context(_request("/companies/", sort=sort))
+
+    return [Case(f"list:{sort}", lambda s=sort: run(s)) for sort in _company_headers]
+
+
+def company_page_cases(count: int = PAGE_COMPANIES) -> List[Case]:
+    from .views import company_page
+
+    edrpous = (
+        Company.objects.annotate(phone_count=Count("phones"))
+        .order_by("-phone_count", "pk").values_list("edrpou", flat=True)[:count]
+    )
+    return [
+        Case(f"company_page:{i}", lambda e=edrpou: company_page(_request(f"/company/{e}/"), e))
+        for i, edrpou in enumerate(edrpous)
+    ]
+
+
+def company_links_cases(count: int = PAGE_COMPANIES) -> List[Case]:
+    from .views import show_all_company_links
+
+    edrpous = (
+        Company.objects.filter(holding__isnull=False)
+        .annotate(phone_count=Count("phones"))
+        .order_by("-phone_count", "pk").values_list("edrpou", flat=True)[:count]
+    )
+    return [
+        Case(f"company_links:{i}", lambda e=edrpou: show_all_company_links(_request(f"/company/{e}/links/"), e))
+        for i, edrpou in enumerate(edrpous)
+    ]
+
+
+def write_import_file(path: str, rows: int, seed: int = 1) -> None:
+    """CSV у форматі реєстрової вибірки з ЄДРПОУ/телефонами поза діапазоном генератора."""
+    import random
+
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["ЄДРПОУ", "Назва", "Юридична адреса", "Площа", "Телефон", "ПІБ", "Посада"])
+        for i in range(rows):
+            writer.writerow([
+                f"{99_000_000 + i}",
+                company_name(rng),
+                legal_address(rng, "Київська", "Бучанський"),
+                rng.randrange(10, 5000),
+                phone_number(110_000_000 + i),
+                "Петренко Іван Петрович",
+                "Директор",
+            ])
+
+
+def import_cases(rows: int = IMPORT_ROWS) -> List[Case]:
+    from .importers import import_companies
+
+    directory = tempfile.mkdtemp(prefix="calling_bench_")
+    path = os.path.join(directory, "import.csv")
+    write_import_file(path, rows)
+
+    def run() -> None:
+        # дані імпорту не лишаються в базі: прогони порівнювані між собою
+        with transaction.atomic():
+            import_companies(path, chunk_size=1000)
+            transaction.set_rollback(True)
+
+    return [Case(f"import:csv_{rows}", run)]
+
+
+SUITES = {
+    "search": search_cases,
+    "list": list_cases,
+    "company_page": company_page_cases,
+    "company_links": company_links_cases,
+    "import": import_cases,
+}
+
+
+def run_suite(
+    suites: Optional[Iterable[str]] = None,
+    repeat: int = 10,
+    warmup: int = 1,
+    progress: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for suite in suites or SUITES:
+        for case in SUITES[suite]():
+            results[case.name] = measure(case, repeat=repeat, warmup=warmup)
+            if progress:
+                progress(format_result(case.name, results[case.name]))
+    return results
+
+
+# -----------------------
+# Порівняння з baseline
+# -----------------------
+def compare(
+    results: Dict[str, dict], baseline: Dict[str, dict], threshold: float = DEFAULT_THRESHOLD
+) -> List[dict]:
+    """
+    Рядки порівняння для спільних випадків. regression=True, якщо p50
+    зріс більше ніж на threshold (і на MIN_DELTA_MS) або зросла кількість запитів.
+    """
+    rows = []
+    for name in sorted(results.keys() & baseline.keys()):
+        new, old = results[name], baseline[name]
+        ratio = new["p50_ms"] / old["p50_ms"] if old["p50_ms"] else 1.0
+        slower = ratio > 1 + threshold and new["p50_ms"] - old["p50_ms"] > MIN_DELTA_MS
+        rows.append({
+            "name": name,
+            "old_p50_ms": old["p50_ms"],
+            "new_p50_ms": new["p50_ms"],
+            "ratio": round(ratio, 2),
+            "old_queries": old["queries"],
+            "new_queries": new["queries"],
+            "regression": slower or new["queries"] > old["queries"],
+        })
+    return rows
+
+
+def format_result(name: str, result: Dict[str, float]) -> str:
+    return (
+        f"{name:<32} p50 {result['p50_ms']:>9.2f} мс  p95 {result['p95_ms']:>9.2f}  p99 {result['p99_ms']:>9.2f}  "
+        f"SQL {result['queries']:>6}  пам'ять {result['peak_kb']:>9.1f} КБ"
+    )
+
+
+def format_comparison(row: dict) -> str:
+    mark = "РЕГРЕСІЯ" if row["regression"] else ("краще" if row["ratio"] < 1 else "")
+    return (
+        f"{row['name']:<32} {row['old_p50_ms']:>9.2f} → {row['new_p50_ms']:>9.2f} мс (×{row['ratio']})  "
+        f"SQL {row['old_queries']} → {row['new_queries']}  {mark}"
+    )
@@ -0,0 +1,130 @@
+"""
+Масові дії над компаніями зі списку: холдинг, статус, область/район, планові дзвінки.
+
+Кожна дія — set-based UPDATE (або bulk_create для планів) над вибраними id
+чи над усіма компаніями, що відповідають поточному фільтру списку. Id цільових
+компаній спершу вичитуються одним SELECT, і UPDATE іде порціями по списку id:
+MySQL не дозволяє в UPDATE підзапит до тієї ж таблиці (помилка 1093).
+update()/bulk_create() не надсилають сигналів, тому кеш списку компаній
+скидається, Company.updated_at оновлюється (у тому ж UPDATE), а журнал змін
+пишеться одним INSERT ... SELECT (changelog.record_queryset).
+"""
+from typing import Iterable, List, Optional
+
+from django.db import connection, transaction
+from django.db.models import Case, F, Max, QuerySet, When
+
+from . import changelog, ref_cache
+from .models import CallPlan, Company
+from django.utils import timezone
+
+from .utils import invalidate_companies_cache, touch_companies
+
+PLAN_BATCH_SIZE = 2000
+UPDATE_BATCH_SIZE = 2000   # id в одному UPDATE ... WHERE id IN (...)
+
+
+def set_holding(companies: QuerySet, holding_id: Optional[int]) -> int:
+    return companies.update(holding_id=holding_id, updated_at=timezone.now())
+
+
+def set_status(companies: QuerySet, status_id: Optional[int]) -> int:
+    return companies.update(status_id=status_id, updated_at=timezone.now())
+
+
+def set_region(companies: QuerySet, region_id: Optional[int], district_id: Optional[int] = None) -> int:
+    """
+    З районом область береться з району. Лише з областю райони, що не належать
+    новій області, очищаються (в тому ж UPDATE).
+    """
+    if district_id:
+        district = ref_cache.district(district_id)
+        return companies.update(region_id=district.region_id, district_id=district.pk, updated_at=timezone.now())
+    if not region_id:
+        return companies.update(region_id=None, district_id=None, updated_at=timezone.now())
+    own_districts = [d.pk for d in ref_cache.districts(region_id)]
+    return companies.update(
+        region_id=region_id,
+        district_id=Case(When(district_id__in=own_districts, then=F("district_id")), default=None),
+        updated_at=timezone.now(),
+    )
+
+
+def _iter_ids(companies: QuerySet) -> Iterable[int]:
+    return companies.order_by().values_list("id", flat=True).distinct().iterator(chunk_size=PLAN_BATCH_SIZE)
+
+
+def _create_plans(batch: List[CallPlan]) -> List[CallPlan]:
+    """bulk_create з id створених планів (MySQL їх не повертає — дочитуються одним SELECT)."""
+    if connection.features.can_return_rows_from_bulk_insert:
+        return CallPlan.objects.bulk_create(batch)
+    last_pk = CallPlan.objects.aggregate(last=Max("pk"))["last"] or 0
+    CallPlan.objects.bulk_create(batch)
+    return list(CallPlan.objects.filter(
+        pk__gt=last_pk, company_id__in=[plan.company_id for plan in batch], planned_datetime=batch[0].planned_datetime,
+    ).order_by("pk"))
+
+
+def plan_calls(companies: QuerySet, planned_datetime, notes: Optional[str] = None) -> int:
+    """
+    Створює по активному плановому дзвінку на кожну компанію (bulk_create порціями);
+    кожен план — запис "create" у журналі змін.
+    """
+    created = 0
+    batch = []
+    for company_id in _iter_ids(companies):
+        batch.append(CallPlan(company_id=company_id, planned_datetime=planned_datetime, notes=notes or None))
+        if len(batch) >= PLAN_BATCH_SIZE:
+            plans = _create_plans(batch)
+            changelog.record_many(plans, "create")
+            created += len(plans)
+            batch = []
+    if batch:
+        plans = _create_plans(batch)
+        changelog.record_many(plans, "create")
+        created += len(plans)
+    return created
+
+
+def _logged_values(action: str, data: dict) -> dict:
+    """Що записати в журнал змін для дії (id вибраних довідників)."""
+    if action == "plan_calls":
+        return {"planned_datetime": data["planned_datetime"]}
+    if action == "region":
+        return {"region_id": getattr(data.get("region"), "pk", None), "district_id": getattr(data.get("district"), "pk", None)}
+    if action in ("holding", "status"):
+        return {f"{action}_id": getattr(data.get(action), "pk", None)}
+    raise ValueError(f"Невідома дія: {action}")
+
+
+def apply_bulk_action(action: str, companies: QuerySet, data: dict) -> int:
+    """
+    Виконує дію над компаніями в одній транзакції і скидає кеш списку.
+
+    :param action: ключ з CompanyBulkActionForm.ACTION_CHOICES
+    :param companies: QuerySet цільових компаній (без анотацій і сортування)
+    :param data: очищені дані CompanyBulkActionForm
+    :return: кількість змінених компаній / створених планів
+    """
+    logged = {"bulk_action": action, **_logged_values(action, data)}
+    count = 0
+    with transaction.atomic():
+        # вибірка за фільтром може залежати від полів, що змінюються, — id фіксуються до UPDATE
+        ids = list(_iter_ids(companies))
+        for start in range(0, len(ids), UPDATE_BATCH_SIZE):
+            batch = Company.objects.filter(pk__in=ids[start:start + UPDATE_BATCH_SIZE])
+            changelog.record_queryset(batch, "update", logged)
+            if action == "holding":
+                holding = data.get("holding")
+                count += set_holding(batch, holding.pk if holding else None)
+            elif action == "status":
+                status = data.get("status")
+                count += set_status(batch, status.pk if status else None)
+            elif action == "region":
+                region, district = data.get("region"), data.get("district")
+                count += set_region(batch, region.pk if region else None, district.pk if district else None)
+            else:
+                count += plan_calls(batch, data["planned_datetime"], data.get("notes"))
+                touch_companies(batch)
+        invalidate_companies_cache()
+    return count
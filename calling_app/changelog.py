@@ -0,0 +1,161 @@
+"""
+Журнал змін для інкрементальної синхронізації (BI-сховище, зовнішні кеші).
+
+Кожне збереження/видалення відстежуваних моделей і кожна зміна їхніх M2M
+додає рядок ChangeLogEntry (сигнали в signals.py); масові операції пишуть журнал
+самі: update() — record_queryset() одним INSERT ... SELECT, bulk_create() —
+record_many() (значення полів) і record_links() (нові рядки M2M).
+Запис іде в тій самій транзакції, що й зміна: відкочена зміна не потрапляє в журнал.
+
+Споживач зберігає номер (seq) останнього прочитаного запису і читає наступні:
+    GET /changes/?since=<N>&limit=<M>   → {"changes": [...], "next": N', "has_more": ...}
+    python manage.py changes --since=N
+
+Курсор — seq, а не id: id видаються при вставці, а транзакції комітяться в
+іншому порядку, тож запис з меншим id може з'явитися після того, як споживач
+уже прочитав більші. seq призначає sequence_committed() лише закоміченим
+записам (під блокуванням рядка ChangeLogSequence), тому запис, закомічений
+пізніше, завжди отримує більший seq за все, що вже можна було прочитати.
+"""
+import json
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, router, transaction
+from django.db.models import F, Model, QuerySet
+from django.utils import timezone
+
+from .models import (
+    Call, CallPlan, ChangeLogEntry, ChangeLogSequence, Company, CompanyEmail, ContactPerson, Holding, Phone, StockItem, Warehouse,
+)
+
+TRACKED_MODELS = (Company, ContactPerson, Phone, CompanyEmail, Call, CallPlan, Holding, Warehouse, StockItem)
+# (модель, M2M-поле) — зміни зв'язків пишуться з боку моделі, що має поле
+TRACKED_M2M = (
+    (ContactPerson, "companies"),
+    (Phone, "companies"),
+    (CompanyEmail, "companies"),
+    (Call, "company"),
+    (Warehouse, "owners"),
+    (Warehouse, "clients"),
+)
+
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 5000
+SEQUENCE_BATCH = 1000
+
+
+def label(model) -> str:
+    return model._meta.model_name
+
+
+def field_values(instance: Model) -> Dict[str, object]:
+    return {field.attname: getattr(instance, field.attname) for field in instance._meta.concrete_fields}
+
+
+def record(instance: Model, action: str, data: Optional[dict] = None) -> ChangeLogEntry:
+    return ChangeLogEntry.objects.create(model=label(type(instance)), object_id=instance.pk, action=action,
+                                         data=data or {})
+
+
+def record_m2m(model, owner_ids: Iterable[int], action: str, field: str, ids: Iterable[int]) -> None:
+    ids = sorted(ids)
+    entries = [
+        ChangeLogEntry(model=label(model), object_id=owner_id, action=action, data={"field": field, "ids": ids})
+        for owner_id in owner_ids
+    ]
+    if entries and ids:
+        ChangeLogEntry.objects.bulk_create(entries)
+
+
+def record_many(instances: Iterable[Model], action: str) -> None:
+    """Записи зі значеннями полів для об'єктів bulk_create/bulk_update (одним INSERT)."""
+    ChangeLogEntry.objects.bulk_create([
+        ChangeLogEntry(model=label(type(obj)), object_id=obj.pk, action=action, data=field_values(obj))
+        for obj in instances
+    ], batch_size=1000)
+
+
+def record_links(model, field: str, links: Iterable[Tuple[int, int]], action: str) -> None:
+    """Записи add/remove для пар (id власника поля, id пов'язаного) — як від m2m_changed."""
+    by_owner: Dict[int, List[int]] = defaultdict(list)
+    for owner_id, other_id in links:
+        by_owner[owner_id].append(other_id)
+    ChangeLogEntry.objects.bulk_create([
+        ChangeLogEntry(model=label(model), object_id=owner_id, action=action, data={"field": field, "ids": sorted(ids)})
+        for owner_id, ids in by_owner.items()
+    ], batch_size=1000)
+
+
+def record_queryset(queryset: QuerySet, action: str, data: Optional[dict] = None) -> int:
+    """
+    Запис про кожен об'єкт queryset одним INSERT ... SELECT (без вибірки id
+    у Python) — для масових update()/bulk_create(), що не надсилають сигналів.
+    """
+    using = router.db_for_write(ChangeLogEntry)
+    connection = connections[using]
+    pk_sql, params = queryset.order_by().values(changed_id=F("pk")).query.sql_with_params()
+    table = connection.ops.quote_name(ChangeLogEntry._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} (model, object_id, action, data, changed_at) "
+            f"SELECT %s, changed.changed_id, %s, %s, %s "
+            f"FROM ({pk_sql}) changed",
+            [
+                label(queryset.model), action, json.dumps(data or {}, cls=DjangoJSONEncoder),
+                connection.ops.adapt_datetimefield_value(timezone.now()), *params,
+            ],
+        )
+        return cursor.rowcount
+
+
+def sequence_committed() -> int:
+    """
+    Нумерує видимі (закомічені) записи без seq у порядку id, порціями по
+    SEQUENCE_BATCH, кожна — одним UPDATE. Паралельні виклики чекають один
+    на одного на рядку ChangeLogSequence. Записи незакомічених транзакцій
+    не видно — вони отримають seq при наступному виклику після коміту.
+    :return: скільки записів пронумеровано
+    """
+    numbered = 0
+    while True:
+        with transaction.atomic():
+            counter, _ = ChangeLogSequence.objects.select_for_update().get_or_create(pk=1)
+            pending = list(
+                ChangeLogEntry.objects.filter(seq__isnull=True).order_by("pk")
+                .values_list("pk", flat=True)[:SEQUENCE_BATCH]
+            )
+            if not pending:
+                return numbered
+            # seq = id + зсув: зростає разом з id і більший за всі видані раніше
+            offset = counter.last_seq + 1 - pending[0]
+            ChangeLogEntry.objects.filter(pk__in=pending).update(seq=F("pk") + offset)
+            counter.last_seq = pending[-1] + offset
+            counter.save(update_fields=["last_seq"])
+        numbered += len(pending)
+
+
+def entry_dict(entry: ChangeLogEntry) -> dict:
+    return {
+        "seq": entry.seq,
+        "model": entry.model,
+        "id": entry.object_id,
+        "action": entry.action,
+        "data": entry.data,
+        "changed_at": entry.changed_at.isoformat(),
+    }
+
+
+def changes_since(since: int = 0, limit: int = DEFAULT_LIMIT) -> Tuple[List[dict], int, bool]:
+    """
+    Записи з seq більше since (за зростанням), не більше limit; перед читанням
+    нумерує щойно закомічені записи.
+    :return: (записи, курсор для наступного запиту, чи є ще записи)
+    """
+    limit = max(1, min(limit, MAX_LIMIT))
+    sequence_committed()
+    rows = list(ChangeLogEntry.objects.filter(seq__gt=since).order_by("seq")[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return [entry_dict(row) for row in rows], (rows[-1].seq if rows else since), has_more
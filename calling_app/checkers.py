@@ -1,12 +1,39 @@
 import re
 import logging
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
 
 # Налаштування логування
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 
+# -----------------------
+# Попередньо скомпільовані шаблони та таблиці
+# -----------------------
+_NON_DIGITS = re.compile(r'\D')
+_PERSON_JUNK = re.compile(r"[^\w\s’'іІїЇєЄґҐа-яА-Я\-]", flags=re.UNICODE)
+_EMAIL = re.compile(r'^[\w\.-]+@[\w\.-]+\.\w+$')
+_APOSTROPHES = str.maketrans({"’": "'", "`": "'"})
+_PHONE_PREFIXES = {9: "+380", 10: "+38", 11: "+3", 12: "+"}
+_PERSON_OFFICE = {"аа", "н/д", "none"}
+
+# Розмір LRU-кешу: у вибірках багато повторів (спільні телефони, "Офіс", однакові ПІБ)
+_CACHE_SIZE = 65536
+
+BatchResult = Tuple[List, List[bool]]  # (нормалізовані значення, маска помилок)
+
+
 # -----------------------
 # EDRPOU
 # -----------------------
+@lru_cache(maxsize=_CACHE_SIZE)
+def _normalize_edrpou(value: str) -> Tuple[str, bool]:
+    """Повертає (ЄДРПОУ, чи коректний). Без логування — для кешу і пакетної обробки."""
+    digits = _NON_DIGITS.sub('', value)
+    if not digits or len(digits) > 8 or not digits.strip("0"):
+        return "00000000", False
+    return digits.zfill(8), True
+
+
 def check_edrpou(edrpou: str) -> str:
     """
     Стандартизує ЄДРПОУ:
@@ -17,15 +44,29 @@ def check_edrpou(edrpou: str) -> str:
     if not edrpou:
         return "00000000"
 
-    edrpou = re.sub(r'\D', '', str(edrpou))  # залишаємо тільки цифри
+    normalized, ok = _normalize_edrpou(str(edrpou))
+    if not ok:
+        logging.warning(f"Некоректний EDRPOU {edrpou}, буде замінено на '00000000'")
+
+    return normalized
 
-    if len(edrpou) < 8:
-        edrpou = edrpou.zfill(8)
-    elif len(edrpou) > 8:
-        logging.warning(f"EDRPOU {edrpou} перевищує 8 символів, буде замінено на '00000000'")
-        edrpou = "00000000"
 
-    return edrpou
+def check_edrpous(values: Iterable) -> BatchResult:
+    """
+    Пакетний варіант check_edrpou для колонки значень.
+    Маска помилок True — значення порожнє або некоректне (замінено на "00000000").
+    """
+    result, errors = [], []
+    for value in values:
+        if not value:
+            result.append("00000000")
+            errors.append(True)
+            continue
+        edrpou, ok = _normalize_edrpou(str(value))
+        result.append(edrpou)
+        errors.append(not ok)
+    _log_batch_errors("ЄДРПОУ", errors)
+    return result, errors
 
 # -----------------------
 # Площа
@@ -48,6 +89,14 @@ def check_area(area) -> int:
 # -----------------------
 # Телефон
 # -----------------------
+@lru_cache(maxsize=_CACHE_SIZE)
+def _normalize_phone(value: str) -> Optional[str]:
+    """Повертає номер у форматі +380XXXXXXXXX або None. Без логування."""
+    digits = _NON_DIGITS.sub('', value)
+    prefix = _PHONE_PREFIXES.get(len(digits))
+    return prefix + digits if prefix else None
+
+
 def check_phone(phone_number: str) -> str:
     """
     Стандартизує номер телефону у формат +380XXXXXXXXX.
@@ -56,26 +105,49 @@ def check_phone(phone_number: str) -> str:
     if not phone_number:
         return None
 
-    phone_number = re.sub(r'\D', '', str(phone_number))
-    length = len(phone_number)
+    normalized = _normalize_phone(str(phone_number))
+    if normalized is None:
+        logging.warning(f"Некоректний номер {_NON_DIGITS.sub('', str(phone_number))}")
+
+    return normalized
 
-    if length == 9:
-        phone_number = "+380" + phone_number
-    elif length == 10:
-        phone_number = "+38" + phone_number
-    elif length == 11:
-        phone_number = "+3" + phone_number
-    elif length == 12:
-        phone_number = "+" + phone_number
-    else:
-        logging.warning(f"Некоректний номер {phone_number}")
-        phone_number = None
 
-    return phone_number
+def check_phones(values: Iterable) -> BatchResult:
+    """
+    Пакетний варіант check_phone.
+    Маска помилок True — номер заданий, але некоректний (порожні значення не є помилкою).
+    """
+    result, errors = [], []
+    for value in values:
+        normalized = _normalize_phone(str(value)) if value else None
+        result.append(normalized)
+        errors.append(bool(value) and normalized is None)
+    _log_batch_errors("телефонів", errors)
+    return result, errors
 
 # -----------------------
 # ПІБ/Ім’я
 # -----------------------
+@lru_cache(maxsize=_CACHE_SIZE)
+def _normalize_person(name: str) -> str:
+    name = name.strip()
+    if not name:
+        return "Невідома"
+
+    # Спеціальні випадки
+    if name.lower() in _PERSON_OFFICE:
+        name = "Офіс"
+
+    # Видаляємо всі зайві символи, залишаємо букви, пробіли, апострофи, дефіси
+    name = _PERSON_JUNK.sub("", name)
+
+    # Замінюємо неправильні лапки на апостроф
+    name = name.translate(_APOSTROPHES)
+
+    # Видаляємо зайві пробіли та робимо кожне слово з великої літери
+    return " ".join(word.capitalize() for word in name.lower().split())
+
+
 def check_person(name: str) -> str:
     """
     Стандартизує ПІБ:
@@ -84,28 +156,30 @@ def check_person(name: str) -> str:
     - прибирає зайві символи
     - спеціальні заміни (наприклад, 'аа' -> 'Офіс')
     """
-    if not name or not str(name).strip():
+    if not name:
         return "Невідома"
+    return _normalize_person(str(name))
 
-    name = str(name).strip()
-
-    # Спеціальні випадки
-    if name.lower() in ["аа", "н/д", "none"]:
-        name = "Офіс"
-
-    # Видаляємо всі зайві символи, залишаємо букви, пробіли, апострофи, дефіси
-    name = re.sub(r"[^\w\s’'іІїЇєЄґҐа-яА-Я\-]", "", name, flags=re.UNICODE)
-
-    # Замінюємо неправильні лапки на апостроф
-    name = name.replace("’", "'").replace("`", "'")
 
-    # Видаляємо зайві пробіли
-    name = " ".join(name.split())
+def check_persons(values: Iterable) -> BatchResult:
+    """
+    Пакетний варіант check_person.
+    Маска помилок True — ПІБ порожнє (замінено на "Невідома").
+    """
+    result, errors = [], []
+    for value in values:
+        name = _normalize_person(str(value)) if value else "Невідома"
+        result.append(name)
+        errors.append(not value or not str(value).strip())
+    return result, errors
 
-    # Капіталізація кожного слова
-    standardized = " ".join(word.capitalize() for word in name.lower().split())
 
-    return standardized
+@lru_cache(maxsize=_CACHE_SIZE)
+def _normalize_email(email: str):
+    email = email.strip()
+    if _EMAIL.match(email):
+        return email.lower()
+    return False
 
 
 def is_valid_email(email):
@@ -115,11 +189,28 @@ def is_valid_email(email):
     """
     if not email:
         return False
-    email = email.strip()
-    pattern = r'^[\w\.-]+@[\w\.-]+\.\w+$'
-    if re.match(pattern, email):
-        return email.lower()  # повертаємо в нижньому регістрі
-    return False
+    return _normalize_email(email)
+
+
+def check_emails(values: Iterable) -> BatchResult:
+    """
+    Пакетний варіант is_valid_email: повертає email у нижньому регістрі або None.
+    Маска помилок True — email заданий, але некоректний.
+    """
+    result, errors = [], []
+    for value in values:
+        email = _normalize_email(str(value)) if value else False
+        result.append(email or None)
+        errors.append(bool(value) and not email)
+    _log_batch_errors("email", errors)
+    return result, errors
+
+
+def _log_batch_errors(what: str, errors: List[bool]) -> None:
+    """Одне зведене попередження на пакет замість запису на кожне значення."""
+    bad = sum(errors)
+    if bad:
+        logging.warning(f"Некоректних {what}: {bad} з {len(errors)}")
 
 
 def is_valid_website(site: str):
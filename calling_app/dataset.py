@@ -0,0 +1,387 @@
+"""
+Генератор синтетичного набору даних для навантажувальних тестів.
+
+Компанії з українськими назвами й адресами, холдинги, контакти, телефони
+(частина — спільні для сусідніх компаній), дзвінки, плани, склади і залишки.
+Первинні ключі задаються явно (від поточного максимуму в кожній таблиці), тож
+зв'язки будуються без зворотного читання id, а рядки пишуться bulk_create
+великими порціями — по транзакції на порцію. RNG з фіксованим seed: на тій самій
+початковій базі повторний запуск дає ті самі дані.
+
+ЄДРПОУ і номери телефонів будуються з первинного ключа, тому генератор
+призначений для порожньої або тестової бази (не змішувати з реальними даними).
+Сигнали (bulk_create їх не надсилає) не спрацьовують: індекс назв будується
+окремо командою build_name_index.
+"""
+import random
+from array import array
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional, Tuple
+
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+
+from . import ref_cache
+from .geo import grid_cell
+from .models import (
+    Call, CallPlan, Company, CompanyStatus, ContactPerson, Crop, District, Holding, Phone, Region, StockItem,
+    Warehouse,
+)
+from .prefix_index import invalidate_company_index
+from .utils import invalidate_companies_cache
+
+DEFAULT_BATCH_SIZE = 5000
+COMMIT_ROWS = 50_000
+CALL_HISTORY_DAYS = 3 * 365
+
+# Області з кількома районами (після реформи 2020 р.) — якщо довідник порожній
+REGIONS: Dict[str, Tuple[str, ...]] = {
+    "Вінницька": ("Вінницький", "Гайсинський", "Жмеринський", "Тульчинський"),
+    "Волинська": ("Луцький", "Ковельський", "Володимирський"),
+    "Дніпропетровська": ("Дніпровський", "Павлоградський", "Криворізький", "Новомосковський"),
+    "Житомирська": ("Житомирський", "Бердичівський", "Коростенський"),
+    "Закарпатська": ("Ужгородський", "Мукачівський", "Берегівський"),
+    "Запорізька": ("Запорізький", "Пологівський", "Мелітопольський"),
+    "Івано-Франківська": ("Івано-Франківський", "Калуський", "Коломийський"),
+    "Київська": ("Бучанський", "Броварський", "Обухівський", "Фастівський", "Білоцерківський"),
+    "Кіровоградська": ("Кропивницький", "Голованівський", "Новоукраїнський", "Олександрійський"),
+    "Львівська": ("Львівський", "Золочівський", "Стрийський", "Червоноградський"),
+    "Миколаївська": ("Миколаївський", "Вознесенський", "Первомайський", "Баштанський"),
+    "Одеська": ("Одеський", "Березівський", "Подільський", "Болградський"),
+    "Полтавська": ("Полтавський", "Кременчуцький", "Лубенський", "Миргородський"),
+    "Рівненська": ("Рівненський", "Дубенський", "Сарненський"),
+    "Сумська": ("Сумський", "Конотопський", "Роменський", "Охтирський"),
+    "Тернопільська": ("Тернопільський", "Чортківський", "Кременецький"),
+    "Харківська": ("Харківський", "Чугуївський", "Лозівський", "Богодухівський"),
+    "Херсонська": ("Херсонський", "Бериславський", "Каховський"),
+    "Хмельницька": ("Хмельницький", "Кам'янець-Подільський", "Шепетівський"),
+    "Черкаська": ("Черкаський", "Уманський", "Звенигородський", "Золотоніський"),
+    "Чернівецька": ("Чернівецький", "Дністровський", "Вижницький"),
+    "Чернігівська": ("Чернігівський", "Ніжинський", "Прилуцький", "Корюківський"),
+    "Донецька": ("Краматорський", "Покровський", "Бахмутський"),
+    "Луганська": ("Сіверськодонецький", "Старобільський"),
+}
+
+STATUSES = ("active", "nonactive")
+CROPS = ("Пшениця", "Кукурудза", "Соняшник", "Ячмінь", "Ріпак", "Соя", "Жито", "Горох")
+
+LEGAL_FORMS = ("ТОВ", "ТОВ", "ТОВ", "ПП", "ФГ", "СФГ", "ПрАТ", "АФ", "СТОВ")
+NAME_WORDS = (
+    "Агро", "Світанок", "Колос", "Нива", "Зоря", "Дніпро", "Поділля", "Степ", "Лан", "Урожай", "Злагода",
+    "Перемога", "Ранок", "Весна", "Батьківщина", "Агротрейд", "Агросвіт", "Зерно", "Хлібороб", "Добробут",
+    "Обрій", "Пролісок", "Лугова", "Дружба", "Надія", "Мрія", "Прогрес", "Край", "Вікторія", "Сяйво",
+)
+NAME_SUFFIXES = ("", "", "", " Плюс", " Інвест", " Агро", " Південь", " Груп", " Альянс", " Трейд")
+SURNAMES = (
+    "Шевченко", "Коваленко", "Бондаренко", "Ткаченко", "Кравченко", "Олійник", "Шевчук", "Поліщук",
+    "Мельник", "Бойко", "Ковальчук", "Савченко", "Лисенко", "Руденко", "Марченко", "Мороз", "Петренко",
+    "Клименко", "Павленко", "Гончаренко", "Кузьменко", "Левченко", "Харченко", "Сидоренко", "Захарченко",
+)
+FIRST_NAMES = (
+    "Олександр", "Сергій", "Володимир", "Андрій", "Микола", "Іван", "Василь", "Петро", "Юрій", "Віктор",
+    "Олена", "Наталія", "Тетяна", "Ірина", "Світлана", "Оксана", "Людмила", "Галина", "Ольга", "Марія",
+)
+PATRONYMICS = ("Олександрович", "Іванович", "Петрович", "Миколайович", "Васильович", "Іванівна", "Петрівна")
+POSITIONS = ("Директор", "Головний агроном", "Бухгалтер", "Заступник директора", "Менеджер з закупівель", None)
+VILLAGES = (
+    "Вишневе", "Гвардійське", "Михайлівка", "Олександрівка", "Петрівка", "Новоселиця", "Зелений Гай",
+    "Калинівка", "Миколаївка", "Степове", "Грушівка", "Березівка", "Іванівка", "Соснівка", "Лозуватка",
+)
+STREETS = ("Шевченка", "Центральна", "Миру", "Садова", "Незалежності", "Лесі Українки", "Польова", "Шкільна")
+CALL_NOTES = (
+    "Не додзвонились", "Передзвонити пізніше", "Цікавить ціна", "Продали весь урожай", "Надіслати пропозицію",
+    "Директор у відпустці", "Зберігають на елеваторі", "Домовились про зустріч",
+)
+MOBILE_CODES = ("67", "50", "63", "66", "68", "73", "93", "95", "96", "97", "98", "99")
+TRANSPORT_TYPES = ("auto", "auto", "rail", "port", "other")
+
+# Межі України для координат складів
+LAT_RANGE = (44.4, 52.3)
+LON_RANGE = (22.2, 40.2)
+
+Progress = Optional[Callable[[str], None]]
+
+
+def _next_pk(model) -> int:
+    return (model.objects.aggregate(max_pk=Max("pk"))["max_pk"] or 0) + 1
+
+
+class _Batches:
+    """
+    Буфери рядків для bulk_create. Скидаються всі разом у порядку моделей
+    (FK-залежності) в одній транзакції, щойно будь-який буфер досягає
+    commit_rows; всередині транзакції — bulk_create порціями по batch_size.
+    Рідші коміти суттєво прискорюють запис на SQLite і MySQL.
+    """
+
+    def __init__(self, models: List, batch_size: int, commit_rows: int = COMMIT_ROWS):
+        self.batch_size = batch_size
+        self.commit_rows = max(batch_size, commit_rows)
+        self.rows: Dict[object, list] = {model: [] for model in models}
+        self.created: Dict[str, int] = {model._meta.label: 0 for model in models}
+
+    def add(self, model, obj) -> None:
+        rows = self.rows[model]
+        rows.append(obj)
+        if len(rows) >= self.commit_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        with transaction.atomic():
+            for model, rows in self.rows.items():
+                if rows:
+                    model.objects.bulk_create(rows, batch_size=self.batch_size)
+                    self.created[model._meta.label] += len(rows)
+                    rows.clear()
+
+
+def ensure_references() -> Tuple[List[int], Dict[int, List[int]], List[int], List[int]]:
+    """
+    Довідники, на які посилаються згенеровані рядки: наявні записи або
+    стандартний набір, якщо таблиця порожня.
+    :return: (id областей, id районів за областю, id статусів [активний першим], id культур)
+    """
+    if not Region.objects.exists():
+        Region.objects.bulk_create([Region(region=name) for name in REGIONS])
+        regions = {r.region: r.pk for r in Region.objects.all()}
+        District.objects.bulk_create([
+            District(region_id=regions[region], district=district)
+            for region, districts in REGIONS.items() if region in regions
+            for district in districts
+        ])
+    if not CompanyStatus.objects.exists():
+        CompanyStatus.objects.bulk_create([CompanyStatus(status_name=name) for name in STATUSES])
+    if not Crop.objects.exists():
+        Crop.objects.bulk_create([Crop(name=name) for name in CROPS])
+
+    districts_by_region: Dict[int, List[int]] = {}
+    for pk, region_id in District.objects.order_by("pk").values_list("pk", "region_id"):
+        districts_by_region.setdefault(region_id, []).append(pk)
+    region_ids = list(Region.objects.order_by("pk").values_list("pk", flat=True))
+    status_ids = list(CompanyStatus.objects.order_by("pk").values_list("pk", flat=True))
+    crop_ids = list(Crop.objects.order_by("pk").values_list("pk", flat=True))
+    return region_ids, districts_by_region, status_ids, crop_ids
+
+
+def company_name(rng: random.Random) -> str:
+    form = rng.choice(LEGAL_FORMS)
+    if form in ("ФГ", "СФГ") and rng.random() < 0.6:
+        return f"{form} {rng.choice(SURNAMES)} {rng.choice(FIRST_NAMES)[0]}.{rng.choice(PATRONYMICS)[0]}."
+    return f'{form} "{rng.choice(NAME_WORDS)}{rng.choice(NAME_SUFFIXES)}"'
+
+
+def person_name(rng: random.Random) -> str:
+    return f"{rng.choice(SURNAMES)} {rng.choice(FIRST_NAMES)} {rng.choice(PATRONYMICS)}"
+
+
+def legal_address(rng: random.Random, region: str, district: Optional[str]) -> str:
+    district_part = f"{district} р-н, " if district else ""
+    return (
+        f"{rng.randrange(7000, 99999):05d}, {region} обл., {district_part}"
+        f"с. {rng.choice(VILLAGES)}, вул. {rng.choice(STREETS)}, {rng.randrange(1, 150)}"
+    )
+
+
+def phone_number(pk: int) -> str:
+    """Унікальний номер +380XXXXXXXXX з первинного ключа (до 120 млн)."""
+    return f"+380{MOBILE_CODES[(pk // 10_000_000) % len(MOBILE_CODES)]}{pk % 10_000_000:07d}"
+
+
+def generate_dataset(
+    companies: int,
+    calls: int,
+    seed: int = 1,
+    plans_ratio: float = 0.3,
+    warehouses: Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    progress: Progress = None,
+) -> Dict[str, int]:
+    """
+    Генерує набір даних і повертає кількість створених рядків за моделями.
+
+    :param companies: кількість компаній
+    :param calls: кількість дзвінків (розподіляються між компаніями випадково)
+    :param seed: seed RNG — однаковий seed дає однакові дані
+    :param plans_ratio: частка компаній з активним плановим дзвінком
+    :param warehouses: кількість складів (за замовчуванням — 1 на 100 компаній)
+    :param batch_size: рядків в одному bulk_create
+    """
+    rng = random.Random(seed)
+    say = progress or (lambda message: None)
+    warehouses = companies // 100 if warehouses is None else warehouses
+
+    region_ids, districts_by_region, status_ids, crop_ids = ensure_references()
+    region_names = dict(Region.objects.values_list("pk", "region"))
+    district_names = dict(District.objects.values_list("pk", "district"))
+    active_status, other_statuses = status_ids[0], status_ids[1:] or status_ids
+
+    holding_pk = _next_pk(Holding)
+    holdings = max(1, companies // 50)
+    Holding.objects.bulk_create(
+        [Holding(pk=holding_pk + i, name=f"Агрохолдинг {rng.choice(NAME_WORDS)} №{holding_pk + i}") for i in range(holdings)],
+        batch_size=batch_size,
+    )
+
+    company_pk, contact_pk, phone_pk = _next_pk(Company), _next_pk(ContactPerson), _next_pk(Phone)
+    first_company = company_pk
+    # телефони компанії — суцільний діапазон [first_phone, first_phone + phone_count)
+    first_phone = array("q")
+    phone_count = array("b")
+
+    contact_companies = ContactPerson.companies.through
+    phone_companies = Phone.companies.through
+    batches = _Batches(
+        [Company, ContactPerson, contact_companies, Phone, phone_companies, StockItem], batch_size
+    )
+
+    say(f"Компанії: {companies}")
+    for i in range(companies):
+        pk = company_pk + i
+        region_id = rng.choice(region_ids)
+        district_ids = districts_by_region.get(region_id)
+        district_id = rng.choice(district_ids) if district_ids and rng.random() < 0.9 else None
+        batches.add(Company, Company(
+            pk=pk,
+            edrpou=f"{pk:08d}",
+            name=company_name(rng),
+            legal_address=legal_address(rng, region_names[region_id], district_names.get(district_id)),
+            hectares=min(int(rng.lognormvariate(6, 1.3)), 500_000),
+            holding_id=holding_pk + rng.randrange(holdings) if rng.random() < 0.2 else None,
+            status_id=active_status if rng.random() < 0.9 else rng.choice(other_statuses),
+            region_id=region_id,
+            district_id=district_id,
+        ))
+
+        contacts = []
+        for _ in range(1 + (rng.random() < 0.4)):
+            contacts.append(contact_pk)
+            batches.add(ContactPerson, ContactPerson(pk=contact_pk, full_name=person_name(rng), position=rng.choice(POSITIONS)))
+            batches.add(contact_companies, contact_companies(contactperson_id=contact_pk, company_id=pk))
+            contact_pk += 1
+
+        count = rng.choice((1, 1, 2, 2, 3))
+        first_phone.append(phone_pk)
+        phone_count.append(count)
+        for _ in range(count):
+            batches.add(Phone, Phone(
+                pk=phone_pk,
+                number=phone_number(phone_pk),
+                status="on" if rng.random() < 0.85 else "off",
+                contact_id=rng.choice(contacts),
+            ))
+            batches.add(phone_companies, phone_companies(phone_id=phone_pk, company_id=pk))
+            phone_pk += 1
+        # спільний телефон з попередньою компанією (одна людина веде кілька господарств)
+        if i and rng.random() < 0.15:
+            batches.add(phone_companies, phone_companies(phone_id=first_phone[i - 1], company_id=pk))
+
+        if rng.random() < 0.3:
+            for crop_id in rng.sample(crop_ids, min(len(crop_ids), rng.randrange(1, 4))):
+                quantity = Decimal(rng.randrange(10_000, 5_000_000)).scaleb(-2)
+                batches.add(StockItem, StockItem(company_id=pk, crop_id=crop_id, quantity=quantity))
+
+        if (i + 1) % (batch_size * 20) == 0:
+            say(f"  компаній: {i + 1}")
+    batches.flush()
+    created = dict(batches.created)
+    created["calling_app.Holding"] = holdings
+
+    created.update(_generate_calls(rng, calls, first_company, first_phone, phone_count, batch_size, say))
+    created.update(_generate_plans(rng, int(companies * plans_ratio), first_company, first_phone, phone_count, batch_size))
+    created.update(_generate_warehouses(rng, warehouses, first_company, companies, region_ids, districts_by_region, batch_size))
+
+    _reset_sequences()
+    ref_cache.invalidate()
+    invalidate_companies_cache()
+    invalidate_company_index()
+    return created
+
+
+def _generate_calls(rng, calls, first_company, first_phone, phone_count, batch_size, say) -> Dict[str, int]:
+    if not calls or not first_phone:
+        return {}
+    say(f"Дзвінки: {calls}")
+    call_companies = Call.company.through
+    batches = _Batches([Call, call_companies], batch_size)
+    call_pk = _next_pk(Call)
+    now = datetime.now(dt_timezone.utc).replace(microsecond=0)
+    history = CALL_HISTORY_DAYS * 86400
+    companies = len(first_phone)
+
+    for i in range(calls):
+        offset = rng.randrange(companies)
+        pk = call_pk + i
+        batches.add(Call, Call(
+            pk=pk,
+            phone_id=first_phone[offset] + rng.randrange(phone_count[offset]),
+            datetime=now - timedelta(seconds=rng.randrange(history)),
+            duration_seconds=rng.randrange(5, 900) if rng.random() < 0.8 else None,
+            notes=rng.choice(CALL_NOTES) if rng.random() < 0.3 else None,
+        ))
+        batches.add(call_companies, call_companies(call_id=pk, company_id=first_company + offset))
+        if (i + 1) % (batch_size * 100) == 0:
+            say(f"  дзвінків: {i + 1}")
+    batches.flush()
+    return batches.created
+
+
+def _generate_plans(rng, plans, first_company, first_phone, phone_count, batch_size) -> Dict[str, int]:
+    if not plans or not first_phone:
+        return {}
+    batches = _Batches([CallPlan], batch_size)
+    plan_pk = _next_pk(CallPlan)
+    now = datetime.now(dt_timezone.utc).replace(microsecond=0)
+    for i, offset in enumerate(sorted(rng.sample(range(len(first_phone)), min(plans, len(first_phone))))):
+        batches.add(CallPlan, CallPlan(
+            pk=plan_pk + i,
+            company_id=first_company + offset,
+            phone_id=first_phone[offset] + rng.randrange(phone_count[offset]),
+            planned_datetime=now + timedelta(seconds=rng.randrange(60 * 86400)),
+            notes=rng.choice(CALL_NOTES) if rng.random() < 0.3 else None,
+            status="on",
+        ))
+    batches.flush()
+    return batches.created
+
+
+def _generate_warehouses(rng, warehouses, first_company, companies, region_ids, districts_by_region, batch_size) -> Dict[str, int]:
+    if not warehouses or not companies:
+        return {}
+    owners, clients = Warehouse.owners.through, Warehouse.clients.through
+    batches = _Batches([Warehouse, owners, clients], batch_size)
+    warehouse_pk = _next_pk(Warehouse)
+    for i in range(warehouses):
+        pk = warehouse_pk + i
+        region_id = rng.choice(region_ids)
+        district_ids = districts_by_region.get(region_id)
+        warehouse = Warehouse(
+            pk=pk,
+            name=f"Склад {rng.choice(VILLAGES)} №{pk}",
+            capacity_tons=Decimal(rng.randrange(500, 200_000)),
+            transport_type=rng.choice(TRANSPORT_TYPES),
+            latitude=Decimal(f"{rng.uniform(*LAT_RANGE):.6f}"),
+            longitude=Decimal(f"{rng.uniform(*LON_RANGE):.6f}"),
+            region_id=region_id,
+            district_id=rng.choice(district_ids) if district_ids else None,
+        )
+        warehouse.grid_cell = grid_cell(warehouse.latitude, warehouse.longitude)   # bulk_create без сигналів
+        batches.add(Warehouse, warehouse)
+        owner = first_company + rng.randrange(companies)
+        batches.add(owners, owners(warehouse_id=pk, company_id=owner))
+        for client in set(first_company + rng.randrange(companies) for _ in range(rng.randrange(0, 6))) - {owner}:
+            batches.add(clients, clients(warehouse_id=pk, company_id=client))
+    batches.flush()
+    return batches.created
+
+
+def _reset_sequences() -> None:
+    """Після явних pk послідовності (PostgreSQL/Oracle) мають продовжуватись від максимуму."""
+    models = [Holding, Company, ContactPerson, Phone, Call, CallPlan, Warehouse, StockItem]
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
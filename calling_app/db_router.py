@@ -0,0 +1,128 @@
+"""
+Маршрутизація читань на репліки БД.
+
+Читання йдуть на репліку (settings.DATABASE_REPLICAS) лише там, де це явно
+дозволено: у view зі списку settings.READ_REPLICA_VIEWS (GET/HEAD, див.
+ReplicaRoutingMiddleware) або в блоці `with read_from_replica():`. Решта —
+на default, як і раніше.
+
+Read-after-write:
+- перший запис у запиті (db_for_write) закріплює решту запиту за primary;
+- відкрита транзакція на default теж закріплює читання за primary;
+- після запиту із записом middleware ставить cookie на REPLICA_PIN_SECONDS —
+  наступні запити цього браузера (redirect після POST) читають з primary,
+  поки репліка не наздожене.
+
+Явний .using(alias) маршрутизатор не змінює (copy_db, build_gazetteer тощо).
+
+Локально дві SQLite-бази:
+    DATABASES = {
+        "default": {"ENGINE": "django.db.backends.sqlite3", "NAME": BASE_DIR / "primary.sqlite3"},
+        "replica": {"ENGINE": "django.db.backends.sqlite3", "NAME": BASE_DIR / "replica.sqlite3",
+                    "TEST": {"MIRROR": "default"}},
+    }
+    DATABASE_REPLICAS = ["replica"]
+(репліку "наповнює" python manage.py migrate --database=replica і copy_db).
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PIN_COOKIE = "db_primary_pin"
+
+# дозвіл читати з репліки і закріплення за primary — на поточний запит/контекст;
+# None — поза запитом і read_from_replica (запис нічого не закріплює, стан не "протікає")
+_replica_reads: ContextVar[bool] = ContextVar("replica_reads", default=False)
+_pinned: ContextVar[Optional[bool]] = ContextVar("primary_pinned", default=None)
+_wrote: ContextVar[bool] = ContextVar("primary_wrote", default=False)
+
+
+def replicas() -> List[str]:
+    return [alias for alias in getattr(settings, "DATABASE_REPLICAS", []) if alias in settings.DATABASES]
+
+
+def is_pinned() -> bool:
+    return bool(_pinned.get())
+
+
+def pin_primary() -> None:
+    """Решта поточного запиту (контексту) читає з primary."""
+    _pinned.set(True)
+
+
+@contextmanager
+def read_from_replica(pinned: bool = False):
+    """
+    Дозволяє читання з репліки в межах блоку (для звітів, команд, view).
+    :param pinned: почати закріпленим за primary (закріплення зовнішнього запиту успадковується)
+    """
+    reads_token = _replica_reads.set(True)
+    pinned_token = _pinned.set(pinned or is_pinned())
+    try:
+        yield
+    finally:
+        _pinned.reset(pinned_token)
+        _replica_reads.reset(reads_token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints) -> Optional[str]:
+        aliases = replicas()
+        if not aliases or not _replica_reads.get() or is_pinned():
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(aliases)
+
+    def db_for_write(self, model, **hints) -> Optional[str]:
+        if _pinned.get() is not None:
+            _pinned.set(True)
+        _wrote.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> Optional[bool]:
+        # репліки — копії primary: об'єкти з різних аліасів цієї групи можна зв'язувати
+        group = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in group and obj2._state.db in group:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints) -> Optional[bool]:
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Вмикає читання з репліки для GET/HEAD запитів до view з READ_REPLICA_VIEWS
+    і ставить cookie закріплення за primary після запиту, що щось записав.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.views = set(getattr(settings, "READ_REPLICA_VIEWS", ()))
+        self.pin_seconds = getattr(settings, "REPLICA_PIN_SECONDS", 5)
+
+    def __call__(self, request):
+        pinned_token = _pinned.set(bool(request.COOKIES.get(PIN_COOKIE)))
+        wrote_token = _wrote.set(False)
+        reads_token = _replica_reads.set(False)
+        try:
+            response = self.get_response(request)
+            wrote = _wrote.get()
+        finally:
+            _replica_reads.reset(reads_token)
+            _wrote.reset(wrote_token)
+            _pinned.reset(pinned_token)
+        if wrote and replicas():
+            response.set_cookie(PIN_COOKIE, "1", max_age=self.pin_seconds, httponly=True, samesite="Lax")
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        if request.method in ("GET", "HEAD") and match and match.url_name in self.views:
+            _replica_reads.set(True)
+        return None
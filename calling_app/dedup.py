@@ -0,0 +1,158 @@
+"""
+Пошук дублікатів телефонів і контактів через ключі блокування.
+
+Порівнюються лише записи з однаковим ключем (блоком), а не всі пари:
+- телефон: останні 9 цифр номера (номер без коду країни);
+- контакт: нормалізоване прізвище + ініціали ("іванов іп").
+
+Результат — пропозиції злиття (MergeProposal), які застосовує merge.py.
+"""
+import re
+from collections import defaultdict
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from .checkers import check_person, check_phone
+from .models import ContactPerson, Phone
+
+_NON_DIGITS = re.compile(r"\D")
+_PHONE_KEY_DIGITS = 9
+# службові "контакти", які не є людьми і не зливаються
+_SKIP_CONTACTS = {"Офіс", "Невідома"}
+
+
+class MergeProposal(NamedTuple):
+    keep_id: int
+    merge_ids: Tuple[int, ...]
+    score: float
+    keep_label: str
+    merge_labels: Tuple[str, ...]
+
+
+# -----------------------
+# Телефони
+# -----------------------
+def phone_blocking_key(number: Optional[str]) -> Optional[str]:
+    digits = _NON_DIGITS.sub("", number or "")
+    if len(digits) < _PHONE_KEY_DIGITS:
+        return None
+    return digits[-_PHONE_KEY_DIGITS:]
+
+
+def score_phones(a: str, b: str) -> float:
+    """1.0 — однакові після check_phone; 0.9 — збігаються лише останні 9 цифр."""
+    na, nb = check_phone(a), check_phone(b)
+    if na and na == nb:
+        return 1.0
+    return 0.9 if phone_blocking_key(a) == phone_blocking_key(b) else 0.0
+
+
+def find_phone_duplicates(min_score: float = 0.9, chunk_size: int = 5000) -> Iterator[MergeProposal]:
+    blocks: Dict[str, List[Tuple[int, str]]] = defaultdict(list)
+    for pk, number in Phone.objects.order_by("id").values_list("id", "number").iterator(chunk_size=chunk_size):
+        key = phone_blocking_key(number)
+        if key:
+            blocks[key].append((pk, number))
+
+    for candidates in blocks.values():
+        if len(candidates) < 2:
+            continue
+        # залишаємо номер, що вже у форматі check_phone, інакше — найстаріший
+        candidates.sort(key=lambda c: (check_phone(c[1]) != c[1], c[0]))
+        keep_id, keep_number = candidates[0]
+        merged = [(pk, number, score_phones(keep_number, number)) for pk, number in candidates[1:]]
+        merged = [m for m in merged if m[2] >= min_score]
+        if merged:
+            yield MergeProposal(
+                keep_id,
+                tuple(m[0] for m in merged),
+                min(m[2] for m in merged),
+                keep_number,
+                tuple(m[1] for m in merged),
+            )
+
+
+# -----------------------
+# Контакти
+# -----------------------
+def _name_parts(full_name: str) -> List[str]:
+    # check_person прибирає крапки, тож ініціали "І.П." спершу розділяємо пробілом
+    return check_person(full_name.replace(".", ". ")).lower().split()
+
+
+def contact_blocking_key(full_name: Optional[str]) -> Optional[str]:
+    if not full_name or check_person(full_name) in _SKIP_CONTACTS:
+        return None
+    parts = _name_parts(full_name)
+    if not parts:
+        return None
+    return parts[0] + " " + "".join(p[0] for p in parts[1:3])
+
+
+def score_contacts(a: str, b: str, share_company: bool = False) -> float:
+    """
+    Оцінка схожості двох ПІБ з одного блоку (прізвище та ініціали вже збігаються).
+    Повні імена/по батькові мають збігатися, ініціал сумісний з повним словом.
+    Спільна компанія додає впевненості.
+    """
+    pa, pb = _name_parts(a), _name_parts(b)
+    if not pa or not pb or pa[0] != pb[0]:
+        return 0.0
+    score = 0.6
+    for x, y in zip(pa[1:3], pb[1:3]):
+        if x == y:
+            score += 0.1
+        elif len(x) == 1 or len(y) == 1:
+            if x[0] != y[0]:
+                return 0.0
+        else:
+            return 0.0
+    if share_company:
+        score += 0.2
+    return round(min(score, 1.0), 2)
+
+
+def _contact_companies(contact_ids: List[int], chunk_size: int = 1000) -> Dict[int, Set[int]]:
+    through = ContactPerson.companies.through
+    result: Dict[int, Set[int]] = defaultdict(set)
+    for start in range(0, len(contact_ids), chunk_size):
+        rows = through.objects.filter(contactperson_id__in=contact_ids[start:start + chunk_size])
+        for contact_id, company_id in rows.values_list("contactperson_id", "company_id"):
+            result[contact_id].add(company_id)
+    return result
+
+
+def find_contact_duplicates(min_score: float = 0.8, chunk_size: int = 5000) -> Iterator[MergeProposal]:
+    blocks: Dict[str, List[Tuple[int, str]]] = defaultdict(list)
+    for pk, name in ContactPerson.objects.order_by("id").values_list("id", "full_name").iterator(chunk_size=chunk_size):
+        key = contact_blocking_key(name)
+        if key:
+            blocks[key].append((pk, name))
+
+    blocks = {key: c for key, c in blocks.items() if len(c) > 1}
+    companies = _contact_companies([pk for c in blocks.values() for pk, _ in c])
+
+    for candidates in blocks.values():
+        # основний — з найповнішим ПІБ, серед рівних — найстаріший
+        candidates.sort(key=lambda c: (-len(_name_parts(c[1])), -len(c[1]), c[0]))
+        assigned: Set[int] = set()
+        for keep_id, keep_name in candidates:
+            if keep_id in assigned:
+                continue
+            merged = []
+            for pk, name in candidates:
+                if pk == keep_id or pk in assigned:
+                    continue
+                share = bool(companies.get(keep_id, set()) & companies.get(pk, set()))
+                score = score_contacts(keep_name, name, share)
+                if score >= min_score:
+                    merged.append((pk, name, score))
+            if merged:
+                assigned.add(keep_id)
+                assigned.update(m[0] for m in merged)
+                yield MergeProposal(
+                    keep_id,
+                    tuple(m[0] for m in merged),
+                    min(m[2] for m in merged),
+                    keep_name,
+                    tuple(m[1] for m in merged),
+                )
@@ -1,10 +1,47 @@
 # forms.py
 from django import forms
-from .models import Company, ContactPerson, Phone, District, Holding, Call, CallPlan
+from .models import Company, CompanyStatus, ContactPerson, Phone, Holding, Call, CallPlan, Region, District
 from .checkers import check_edrpou, check_phone, check_person
+from . import ref_cache
 from django.utils import timezone
 
 
+class CachedChoiceField(forms.ModelChoiceField):
+    """
+    ModelChoiceField для довідників: choices і перевірка значення беруться
+    з ref_cache, без запитів до БД при кожному рендері/валідації форми.
+    """
+
+    lookup = None     # pk -> об'єкт з кешу
+    objects = None    # () -> список об'єктів з кешу
+    _allowed = None   # обмеження списку (наприклад, райони однієї області)
+
+    def use_cache(self, lookup, objects):
+        self.lookup, self.objects = lookup, objects
+        self.widget.choices = self.choices
+
+    def limit_to(self, objects):
+        self._allowed = list(objects)
+        self.widget.choices = self.choices
+
+    def _cached_objects(self):
+        if self._allowed is not None:
+            return self._allowed
+        return self.objects() if self.objects else []
+
+    def _get_choices(self):
+        choices = [("", self.empty_label)] if self.empty_label is not None else []
+        return choices + ref_cache.choices(self._cached_objects())
+
+    choices = property(_get_choices, forms.ChoiceField.choices.fset)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        obj = self.lookup(value)
+        if obj is None or obj.pk not in {o.pk for o in self._cached_objects()}:
+            raise forms.ValidationError(self.error_messages["invalid_choice"], code="invalid_choice")
+        return obj
 
 
 class CompanyForm(forms.ModelForm):
@@ -29,15 +66,24 @@ class CompanyForm(forms.ModelForm):
             'district': forms.Select(attrs={'class': 'form-control'}),
             'hectares': forms.NumberInput(attrs={'class': 'form-control', 'placeholder': 'Площа'}),
         }
+        field_classes = {
+            'status': CachedChoiceField,
+            'region': CachedChoiceField,
+            'district': CachedChoiceField,
+        }
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        # довідники беруться з кешу, а не запитами на кожен рендер
+        self.fields['status'].use_cache(ref_cache.status, ref_cache.statuses)
+        self.fields['region'].use_cache(ref_cache.region, ref_cache.regions)
+        self.fields['district'].use_cache(ref_cache.district, ref_cache.districts)
 
-        # Якщо об'єкт вже існує і обрана область
-        if self.instance and self.instance.region:
-            self.fields['district'].queryset = District.objects.filter(region=self.instance.region)
-        else:
-            # Інакше можна показувати порожній список або всі райони
-            self.fields['district'].queryset = District.objects.none()
+        # Райони — лише обраної області (з POST або з існуючого об'єкта), інакше порожній список
+        region_id = self.data.get(self.add_prefix('region')) if self.is_bound else None
+        if not region_id and self.instance:
+            region_id = self.instance.region_id
+        self.fields['district'].limit_to(ref_cache.districts(region_id) if ref_cache.region(region_id) else [])
 
     def clean_edrpou(self):
         edrpou = check_edrpou(self.cleaned_data.get('edrpou'))
@@ -148,3 +194,46 @@ class PlanCallForm(forms.ModelForm):
         self.fields["planned_datetime"].input_formats = ["%Y-%m-%d %H:%M"]
 
 
+
+
+
+class CompanyBulkActionForm(forms.Form):
+    """
+    Масова дія над компаніями списку: над вибраними (POST company_ids)
+    або над усіма, що відповідають фільтру (select_all + query — GET-рядок списку).
+    """
+    ACTION_CHOICES = [
+        ("holding", "Призначити холдинг"),
+        ("status", "Змінити статус"),
+        ("region", "Змінити область/район"),
+        ("plan_calls", "Запланувати дзвінки"),
+    ]
+
+    action = forms.ChoiceField(choices=ACTION_CHOICES, label="Дія")
+    select_all = forms.BooleanField(required=False, label="Усі знайдені")
+    query = forms.CharField(required=False, widget=forms.HiddenInput)
+
+    holding = forms.ModelChoiceField(queryset=Holding.objects.order_by("name"), required=False, label="Холдинг")
+    status = CachedChoiceField(queryset=CompanyStatus.objects.none(), required=False, label="Статус")
+    region = CachedChoiceField(queryset=Region.objects.none(), required=False, label="Область")
+    district = CachedChoiceField(queryset=District.objects.none(), required=False, label="Район")
+    planned_datetime = forms.DateTimeField(
+        required=False, label="Дата дзвінка", input_formats=["%Y-%m-%dT%H:%M", "%Y-%m-%d %H:%M"],
+        widget=forms.DateTimeInput(attrs={"type": "datetime-local"}),
+    )
+    notes = forms.CharField(required=False, label="Нотатки")
+
+    def __init__(self, *args, company_ids=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.company_ids = [int(pk) for pk in (company_ids or []) if str(pk).isdigit()]
+        self.fields['status'].use_cache(ref_cache.status, ref_cache.statuses)
+        self.fields['region'].use_cache(ref_cache.region, ref_cache.regions)
+        self.fields['district'].use_cache(ref_cache.district, ref_cache.districts)
+
+    def clean(self):
+        cleaned = super().clean()
+        if not cleaned.get("select_all") and not self.company_ids:
+            raise forms.ValidationError("Не вибрано жодної компанії")
+        if cleaned.get("action") == "plan_calls" and not cleaned.get("planned_datetime"):
+            self.add_error("planned_datetime", "Вкажіть дату дзвінка")
+        return cleaned
@@ -0,0 +1,168 @@
+"""
+Пошук найближчих складів без PostGIS (звичайні MySQL/SQLite).
+
+Кожен склад з координатами має Warehouse.grid_cell — geohash точності
+GRID_PRECISION (≈150 м), проіндексований; заповнюється при збереженні
+(signals.py) і міграцією 0012 для наявних складів.
+
+nearest_warehouses(lat, lon, radius_km) обирає найдрібнішу точність geohash,
+комірка якої не менша за радіус, і читає лише склади з 3×3 сусідніх комірок
+(діапазони grid_cell по індексу). Кандидати ранжуються відстанню
+haversine, порахованою одним проходом по списках координат; об'єкти Warehouse
+вибираються лише для k найближчих.
+
+Як і name_lsh, модуль не імпортує моделі на рівні модуля.
+"""
+import heapq
+from decimal import Decimal
+from math import asin, cos, radians, sin, sqrt
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+GRID_PRECISION = 7
+DEFAULT_RADIUS_KM = 50
+DEFAULT_LIMIT = 10
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_KM_PER_DEGREE = 111.195   # дуга одного градуса меридіана
+
+
+class NearbyWarehouse(NamedTuple):
+    warehouse: "Warehouse"
+    distance_km: float
+
+
+# -----------------------
+# Geohash
+# -----------------------
+def geohash(lat: float, lon: float, precision: int = GRID_PRECISION) -> str:
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        interval, coord = (lon_range, lon) if even else (lat_range, lat)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coord >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+def grid_cell(latitude, longitude) -> Optional[str]:
+    """Комірка складу (None без координат) — значення для Warehouse.grid_cell."""
+    if latitude is None or longitude is None:
+        return None
+    return geohash(float(latitude), float(longitude))
+
+
+def cell_size(precision: int) -> Tuple[float, float]:
+    """(висота, ширина) комірки geohash у градусах."""
+    bits = 5 * precision
+    return 180.0 / 2 ** (bits // 2), 360.0 / 2 ** ((bits + 1) // 2)
+
+
+def search_precision(lat: float, radius_km: float) -> int:
+    """
+    Найдрібніша точність, при якій комірка не менша за радіус по обох осях
+    (0 — радіус більший за будь-яку комірку, сітка не звужує пошук).
+    Ширина береться на найдальшій від екватора широті кола пошуку.
+    """
+    far_lat = min(abs(lat) + radius_km / _KM_PER_DEGREE, 89.0)
+    for precision in range(GRID_PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        if height * _KM_PER_DEGREE >= radius_km and width * _KM_PER_DEGREE * cos(radians(far_lat)) >= radius_km:
+            return precision
+    return 0
+
+
+def neighbour_cells(lat: float, lon: float, precision: int) -> List[str]:
+    """Комірка точки і 8 сусідніх (біля полюсів і антимеридіана — без дублікатів)."""
+    height, width = cell_size(precision)
+    cells = []
+    for dlat in (-height, 0.0, height):
+        for dlon in (-width, 0.0, width):
+            cell = geohash(max(-90.0, min(90.0, lat + dlat)), (lon + dlon + 180.0) % 360.0 - 180.0, precision)
+            if cell not in cells:
+                cells.append(cell)
+    return cells
+
+
+def cell_range(cell: str) -> Tuple[str, Optional[str]]:
+    """
+    Межі [від, до) значень grid_cell, що починаються з cell. Діапазон замість
+    LIKE 'cell%': у SQLite LIKE нечутливий до регістру і не йде по індексу.
+    Символи base32 впорядковані однаково в будь-якому порівнянні рядків.
+    """
+    head = cell.rstrip(_BASE32[-1])
+    if not head:
+        return cell, None
+    return cell, head[:-1] + _BASE32[_BASE32.index(head[-1]) + 1]
+
+
+# -----------------------
+# Відстані
+# -----------------------
+def haversine_km(lat: float, lon: float, lats: Sequence[float], lons: Sequence[float]) -> List[float]:
+    """Відстані від точки до кожної з точок (lats[i], lons[i]) одним проходом."""
+    lat0 = radians(lat)
+    lon0 = radians(lon)
+    cos_lat0 = cos(lat0)
+    return [
+        2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(
+            sin((la - lat0) / 2) ** 2 + cos_lat0 * cos(la) * sin((lo - lon0) / 2) ** 2
+        )))
+        for la, lo in zip(map(radians, lats), map(radians, lons))
+    ]
+
+
+# -----------------------
+# Пошук
+# -----------------------
+def nearest_warehouses(
+    lat: float,
+    lon: float,
+    k: int = DEFAULT_LIMIT,
+    radius_km: float = DEFAULT_RADIUS_KM,
+    transport_types: Optional[Iterable[str]] = None,
+    min_capacity_tons: Optional[Decimal] = None,
+) -> List[NearbyWarehouse]:
+    """
+    До k складів у радіусі radius_km від точки, від найближчого.
+
+    :param transport_types: лише склади з цими типами транспорту (Warehouse.TRANSPORT_CHOICES)
+    :param min_capacity_tons: мінімальна ємність складу
+    """
+    from django.db.models import Q
+    from .models import Warehouse
+
+    lat, lon = float(lat), float(lon)
+    candidates = Warehouse.objects.filter(grid_cell__isnull=False)
+    precision = search_precision(lat, radius_km)
+    if precision:
+        cells = Q()
+        for cell in neighbour_cells(lat, lon, precision):
+            low, high = cell_range(cell)
+            cells |= Q(grid_cell__gte=low, grid_cell__lt=high) if high else Q(grid_cell__gte=low)
+        candidates = candidates.filter(cells)
+    if transport_types:
+        candidates = candidates.filter(transport_type__in=list(transport_types))
+    if min_capacity_tons is not None:
+        candidates = candidates.filter(capacity_tons__gte=min_capacity_tons)
+
+    rows = list(candidates.values_list("pk", "latitude", "longitude"))
+    if not rows:
+        return []
+    pks, lats, lons = zip(*rows)
+    distances = haversine_km(lat, lon, [float(v) for v in lats], [float(v) for v in lons])
+    nearest = heapq.nsmallest(
+        k, ((distance, pk) for distance, pk in zip(distances, pks) if distance <= radius_km),
+    )
+    warehouses = Warehouse.objects.in_bulk([pk for _, pk in nearest])
+    return [NearbyWarehouse(warehouses[pk], distance) for distance, pk in nearest]
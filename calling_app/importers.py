@@ -0,0 +1,382 @@
+"""
+Імпорт реєстрових вибірок компаній (CSV/XLSX) порціями з bulk upsert.
+
+Файл читається потоково, рядки обробляються порціями по chunk_size:
+нормалізація через checkers, upsert Company по edrpou, створення
+телефонів і контактів та їхніх M2M-зв'язків з компаніями.
+Некоректні рядки записуються у reject-файл (CSV) з причиною.
+"""
+import csv
+import os
+import re
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.db import connection, transaction
+from django.db.models import Max
+
+from . import changelog, ref_cache
+from .checkers import check_area, check_edrpous, check_persons, check_phones
+from .models import Company, ContactPerson, Phone
+from .name_lsh import index_companies
+from .prefix_index import invalidate_company_index
+from .utils import invalidate_companies_cache, touch_companies
+
+
+# Канонічна назва колонки -> можливі заголовки у файлі (в нижньому регістрі)
+COLUMN_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "edrpou": ("єдрпоу", "едрпоу", "edrpou", "код єдрпоу"),
+    "name": ("назва", "назва компанії", "name"),
+    "legal_address": ("юридична адреса", "адреса", "legal_address", "address"),
+    "hectares": ("площа", "площа (га)", "гектари", "hectares", "area"),
+    "phones": ("телефон", "телефони", "phone", "phones"),
+    "full_name": ("контакт", "піб", "full_name", "contact"),
+    "position": ("посада", "position"),
+}
+
+# Поля Company, які оновлюються при конфлікті по edrpou (якщо колонка є у файлі і клітинка непорожня)
+_COMPANY_UPDATE_FIELDS = ("name", "legal_address", "hectares")
+
+_PHONE_SPLIT = re.compile(r"[;,\n]+")
+
+Row = Tuple[int, Dict[str, str], List]  # (номер рядка у файлі, значення по канонічних колонках, сирі значення)
+ContactKey = Tuple[str, str]            # (edrpou компанії, ПІБ контакту)
+
+
+def map_headers(headers: Iterable) -> Dict[int, str]:
+    """
+    Повертає словник індекс колонки -> канонічна назва для відомих заголовків.
+    """
+    lookup = {alias: name for name, aliases in COLUMN_ALIASES.items() for alias in aliases}
+    mapping = {}
+    for index, header in enumerate(headers):
+        name = lookup.get(str(header or "").strip().lower())
+        if name and name not in mapping.values():
+            mapping[index] = name
+    return mapping
+
+
+def iter_file_rows(path: str) -> Tuple[List[str], Iterator[Row]]:
+    """
+    Потоково читає CSV або XLSX (усі вкладки, що мають колонку ЄДРПОУ).
+    Повертає (заголовки, ітератор рядків).
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".xlsx", ".xlsm"):
+        return _iter_xlsx(path)
+    return _iter_csv(path)
+
+
+def _iter_csv(path: str) -> Tuple[List[str], Iterator[Row]]:
+    f = open(path, encoding="utf-8-sig", newline="")
+    sample = f.read(4096)
+    f.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.reader(f, dialect)
+    headers = next(reader, [])
+    mapping = map_headers(headers)
+
+    def rows() -> Iterator[Row]:
+        with f:
+            for number, values in enumerate(reader, start=2):
+                yield number, {name: values[i] if i < len(values) else None for i, name in mapping.items()}, values
+
+    return headers, rows()
+
+
+def _iter_xlsx(path: str) -> Tuple[List[str], Iterator[Row]]:
+    try:
+        import openpyxl
+    except ImportError as exc:
+        raise ValueError("Для імпорту XLSX потрібен пакет openpyxl (pip install -r requirements.txt)") from exc
+
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    first = wb.worksheets[0]
+    headers = [cell for cell in next(first.iter_rows(max_row=1, values_only=True), ())]
+
+    def rows() -> Iterator[Row]:
+        try:
+            for sheet in wb.worksheets:
+                sheet_rows = sheet.iter_rows(values_only=True)
+                sheet_headers = next(sheet_rows, ())
+                mapping = map_headers(sheet_headers)
+                if "edrpou" not in mapping.values():
+                    continue  # вкладка без ЄДРПОУ — пропускаємо
+                for number, values in enumerate(sheet_rows, start=2):
+                    values = list(values)
+                    yield number, {name: values[i] if i < len(values) else None for i, name in mapping.items()}, values
+        finally:
+            wb.close()
+
+    return [str(h) if h is not None else "" for h in headers], rows()
+
+
+def _chunks(iterable: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _clean(value) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+class RejectWriter:
+    """
+    Лінивий CSV-запис відхилених рядків: файл створюється лише при першій відмові.
+    """
+
+    def __init__(self, path: Optional[str], headers: List[str]):
+        self.path = path
+        self.headers = headers
+        self.count = 0
+        self._file = None
+        self._writer = None
+
+    def write(self, number: int, reason: str, values: List) -> None:
+        self.count += 1
+        if not self.path:
+            return
+        if self._writer is None:
+            self._file = open(self.path, "w", encoding="utf-8-sig", newline="")
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(["row", "reason", *self.headers])
+        self._writer.writerow([number, reason, *values])
+
+    def close(self) -> None:
+        if self._file:
+            self._file.close()
+
+
+def normalize_chunk(rows: List[Row], reject: RejectWriter) -> Dict[str, dict]:
+    """
+    Нормалізує порцію рядків колонками через пакетні функції checkers.
+    Повертає словник edrpou -> дані компанії
+    (при повторі ЄДРПОУ в порції перемагає останнє непорожнє значення кожного поля,
+    телефони і контакти об'єднуються).
+    """
+    edrpous, edrpou_errors = check_edrpous(_clean(data.get("edrpou")) for _, data, _ in rows)
+    full_names = [_clean(data.get("full_name")) for _, data, _ in rows]
+    contacts, _ = check_persons(full_names)
+
+    # усі телефони порції нормалізуються одним викликом, далі розкладаються по рядках
+    raw_phones = [
+        [p.strip() for p in _PHONE_SPLIT.split(_clean(data.get("phones")) or "") if p.strip()]
+        for _, data, _ in rows
+    ]
+    phones_flat, phone_errors_flat = check_phones(p for row_phones in raw_phones for p in row_phones)
+
+    companies: Dict[str, dict] = {}
+    offset = 0
+    max_name = Company._meta.get_field("name").max_length
+    for i, (number, data, values) in enumerate(rows):
+        row_phones = raw_phones[i]
+        phones = phones_flat[offset:offset + len(row_phones)]
+        phone_errors = phone_errors_flat[offset:offset + len(row_phones)]
+        offset += len(row_phones)
+
+        if edrpou_errors[i]:
+            reject.write(number, f"некоректний ЄДРПОУ: {_clean(data.get('edrpou'))}", values)
+            continue
+
+        name = _clean(data.get("name"))
+        if "name" in data and not name:
+            reject.write(number, "порожня назва", values)
+            continue
+        if name and len(name) > max_name:
+            reject.write(number, "назва довша за допустиму", values)
+            continue
+
+        for raw_phone, bad in zip(row_phones, phone_errors):
+            if bad:
+                # компанію імпортуємо, а некоректний телефон фіксуємо окремо
+                reject.write(number, f"некоректний телефон: {raw_phone}", values)
+
+        contact = contacts[i] if full_names[i] else None
+        item = companies.setdefault(
+            edrpous[i], {"name": None, "legal_address": None, "hectares": None, "phones": [], "contacts": []},
+        )
+        values_by_field = {
+            "name": name,
+            "legal_address": _clean(data.get("legal_address")),
+            "hectares": check_area(data.get("hectares")) if _clean(data.get("hectares")) else None,
+        }
+        # порожня клітинка повторного рядка не затирає значення з попереднього
+        item.update({field: value for field, value in values_by_field.items() if value is not None})
+        if contact:
+            item["contacts"].append((contact, _clean(data.get("position"))))
+        item["phones"].extend((phone, contact) for phone in phones if phone)
+    return companies
+
+
+def _upsert_companies(companies: Dict[str, dict], columns: set) -> Dict[str, int]:
+    columns_to_update = [f for f in _COMPANY_UPDATE_FIELDS if f in columns]
+    existing = set(Company.objects.filter(edrpou__in=companies.keys()).values_list("edrpou", flat=True))
+    # порожня клітинка не затирає наявне значення: компанії групуються за набором
+    # непорожніх полів, і upsert кожної групи оновлює лише їх
+    groups: Dict[Tuple[str, ...], List[Company]] = {}
+    for edrpou, data in companies.items():
+        update_fields = tuple(f for f in columns_to_update if data[f] is not None)
+        groups.setdefault(update_fields, []).append(Company(
+            edrpou=edrpou, name=data["name"] or edrpou, legal_address=data["legal_address"], hectares=data["hectares"],
+        ))
+    updated = set()
+    for update_fields, objs in groups.items():
+        if update_fields:
+            kwargs = {"update_conflicts": True, "update_fields": list(update_fields)}
+            if connection.features.supports_update_conflicts_with_target:
+                kwargs["unique_fields"] = ["edrpou"]
+            Company.objects.bulk_create(objs, **kwargs)
+            updated.update(obj.edrpou for obj in objs if obj.edrpou in existing)
+        else:
+            Company.objects.bulk_create(objs, ignore_conflicts=True)
+    saved = list(Company.objects.filter(edrpou__in=companies.keys()))
+    # bulk_create не викликає post_save, тож LSH-індекс назв і журнал змін оновлюємо тут
+    index_companies((company.pk, company.name) for company in saved)
+    changelog.record_many([c for c in saved if c.edrpou not in existing], "create")
+    changelog.record_many([c for c in saved if c.edrpou in updated], "update")
+    return {company.edrpou: company.pk for company in saved}
+
+
+def _create_contacts(contacts: List[ContactPerson]) -> List[ContactPerson]:
+    """bulk_create з id створених контактів (MySQL їх не повертає — дочитуються одним SELECT)."""
+    if connection.features.can_return_rows_from_bulk_insert:
+        return ContactPerson.objects.bulk_create(contacts)
+    last_pk = ContactPerson.objects.aggregate(last=Max("pk"))["last"] or 0
+    ContactPerson.objects.bulk_create(contacts)
+    return list(ContactPerson.objects.filter(
+        pk__gt=last_pk, full_name__in={contact.full_name for contact in contacts},
+    ).order_by("pk"))
+
+
+def _upsert_contacts(companies: Dict[str, dict], company_ids: Dict[str, int]) -> Dict[ContactKey, int]:
+    """
+    Контакти порції по (edrpou, ПІБ). Наявний контакт перевикористовується, лише
+    якщо він уже прив'язаний до цієї компанії: однакові ПІБ (і загальні "Офіс")
+    у різних компаніях — різні контакти.
+    """
+    positions = {
+        (edrpou, name): position for edrpou, data in companies.items() for name, position in data["contacts"]
+    }
+    if not positions:
+        return {}
+
+    edrpous = {company_ids[edrpou]: edrpou for edrpou, _ in positions}
+    ids: Dict[ContactKey, int] = {}
+    for company_id, name, pk in ContactPerson.companies.through.objects.filter(
+        company_id__in=edrpous.keys(), contactperson__full_name__in={name for _, name in positions},
+    ).order_by("contactperson_id").values_list("company_id", "contactperson__full_name", "contactperson_id"):
+        ids.setdefault((edrpous[company_id], name), pk)  # як і в формах — перший контакт з таким ПІБ
+
+    missing = [key for key in positions if key not in ids]
+    if missing:
+        created = _create_contacts([ContactPerson(full_name=name, position=positions[edrpou, name]) for edrpou, name in missing])
+        ids.update(zip(missing, (contact.pk for contact in created)))
+        changelog.record_many(created, "create")
+    return ids
+
+
+def _upsert_phones(companies: Dict[str, dict], contact_ids: Dict[ContactKey, int]) -> Dict[str, int]:
+    wanted: Dict[str, Optional[ContactKey]] = {}
+    for edrpou, data in companies.items():
+        for number, contact in data["phones"]:
+            if contact or number not in wanted:
+                wanted[number] = (edrpou, contact) if contact else None
+    if not wanted:
+        return {}
+    existing = set(Phone.objects.filter(number__in=wanted.keys()).values_list("number", flat=True))
+    Phone.objects.bulk_create([Phone(number=number) for number in wanted], ignore_conflicts=True)
+
+    phones = list(Phone.objects.filter(number__in=wanted.keys()))
+    # контакт ставимо лише телефонам без контакту, ручні прив'язки не чіпаємо
+    to_update = []
+    for phone in phones:
+        contact_id = contact_ids.get(wanted[phone.number])
+        if phone.contact_id is None and contact_id:
+            phone.contact_id = contact_id
+            to_update.append(phone)
+    if to_update:
+        Phone.objects.bulk_update(to_update, ["contact"])
+    changelog.record_many([p for p in phones if p.number not in existing], "create")
+    changelog.record_many([p for p in to_update if p.number in existing], "update")
+    return {phone.number: phone.id for phone in phones}
+
+
+def _link_m2m(companies, company_ids, contact_ids, phone_ids) -> None:
+    PhoneCompany = Phone.companies.through
+    ContactCompany = ContactPerson.companies.through
+    phone_links = {
+        (phone_ids[number], company_ids[edrpou])
+        for edrpou, data in companies.items()
+        for number, _ in data["phones"]
+        if number in phone_ids
+    }
+    contact_links = {
+        (contact_ids[edrpou, name], company_ids[edrpou])
+        for edrpou, data in companies.items()
+        for name, _ in data["contacts"]
+        if (edrpou, name) in contact_ids
+    }
+    for model, through, owner_col, links in (
+        (Phone, PhoneCompany, "phone_id", phone_links),
+        (ContactPerson, ContactCompany, "contactperson_id", contact_links),
+    ):
+        if not links:
+            continue
+        # нові зв'язки (без уже наявних) — для журналу змін
+        links -= set(through.objects.filter(
+            **{f"{owner_col}__in": {p for p, _ in links}}, company_id__in={c for _, c in links},
+        ).values_list(owner_col, "company_id"))
+        through.objects.bulk_create(
+            [through(**{owner_col: p, "company_id": c}) for p, c in links], ignore_conflicts=True
+        )
+        changelog.record_links(model, "companies", links, "add")
+
+
+def import_companies(path: str, chunk_size: int = 5000, reject_path: Optional[str] = None) -> Dict[str, int]:
+    """
+    Імпортує компанії з CSV/XLSX. Кожна порція — окрема транзакція,
+    тож у пам'яті одночасно тримається не більше chunk_size рядків.
+
+    :return: статистика {"rows", "companies", "phones", "contacts", "rejected"}
+    """
+    headers, rows = iter_file_rows(path)
+    columns = set(map_headers(headers).values())
+    if "edrpou" not in columns:
+        raise ValueError("У файлі немає колонки ЄДРПОУ")
+
+    reject = RejectWriter(reject_path, headers)
+    stats = {"rows": 0, "companies": 0, "phones": 0, "contacts": 0}
+    try:
+        for chunk in _chunks(rows, chunk_size):
+            stats["rows"] += len(chunk)
+            companies = normalize_chunk(chunk, reject)
+            if not companies:
+                continue
+            with transaction.atomic():
+                company_ids = _upsert_companies(companies, columns)
+                contact_ids = _upsert_contacts(companies, company_ids)
+                phone_ids = _upsert_phones(companies, contact_ids)
+                _link_m2m(companies, company_ids, contact_ids, phone_ids)
+                touch_companies(company_ids.values())
+            stats["companies"] += len(company_ids)
+            stats["phones"] += len(phone_ids)
+            stats["contacts"] += len(contact_ids)
+    finally:
+        reject.close()
+    if stats["companies"]:
+        # bulk_create/bulk_update не надсилають сигналів — кеші скидаються тут, як після dataset.generate
+        ref_cache.invalidate()
+        invalidate_companies_cache()
+        invalidate_company_index()
+    stats["rejected"] = reject.count
+    return stats
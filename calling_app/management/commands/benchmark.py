@@ -0,0 +1,93 @@
+"""
+Бенчмарки пошуку, списку компаній, сторінки компанії, зв'язків і імпорту
+(див. calling_app/benchmarks.py). Запускати на окремій базі зі згенерованими даними.
+
+Приклади:
+    python manage.py benchmark --generate=100000 --save=bench_baseline.json
+    python manage.py benchmark --baseline=bench_baseline.json --suite=search --suite=list
+    python manage.py benchmark --baseline=bench_baseline.json --fail-on-regression
+    python manage.py benchmark --sqlite-profile=compare   # налаштований SQLite проти звичайного
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from calling_app.benchmarks import DEFAULT_THRESHOLD, SUITES, compare, format_comparison, run_suite
+from calling_app.dataset import generate_dataset
+from calling_app.models import Company
+from calling_app.sqlite_profile import use_profile
+
+
+class Command(BaseCommand):
+    help = "Міряє затримку (p50/p95/p99), кількість SQL і пік пам'яті гарячих шляхів; порівнює з baseline."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--suite", action="append", choices=sorted(SUITES), help="Набір випадків (можна кілька)")
+        parser.add_argument("--repeat", type=int, default=10)
+        parser.add_argument("--warmup", type=int, default=1)
+        parser.add_argument("--generate", type=int, default=0, help="Згенерувати N компаній, якщо база порожня")
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--save", default=None, help="Записати результати в JSON")
+        parser.add_argument("--baseline", default=None, help="JSON попереднього запуску для порівняння")
+        parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Допустиме сповільнення p50 (0.2 = 20%%)")
+        parser.add_argument("--fail-on-regression", action="store_true")
+        parser.add_argument(
+            "--sqlite-profile", choices=["tuned", "default", "compare"], default=None,
+            help="SQLite: PRAGMA і FTS профілю; compare — спершу звичайний SQLite як baseline, потім налаштований",
+        )
+
+    def handle(self, *args, **options):
+        if not Company.objects.exists():
+            if not options["generate"]:
+                raise CommandError("База порожня: --generate=N або python manage.py generate_dataset")
+            self.stdout.write(f"Генерація набору даних: {options['generate']} компаній")
+            generate_dataset(options["generate"], options["generate"] * 10, seed=options["seed"])
+
+        baseline = None
+        if options["baseline"]:
+            try:
+                with open(options["baseline"], encoding="utf-8") as f:
+                    baseline = json.load(f)["results"]
+            except (OSError, ValueError, KeyError) as exc:
+                raise CommandError(f"Не вдалося прочитати baseline: {exc}") from exc
+
+        profile = options["sqlite_profile"]
+        if profile and connection.vendor != "sqlite":
+            raise CommandError("--sqlite-profile лише для SQLite (DB_ENGINE=sqlite)")
+
+        def run(profile_name=None):
+            def suite():
+                return run_suite(
+                    options["suite"], repeat=max(1, options["repeat"]), warmup=max(0, options["warmup"]),
+                    progress=self.stdout.write,
+                )
+            if not profile_name:
+                return suite()
+            self.stdout.write(f"\nSQLite: профіль {profile_name}")
+            with use_profile(profile_name):
+                return suite()
+
+        if profile == "compare":
+            baseline = run("default")
+            results = run("tuned")
+        else:
+            results = run(profile)
+
+        if options["save"]:
+            with open(options["save"], "w", encoding="utf-8") as f:
+                json.dump({"companies": Company.objects.count(), "results": results}, f, ensure_ascii=False, indent=2)
+            self.stdout.write(f"Результати збережено у {options['save']}")
+
+        if baseline is None:
+            return
+        rows = compare(results, baseline, options["threshold"])
+        self.stdout.write("\nПорівняння з baseline (p50):")
+        for row in rows:
+            line = format_comparison(row)
+            self.stdout.write(self.style.ERROR(line) if row["regression"] else line)
+        regressions = [row["name"] for row in rows if row["regression"]]
+        if regressions and options["fail_on_regression"]:
+            raise CommandError(f"Регресії: {', '.join(regressions)}")
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS("✅ Регресій немає"))
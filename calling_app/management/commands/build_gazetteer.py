@@ -0,0 +1,38 @@
+"""
+Побудова довідника область -> райони з адрес компаній.
+
+Приклади:
+    python manage.py build_gazetteer
+    python manage.py build_gazetteer --database=old --table=companies --column=address --workers=4
+    python scripts/region_add.py
+"""
+from django.core.management.base import BaseCommand
+
+from calling_app.address_parser import build_gazetteer, format_report, iter_alias_addresses, write_gazetteer
+
+
+class Command(BaseCommand):
+    help = "Розбирає адреси (паралельно, порціями) і записує regions_districts.json для region_add.py."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default", help="Аліас БД з адресами")
+        parser.add_argument("--table", default=None, help="Довільна таблиця (за замовчуванням Company.legal_address)")
+        parser.add_argument("--column", default=None, help="Колонка з адресою у --table")
+        parser.add_argument("--chunk-size", type=int, default=5000)
+        parser.add_argument("--workers", type=int, default=None, help="Кількість процесів (1 — без пулу)")
+        parser.add_argument("--output", default="regions_districts.json")
+        parser.add_argument("--counts", default=None, help="Окремий JSON з частотами районів")
+        parser.add_argument("--min-count", type=int, default=1, help="Відкинути райони, що трапились рідше")
+
+    def handle(self, *args, **options):
+        chunks = iter_alias_addresses(
+            options["database"], options["table"], options["column"], chunk_size=max(1, options["chunk_size"])
+        )
+        gazetteer, categories, samples = build_gazetteer(chunks, workers=options["workers"])
+        districts = write_gazetteer(gazetteer, options["output"], options["counts"], options["min_count"])
+
+        for line in format_report(categories, samples):
+            self.stdout.write(line)
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {len(gazetteer)} областей, {districts} районів збережено у {options['output']}"
+        ))
@@ -0,0 +1,26 @@
+"""
+Повна перебудова LSH-індексу назв компаній (CompanyNameBand).
+Потрібна після первинного розгортання або масових змін назв поза ORM.
+
+Приклад:
+    python manage.py build_name_index --workers=4
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from calling_app.name_lsh import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Перебудовує MinHash/LSH-індекс назв компаній."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Компаній в одній порції")
+        parser.add_argument("--workers", type=int, default=None, help="Кількість процесів (1 — без пулу)")
+
+    def handle(self, *args, **options):
+        start = time.time()
+        total = rebuild_index(chunk_size=max(1, options["chunk_size"]), workers=options["workers"])
+        self.stdout.write(f"Проіндексовано компаній: {total} ({time.time() - start:.1f} с)")
+        self.stdout.write(self.style.SUCCESS("✅ Індекс назв побудовано"))
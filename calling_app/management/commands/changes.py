@@ -0,0 +1,33 @@
+"""
+Журнал змін після курсора — для синхронізації сховищ без HTTP.
+
+Приклад:
+    python manage.py changes --since=120000 --limit=1000 > delta.jsonl
+    python manage.py changes --since=120000 --all
+Кожен запис — окремий рядок JSON; наступний курсор друкується у stderr.
+"""
+import json
+
+from django.core.management.base import BaseCommand
+
+from calling_app.changelog import DEFAULT_LIMIT, changes_since
+
+
+class Command(BaseCommand):
+    help = "Друкує записи журналу змін після --since (JSON по рядку)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", type=int, default=0, help="Номер останнього прочитаного запису")
+        parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help="Записів за одну порцію")
+        parser.add_argument("--all", action="store_true", help="Читати порціями до кінця журналу")
+
+    def handle(self, *args, **options):
+        since, total = options["since"], 0
+        while True:
+            changes, since, has_more = changes_since(since, options["limit"])
+            for change in changes:
+                self.stdout.write(json.dumps(change, ensure_ascii=False))
+            total += len(changes)
+            if not (options["all"] and has_more):
+                break
+        self.stderr.write(f"Записів: {total}; наступний курсор: --since={since}" + (" (є ще)" if has_more else ""))
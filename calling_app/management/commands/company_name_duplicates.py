@@ -0,0 +1,44 @@
+"""
+Звіт про компанії зі схожими назвами (за LSH-індексом, див. build_name_index).
+
+Приклад:
+    python manage.py company_name_duplicates --threshold=0.6 --output=name_dups.csv
+"""
+import csv
+
+from django.core.management.base import BaseCommand
+
+from calling_app.models import Company
+from calling_app.name_lsh import DEFAULT_THRESHOLD, duplicate_groups
+
+
+class Command(BaseCommand):
+    help = "Шукає групи компаній зі схожими назвами і виводить їх або зберігає у CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Мінімальна схожість (Jaccard)")
+        parser.add_argument("--output", default=None, help="CSV-файл звіту")
+
+    def handle(self, *args, **options):
+        groups = duplicate_groups(threshold=options["threshold"])
+        if options["output"]:
+            f = open(options["output"], "w", encoding="utf-8-sig", newline="")
+            writer = csv.writer(f)
+            writer.writerow(["group", "similarity", "edrpou", "name"])
+
+        try:
+            for number, group in enumerate(groups, start=1):
+                companies = Company.objects.filter(id__in=group["ids"]).order_by("id").values_list("edrpou", "name")
+                if options["output"]:
+                    writer.writerows([number, group["similarity"], edrpou, name] for edrpou, name in companies)
+                else:
+                    self.stdout.write(f"#{number} (схожість ≥ {group['similarity']})")
+                    for edrpou, name in companies:
+                        self.stdout.write(f"    {edrpou}  {name}")
+        finally:
+            if options["output"]:
+                f.close()
+
+        self.stdout.write(f"Груп схожих назв: {len(groups)}")
+        if options["output"]:
+            self.stdout.write(self.style.SUCCESS(f"✅ Звіт збережено у {options['output']}"))
@@ -0,0 +1,279 @@
+"""
+Пряме копіювання даних між двома аліасами БД (наприклад, SQLite → MySQL).
+
+Замінює ланцюжок `sqlite3 .dump` → `scripts/clean_dump_2.py` → `mysql`:
+- таблиці копіюються в порядку залежностей (спершу ті, на які посилаються FK);
+- читання з джерела йде паралельно кількома потоками, порціями по --batch-size;
+- запис у ціль — багаторядковими INSERT з вимкненою перевіркою FK;
+- значення конвертуються через метадані полів моделей (а не регулярками по SQL);
+- наприкінці звіряються кількість рядків і контрольні суми кожної таблиці.
+
+Приклад:
+    python manage.py migrate --database=target
+    python manage.py copy_db --source=old --target=default --truncate
+"""
+import hashlib
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple, Type
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connections, router, transaction
+from django.db.models import Model
+
+_DONE = object()
+
+
+def _dependency_order(models: List[Type[Model]]) -> List[Type[Model]]:
+    """
+    Топологічне сортування моделей за FK: модель іде після всіх моделей,
+    на які вона посилається. Самопосилання ігноруються.
+    """
+    selected = set(models)
+    deps = {
+        model: {
+            field.related_model
+            for field in model._meta.concrete_fields
+            if field.remote_field and field.related_model in selected and field.related_model is not model
+        }
+        for model in models
+    }
+    ordered: List[Type[Model]] = []
+    done = set()
+    while len(ordered) < len(models):
+        ready = sorted(
+            (m for m in models if m not in done and deps[m] <= done),
+            key=lambda m: m._meta.db_table,
+        )
+        if not ready:
+            # цикл залежностей — FK все одно вимкнені, додаємо решту як є
+            ready = sorted((m for m in models if m not in done), key=lambda m: m._meta.db_table)
+        for model in ready:
+            ordered.append(model)
+            done.add(model)
+    return ordered
+
+
+def _get_models(app_labels: List[str], target: str) -> List[Type[Model]]:
+    models = []
+    for model in apps.get_models(include_auto_created=True):
+        opts = model._meta
+        if opts.proxy or not opts.managed:
+            continue
+        if app_labels and opts.app_label not in app_labels:
+            continue
+        if not router.allow_migrate_model(target, model):
+            continue
+        models.append(model)
+    return _dependency_order(models)
+
+
+def _row_digest(digest, row: tuple) -> None:
+    digest.update("\x1f".join("\x00" if v is None else str(v) for v in row).encode("utf-8"))
+    digest.update(b"\x1e")
+
+
+def _scan_table(
+    alias: str,
+    model: Type[Model],
+    batch_size: int,
+    on_batch: Optional[Callable[[List[tuple]], None]] = None,
+) -> Tuple[int, str]:
+    """
+    Читає таблицю моделі порціями, впорядковано за pk, конвертуючи сирі
+    значення у python-типи через конвертери полів. Повертає (кількість рядків, sha256).
+    """
+    connection = connections[alias]
+    opts = model._meta
+    fields = opts.concrete_fields
+    qn = connection.ops.quote_name
+    cols = [field.get_col(opts.db_table) for field in fields]
+    converters = [connection.ops.get_db_converters(col) + col.get_db_converters(connection) for col in cols]
+
+    sql = "SELECT {} FROM {} ORDER BY {}".format(
+        ", ".join(qn(f.column) for f in fields), qn(opts.db_table), qn(opts.pk.column)
+    )
+    digest = hashlib.sha256()
+    count = 0
+    with connection.cursor() as cursor:
+        cursor.execute(sql)
+        while True:
+            raw = cursor.fetchmany(batch_size)
+            if not raw:
+                break
+            rows = []
+            for raw_row in raw:
+                row = []
+                for value, field_converters, col in zip(raw_row, converters, cols):
+                    for converter in field_converters:
+                        value = converter(value, col, connection)
+                    row.append(value)
+                row = tuple(row)
+                _row_digest(digest, row)
+                rows.append(row)
+            count += len(rows)
+            if on_batch is not None:
+                on_batch(rows)
+    return count, digest.hexdigest()
+
+
+def _scan_table_in_thread(alias: str, model: Type[Model], batch_size: int, on_batch=None) -> Tuple[int, str]:
+    """
+    Те саме, що _scan_table, але для робочого потоку: закриває власне
+    (thread-local) з'єднання після читання.
+    """
+    try:
+        return _scan_table(alias, model, batch_size, on_batch)
+    finally:
+        connections[alias].close()
+
+
+def _insert_rows(alias: str, model: Type[Model], rows: List[tuple], batch_size: int) -> None:
+    """
+    Вставляє рядки багаторядковими INSERT ... VALUES (...), (...).
+    Розмір порції обмежується лімітом параметрів бекенду.
+    """
+    connection = connections[alias]
+    opts = model._meta
+    fields = opts.concrete_fields
+    qn = connection.ops.quote_name
+    size = max(1, min(batch_size, connection.ops.bulk_batch_size(fields, rows)))
+    head = "INSERT INTO {} ({}) VALUES ".format(qn(opts.db_table), ", ".join(qn(f.column) for f in fields))
+    placeholders = "(" + ", ".join(["%s"] * len(fields)) + ")"
+
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), size):
+            chunk = rows[start:start + size]
+            params = [
+                field.get_db_prep_save(value, connection=connection)
+                for row in chunk
+                for field, value in zip(fields, row)
+            ]
+            cursor.execute(head + ", ".join([placeholders] * len(chunk)), params)
+
+
+class Command(BaseCommand):
+    help = "Копіює дані з однієї БД (аліас) в іншу багаторядковими INSERT з перевіркою контрольних сум."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--source", required=True, help="Аліас БД-джерела з settings.DATABASES")
+        parser.add_argument("--target", default="default", help="Аліас БД-цілі (схема вже має бути змігрована)")
+        parser.add_argument("--apps", nargs="*", default=[], help="Обмежити копіювання вказаними застосунками")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Рядків в одному INSERT")
+        parser.add_argument("--workers", type=int, default=4, help="Кількість паралельних читачів")
+        parser.add_argument("--truncate", action="store_true", help="Очистити таблиці цілі перед копіюванням")
+        parser.add_argument("--skip-verify", action="store_true", help="Не звіряти кількість рядків і контрольні суми")
+
+    def handle(self, *args, **options):
+        source, target = options["source"], options["target"]
+        for alias in (source, target):
+            if alias not in connections.settings:
+                raise CommandError(f"Аліас БД '{alias}' не налаштований у DATABASES")
+        if source == target:
+            raise CommandError("Джерело і ціль мають бути різними аліасами")
+
+        batch_size = max(1, options["batch_size"])
+        workers = max(1, options["workers"])
+        models = _get_models(options["apps"], target)
+        target_conn = connections[target]
+
+        with target_conn.constraint_checks_disabled():
+            if options["truncate"]:
+                self._truncate(target, models)
+            source_stats = self._copy(source, target, models, batch_size, workers)
+            with target_conn.cursor() as cursor:
+                for sql in target_conn.ops.sequence_reset_sql(no_style(), models):
+                    cursor.execute(sql)
+
+        target_conn.check_constraints(table_names=[m._meta.db_table for m in models])
+
+        if options["skip_verify"]:
+            self.stdout.write(self.style.SUCCESS("✅ Копіювання завершено (без перевірки)"))
+            return
+        self._verify(target, models, source_stats, batch_size, workers)
+
+    def _truncate(self, target: str, models: List[Type[Model]]) -> None:
+        connection = connections[target]
+        qn = connection.ops.quote_name
+        with transaction.atomic(using=target), connection.cursor() as cursor:
+            for model in reversed(models):
+                cursor.execute(f"DELETE FROM {qn(model._meta.db_table)}")
+
+    def _copy(
+        self, source: str, target: str, models: List[Type[Model]], batch_size: int, workers: int
+    ) -> Dict[str, Tuple[int, str]]:
+        """
+        Читачі стартують у порядку залежностей і кладуть порції в обмежені черги,
+        а основний потік пише таблиці строго в тому ж порядку. Оскільки пул бере
+        задачі FIFO, таблиця, яку зараз пише основний потік, завжди вже читається.
+        """
+        stop = threading.Event()
+        queues = {model: queue.Queue(maxsize=4) for model in models}
+
+        def put(q: queue.Queue, item) -> None:
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.5)
+                    return
+                except queue.Full:
+                    continue
+
+        def read(model):
+            q = queues[model]
+            try:
+                put(q, _scan_table_in_thread(source, model, batch_size, on_batch=lambda rows: put(q, rows)))
+            except BaseException as exc:  # передаємо помилку в основний потік
+                put(q, exc)
+            put(q, _DONE)
+
+        stats: Dict[str, Tuple[int, str]] = {}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for model in models:
+                pool.submit(read, model)
+            try:
+                for model in models:
+                    table = model._meta.db_table
+                    q = queues[model]
+                    with transaction.atomic(using=target):
+                        while True:
+                            item = q.get()
+                            if item is _DONE:
+                                break
+                            if isinstance(item, BaseException):
+                                raise CommandError(f"Помилка читання {table}: {item}") from item
+                            if isinstance(item, tuple):
+                                stats[table] = item
+                                continue
+                            _insert_rows(target, model, item, batch_size)
+                    self.stdout.write(f"[COPY] {table}: {stats.get(table, (0, ''))[0]} рядків")
+            finally:
+                stop.set()
+        return stats
+
+    def _verify(
+        self,
+        target: str,
+        models: List[Type[Model]],
+        source_stats: Dict[str, Tuple[int, str]],
+        batch_size: int,
+        workers: int,
+    ) -> None:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {m._meta.db_table: pool.submit(_scan_table_in_thread, target, m, batch_size) for m in models}
+            target_stats = {table: future.result() for table, future in futures.items()}
+
+        mismatched = []
+        for table, (count, checksum) in target_stats.items():
+            src_count, src_checksum = source_stats[table]
+            if (count, checksum) != (src_count, src_checksum):
+                mismatched.append(table)
+                self.stderr.write(
+                    f"[MISMATCH] {table}: джерело {src_count} рядків ({src_checksum[:12]}), "
+                    f"ціль {count} рядків ({checksum[:12]})"
+                )
+        if mismatched:
+            raise CommandError(f"Дані не збігаються у {len(mismatched)} таблицях: {', '.join(mismatched)}")
+        self.stdout.write(self.style.SUCCESS(f"✅ Скопійовано і перевірено {len(models)} таблиць"))
@@ -0,0 +1,53 @@
+"""
+Пошук дублікатів телефонів і контактів. Пропозиції злиття записуються у CSV,
+який можна переглянути і передати в merge_duplicates --input.
+
+Приклад:
+    python manage.py find_duplicates --kind=phones --output=phones_dups.csv
+"""
+import csv
+
+from django.core.management.base import BaseCommand
+
+from calling_app.dedup import find_contact_duplicates, find_phone_duplicates
+
+FINDERS = {"phones": find_phone_duplicates, "contacts": find_contact_duplicates}
+CSV_HEADERS = ["keep_id", "merge_ids", "score", "keep", "merge"]
+
+
+def write_proposals(proposals, path):
+    count = 0
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADERS)
+        for p in proposals:
+            writer.writerow([p.keep_id, " ".join(map(str, p.merge_ids)), p.score, p.keep_label, " | ".join(p.merge_labels)])
+            count += 1
+    return count
+
+
+def read_proposals(path):
+    """Повертає список (keep_id, [merge_ids], score) з CSV, створеного find_duplicates."""
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        return [
+            (int(row["keep_id"]), [int(pk) for pk in row["merge_ids"].split()], float(row["score"]))
+            for row in csv.DictReader(f)
+        ]
+
+
+class Command(BaseCommand):
+    help = "Шукає дублікати телефонів або контактів і зберігає пропозиції злиття у CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--kind", choices=FINDERS.keys(), default="phones")
+        parser.add_argument("--output", default=None, help="CSV-файл пропозицій (за замовчуванням <kind>_duplicates.csv)")
+        parser.add_argument("--min-score", type=float, default=None, help="Мінімальна оцінка схожості")
+
+    def handle(self, *args, **options):
+        kind = options["kind"]
+        output = options["output"] or f"{kind}_duplicates.csv"
+        kwargs = {"min_score": options["min_score"]} if options["min_score"] is not None else {}
+
+        count = write_proposals(FINDERS[kind](**kwargs), output)
+        self.stdout.write(f"Груп дублікатів: {count}")
+        self.stdout.write(self.style.SUCCESS(f"✅ Пропозиції збережено у {output}"))
@@ -0,0 +1,49 @@
+"""
+Синтетичний набір даних для навантажувальних тестів (див. calling_app/dataset.py).
+
+Приклади:
+    python manage.py generate_dataset --companies=10000
+    python manage.py generate_dataset --companies=1000000 --calls=10000000 --seed=42 --batch-size=10000
+    python manage.py build_name_index
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from calling_app.dataset import DEFAULT_BATCH_SIZE, generate_dataset
+from calling_app.models import Company
+
+
+class Command(BaseCommand):
+    help = "Генерує компанії, контакти, телефони, дзвінки, плани і склади з фіксованим seed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--companies", type=int, default=10000)
+        parser.add_argument("--calls", type=int, default=None, help="За замовчуванням — 10 на компанію")
+        parser.add_argument("--plans-ratio", type=float, default=0.3, help="Частка компаній з плановим дзвінком")
+        parser.add_argument("--warehouses", type=int, default=None, help="За замовчуванням — 1 на 100 компаній")
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument("--append", action="store_true", help="Дозволити генерацію в непорожню базу")
+
+    def handle(self, *args, **options):
+        if Company.objects.exists() and not options["append"]:
+            raise CommandError("У базі вже є компанії. Генератор — для тестової бази; --append, щоб додати.")
+
+        companies = max(0, options["companies"])
+        calls = companies * 10 if options["calls"] is None else max(0, options["calls"])
+        start = time.time()
+        created = generate_dataset(
+            companies,
+            calls,
+            seed=options["seed"],
+            plans_ratio=options["plans_ratio"],
+            warehouses=options["warehouses"],
+            batch_size=max(1, options["batch_size"]),
+            progress=self.stdout.write,
+        )
+        for label, count in created.items():
+            self.stdout.write(f"{label}: {count}")
+        self.stdout.write(f"Час: {time.time() - start:.1f} с")
+        self.stdout.write("Індекс назв для пошуку дублікатів: python manage.py build_name_index")
+        self.stdout.write(self.style.SUCCESS("✅ Набір даних згенеровано"))
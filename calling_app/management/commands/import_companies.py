@@ -0,0 +1,36 @@
+"""
+Імпорт компаній з реєстрових вибірок (CSV/XLSX).
+
+Приклад:
+    python manage.py import_companies registry.xlsx --chunk-size=5000 --reject=rejected.csv
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from calling_app.importers import import_companies
+
+
+class Command(BaseCommand):
+    help = "Імпортує компанії, телефони та контакти з CSV/XLSX з bulk upsert по ЄДРПОУ."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Шлях до CSV або XLSX файлу")
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Рядків в одній транзакції")
+        parser.add_argument("--reject", default=None, help="CSV-файл для відхилених рядків")
+
+    def handle(self, *args, **options):
+        start = time.time()
+        try:
+            stats = import_companies(options["path"], chunk_size=max(1, options["chunk_size"]), reject_path=options["reject"])
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc)) from exc
+
+        elapsed = time.time() - start
+        self.stdout.write(
+            f"Рядків: {stats['rows']}, компаній: {stats['companies']}, телефонів: {stats['phones']}, "
+            f"контактів: {stats['contacts']}, відхилено: {stats['rejected']} ({elapsed:.1f} с)"
+        )
+        if stats["rejected"] and options["reject"]:
+            self.stdout.write(f"Відхилені рядки збережено у {options['reject']}")
+        self.stdout.write(self.style.SUCCESS("✅ Імпорт завершено"))
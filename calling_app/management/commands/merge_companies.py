@@ -0,0 +1,62 @@
+"""
+Злиття компаній-дублікатів: усі зв'язки дубліката переносяться на основну компанію.
+
+Пари задаються як ОСНОВНА:ДУБЛІКАТ (ЄДРПОУ) або CSV-файлом з колонками keep,merge.
+Приклади:
+    python manage.py merge_companies 12345678:87654321 12345678:11111111
+    python manage.py merge_companies --input=pairs.csv --dry-run
+"""
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from calling_app.checkers import check_edrpou
+from calling_app.merge import group_pairs, merge_company_pairs
+from calling_app.models import Company
+
+
+class Command(BaseCommand):
+    help = "Зливає компанії-дублікати, переносячи всі зв'язки на основну компанію."
+
+    def add_arguments(self, parser):
+        parser.add_argument("pairs", nargs="*", help="Пари ЄДРПОУ у форматі ОСНОВНА:ДУБЛІКАТ")
+        parser.add_argument("--input", default=None, help="CSV з колонками keep,merge (ЄДРПОУ)")
+        parser.add_argument("--dry-run", action="store_true", help="Лише показати групи злиття")
+
+    def _read_pairs(self, options):
+        pairs = []
+        for item in options["pairs"]:
+            keep, sep, merge = item.partition(":")
+            if not sep:
+                raise CommandError(f"Невірний формат пари: {item} (очікується ОСНОВНА:ДУБЛІКАТ)")
+            pairs.append((keep, merge))
+        if options["input"]:
+            try:
+                with open(options["input"], encoding="utf-8-sig", newline="") as f:
+                    pairs.extend((row["keep"], row["merge"]) for row in csv.DictReader(f))
+            except (OSError, KeyError) as exc:
+                raise CommandError(f"Не вдалося прочитати {options['input']}: {exc}") from exc
+        return [(check_edrpou(keep.strip()), check_edrpou(merge.strip())) for keep, merge in pairs]
+
+    def handle(self, *args, **options):
+        pairs = self._read_pairs(options)
+        if not pairs:
+            raise CommandError("Не задано жодної пари")
+
+        ids = dict(Company.objects.filter(edrpou__in={e for pair in pairs for e in pair}).values_list("edrpou", "id"))
+        missing = sorted({e for pair in pairs for e in pair} - ids.keys())
+        if missing:
+            raise CommandError(f"Компанії не знайдено: {', '.join(missing)}")
+
+        id_pairs = [(ids[keep], ids[merge]) for keep, merge in pairs]
+        if options["dry_run"]:
+            edrpous = {pk: edrpou for edrpou, pk in ids.items()}
+            groups = group_pairs(id_pairs)
+            for keep_id, loser_ids in groups.items():
+                self.stdout.write(f"{edrpous[keep_id]} <- {', '.join(edrpous[pk] for pk in loser_ids)}")
+            self.stdout.write(f"Буде злито груп: {len(groups)}")
+            return
+
+        groups = merge_company_pairs(id_pairs)
+        self.stdout.write(f"Злито груп: {len(groups)}, компаній: {sum(len(v) for v in groups.values())}")
+        self.stdout.write(self.style.SUCCESS("✅ Злиття завершено"))
@@ -0,0 +1,52 @@
+"""
+Злиття дублікатів телефонів або контактів за пропозиціями find_duplicates.
+Зв'язки (Phone.contact, Call.phone, CallPlan.phone, M2M з компаніями)
+переносяться set-based оновленнями, кожна група — окрема транзакція.
+
+Приклад:
+    python manage.py merge_duplicates --kind=phones --input=phones_dups.csv --dry-run
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from calling_app.merge import merge_contacts, merge_phones
+
+from .find_duplicates import FINDERS, read_proposals
+
+MERGERS = {"phones": merge_phones, "contacts": merge_contacts}
+
+
+class Command(BaseCommand):
+    help = "Зливає дублікати телефонів або контактів, переносячи всі зв'язки на основний запис."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--kind", choices=MERGERS.keys(), default="phones")
+        parser.add_argument("--input", default=None, help="CSV з find_duplicates (без нього пропозиції рахуються заново)")
+        parser.add_argument("--min-score", type=float, default=0.0, help="Пропускати групи з меншою оцінкою")
+        parser.add_argument("--dry-run", action="store_true", help="Лише показати, що буде злито")
+
+    def handle(self, *args, **options):
+        kind = options["kind"]
+        if options["input"]:
+            try:
+                proposals = read_proposals(options["input"])
+            except (OSError, KeyError, ValueError) as exc:
+                raise CommandError(f"Не вдалося прочитати {options['input']}: {exc}") from exc
+        else:
+            proposals = [(p.keep_id, list(p.merge_ids), p.score) for p in FINDERS[kind]()]
+
+        merge = MERGERS[kind]
+        groups = merged = 0
+        for keep_id, merge_ids, score in proposals:
+            if score < options["min_score"] or not merge_ids:
+                continue
+            groups += 1
+            merged += len(merge_ids)
+            if options["dry_run"]:
+                self.stdout.write(f"{keep_id} <- {', '.join(map(str, merge_ids))} ({score})")
+                continue
+            merge(keep_id, merge_ids)
+
+        prefix = "Буде злито" if options["dry_run"] else "Злито"
+        self.stdout.write(f"{prefix}: груп {groups}, записів {merged}")
+        if not options["dry_run"]:
+            self.stdout.write(self.style.SUCCESS("✅ Злиття завершено"))
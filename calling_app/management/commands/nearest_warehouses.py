@@ -0,0 +1,35 @@
+"""
+Найближчі склади до точки (пошук по сітці geohash, див. calling_app/geo.py).
+
+Приклад:
+    python manage.py nearest_warehouses --lat=50.45 --lon=30.52 --radius=30 --transport=rail --min-capacity=5000
+"""
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from calling_app.geo import DEFAULT_LIMIT, DEFAULT_RADIUS_KM, nearest_warehouses
+from calling_app.models import Warehouse
+
+
+class Command(BaseCommand):
+    help = "Друкує до K найближчих складів у радіусі R км від точки."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lat", type=float, required=True)
+        parser.add_argument("--lon", type=float, required=True)
+        parser.add_argument("--radius", type=float, default=DEFAULT_RADIUS_KM, help="Радіус, км")
+        parser.add_argument("-k", type=int, default=DEFAULT_LIMIT, help="Скільки складів показати")
+        parser.add_argument("--transport", action="append", choices=[c for c, _ in Warehouse.TRANSPORT_CHOICES],
+                            help="Тип транспорту (можна кілька разів)")
+        parser.add_argument("--min-capacity", type=Decimal, default=None, help="Мінімальна ємність, т")
+
+    def handle(self, *args, **options):
+        found = nearest_warehouses(
+            options["lat"], options["lon"], k=options["k"], radius_km=options["radius"],
+            transport_types=options["transport"], min_capacity_tons=options["min_capacity"],
+        )
+        for warehouse, distance in found:
+            self.stdout.write(f"{distance:8.2f} км  #{warehouse.pk} {warehouse.name} "
+                              f"({warehouse.capacity_tons} т, {warehouse.transport_type})")
+        self.stdout.write(self.style.SUCCESS(f"Знайдено складів: {len(found)}"))
@@ -0,0 +1,235 @@
+"""
+Злиття дублікатів: перенесення всіх зв'язків з "програвших" записів на
+запис, що залишається, набором SQL-операцій замість циклів по об'єктах.
+
+- зворотні FK (Call.phone, CallPlan.phone, Phone.contact, ...) — один UPDATE
+  `... SET fk = keep WHERE fk IN (losers)` на кожен зв'язок;
+- M2M through-таблиці — INSERT IGNORE ... SELECT з рядків програвших,
+  потім DELETE їхніх рядків.
+
+Перенесені зв'язки сигналів не надсилають, тому в журнал змін пишеться запис
+"update" основного об'єкта з {"merged": [id програвших]}, а компаніям, пов'язаним
+з основним і програвшими записами (зібраним до перенесення), оновлюється updated_at.
+"""
+from typing import Dict, Iterable, List, Sequence, Tuple, Type
+
+from django.db import connections, router, transaction
+from django.db.models import Count, Min, Model, Sum
+from django.db.models.constants import OnConflict
+
+from . import changelog
+from .checkers import check_phone
+from .models import Call, Company, CompanyNameBand, ContactPerson, Phone, StockItem
+from .name_lsh import index_companies
+from .utils import touch_companies
+
+
+def _through_fk(through: Type[Model], model: Type[Model]):
+    """Поле through-моделі, що посилається на model."""
+    return next(f for f in through._meta.concrete_fields if f.remote_field and f.related_model is model)
+
+
+def _other_fk(through: Type[Model], own_field):
+    return next(f for f in through._meta.concrete_fields if f.remote_field and f is not own_field)
+
+
+def rewire_m2m(through: Type[Model], model: Type[Model], keep_id: int, loser_ids: List[int]) -> None:
+    """
+    Переносить рядки through-таблиці з loser_ids на keep_id.
+    Дублікати (keep вже пов'язаний з тим самим об'єктом) ігноруються
+    засобами БД: INSERT IGNORE (MySQL) / INSERT OR IGNORE (SQLite).
+    """
+    alias = router.db_for_write(through)
+    connection = connections[alias]
+    qn = connection.ops.quote_name
+    own = _through_fk(through, model)
+    other = _other_fk(through, own)
+    table = qn(through._meta.db_table)
+    placeholders = ", ".join(["%s"] * len(loser_ids))
+    sql = "{insert} {table} ({own}, {other}) SELECT DISTINCT %s, {other} FROM {table} WHERE {own} IN ({ids}) {suffix}".format(
+        insert=connection.ops.insert_statement(on_conflict=OnConflict.IGNORE),
+        table=table,
+        own=qn(own.column),
+        other=qn(other.column),
+        ids=placeholders,
+        suffix=connection.ops.on_conflict_suffix_sql([], OnConflict.IGNORE, None, None),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [keep_id, *loser_ids])
+    through.objects.using(alias).filter(**{f"{own.attname}__in": loser_ids}).delete()
+
+
+def linked_company_ids(model: Type[Model], ids: Iterable[int]) -> set:
+    """
+    Компанії, на сторінках яких видно телефони/контакти ids: через M2M з компаніями,
+    а для телефонів — ще й через їхні дзвінки, для контактів — через їхні телефони.
+    """
+    ids = list(ids)
+    through = (Phone.companies if model is Phone else ContactPerson.companies).through
+    company_ids = set(through.objects.filter(**{f"{_through_fk(through, model).attname}__in": ids})
+                      .values_list("company_id", flat=True))
+    if model is Phone:
+        company_ids |= set(Call.company.through.objects.filter(call__phone_id__in=ids).values_list("company_id", flat=True))
+    else:
+        company_ids |= linked_company_ids(Phone, Phone.objects.filter(contact_id__in=ids).values_list("pk", flat=True))
+    return company_ids
+
+
+def rewire_relations(
+    model: Type[Model], keep_id: int, loser_ids: Iterable[int], exclude: Sequence[Type[Model]] = ()
+) -> None:
+    """
+    Перенаправляє всі зв'язки моделі (зворотні FK та M2M в обидва боки)
+    з loser_ids на keep_id. Працює за метаданими моделі, тож нові зв'язки
+    підхоплюються автоматично. Моделі з exclude не чіпаються
+    (їхні рядки видаляться каскадом разом з програвшими записами).
+    """
+    loser_ids = [pk for pk in loser_ids if pk != keep_id]
+    if not loser_ids:
+        return
+
+    for rel in model._meta.related_objects:
+        if rel.related_model in exclude:
+            continue
+        if rel.many_to_many:
+            rewire_m2m(rel.through, model, keep_id, loser_ids)
+        elif rel.one_to_many or rel.one_to_one:
+            attname = rel.field.attname
+            rel.related_model._base_manager.filter(**{f"{attname}__in": loser_ids}).update(**{attname: keep_id})
+
+    for field in model._meta.many_to_many:
+        rewire_m2m(field.remote_field.through, model, keep_id, loser_ids)
+
+
+def merge_phones(keep_id: int, loser_ids: Iterable[int]) -> Phone:
+    """
+    Зливає телефони в keep_id: дзвінки, плани та компанії переносяться,
+    контакт береться з дубліката, якщо в основного його немає.
+    Номер основного телефону приводиться до формату check_phone.
+    """
+    loser_ids = [pk for pk in loser_ids if pk != keep_id]
+    with transaction.atomic():
+        keep = Phone.objects.select_for_update().get(pk=keep_id)
+        losers = list(Phone.objects.filter(pk__in=loser_ids).values("contact_id", "status"))
+        company_ids = linked_company_ids(Phone, [keep_id, *loser_ids])
+
+        rewire_relations(Phone, keep_id, loser_ids)
+
+        if keep.contact_id is None:
+            keep.contact_id = next((p["contact_id"] for p in losers if p["contact_id"]), None)
+        if any(p["status"] == "on" for p in losers):
+            keep.status = "on"
+        Phone.objects.filter(pk__in=loser_ids).delete()
+        changelog.record(keep, "update", {"merged": loser_ids})
+
+        normalized = check_phone(keep.number)
+        if normalized and normalized != keep.number and not Phone.objects.filter(number=normalized).exists():
+            keep.number = normalized
+        keep.save()
+        touch_companies(company_ids)
+    return keep
+
+
+def merge_contacts(keep_id: int, loser_ids: Iterable[int]) -> ContactPerson:
+    """
+    Зливає контакти в keep_id: телефони та компанії переносяться,
+    посада береться з дубліката, якщо в основного її немає.
+    """
+    loser_ids = [pk for pk in loser_ids if pk != keep_id]
+    with transaction.atomic():
+        keep = ContactPerson.objects.select_for_update().get(pk=keep_id)
+        positions = list(
+            ContactPerson.objects.filter(pk__in=loser_ids).exclude(position__isnull=True)
+            .exclude(position="").values_list("position", flat=True)
+        )
+        company_ids = linked_company_ids(ContactPerson, [keep_id, *loser_ids])
+
+        rewire_relations(ContactPerson, keep_id, loser_ids)
+
+        if not keep.position and positions:
+            keep.position = positions[0]
+            keep.save(update_fields=["position"])
+        ContactPerson.objects.filter(pk__in=loser_ids).delete()
+        changelog.record(keep, "update", {"merged": loser_ids})
+        touch_companies(company_ids)
+    return keep
+
+
+# Поля компанії, які заповнюються з дубліката, якщо в основної вони порожні
+_COMPANY_FILL_FIELDS = ("legal_address", "hectares", "holding_id", "status_id", "region_id", "district_id")
+
+
+def _merge_stock_items(company_id: int) -> None:
+    """Після злиття в компанії може бути кілька залишків однієї культури — сумуємо їх в один рядок."""
+    duplicates = (
+        StockItem.objects.filter(company_id=company_id).values("crop_id")
+        .annotate(rows=Count("id"), total=Sum("quantity"), first=Min("id")).filter(rows__gt=1)
+    )
+    for item in duplicates:
+        StockItem.objects.filter(pk=item["first"]).update(quantity=item["total"])
+        StockItem.objects.filter(company_id=company_id, crop_id=item["crop_id"]).exclude(pk=item["first"]).delete()
+
+
+def merge_companies(keep_id: int, loser_ids: Iterable[int]) -> Company:
+    """
+    Зливає компанії в keep_id однією транзакцією: телефони, контакти, пошти,
+    дзвінки, плани, склади (власники і клієнти) та залишки переносяться,
+    порожні поля основної компанії заповнюються з дублікатів,
+    залишки однієї культури сумуються, індекс назв оновлюється.
+    """
+    loser_ids = [pk for pk in loser_ids if pk != keep_id]
+    with transaction.atomic():
+        keep = Company.objects.select_for_update().get(pk=keep_id)
+        losers = list(Company.objects.filter(pk__in=loser_ids).order_by("id").values(*_COMPANY_FILL_FIELDS))
+
+        rewire_relations(Company, keep_id, loser_ids, exclude=(CompanyNameBand,))
+        _merge_stock_items(keep_id)
+
+        changed = []
+        for field in _COMPANY_FILL_FIELDS:
+            if getattr(keep, field) in (None, ""):
+                value = next((row[field] for row in losers if row[field] not in (None, "")), None)
+                if value is not None:
+                    setattr(keep, field, value)
+                    changed.append(field)
+        if changed:
+            Company.objects.filter(pk=keep_id).update(**{field: getattr(keep, field) for field in changed})
+        Company.objects.filter(pk__in=loser_ids).delete()
+        touch_companies([keep_id])
+        changelog.record(keep, "update", {**changelog.field_values(keep), "merged": loser_ids})
+        index_companies([(keep.pk, keep.name)])
+    return keep
+
+
+def group_pairs(pairs: Iterable[Tuple[int, int]]) -> Dict[int, List[int]]:
+    """
+    Об'єднує пари (основна, дублікат) у групи з урахуванням ланцюжків:
+    (A, B) і (B, C) -> {A: [B, C]}. Основною в групі стає перша основна з пар.
+    """
+    parent: Dict[int, int] = {}
+
+    def find(x: int) -> int:
+        while parent.setdefault(x, x) != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for keep_id, loser_id in pairs:
+        root_keep, root_loser = find(keep_id), find(loser_id)
+        if root_keep != root_loser:
+            parent[root_loser] = root_keep
+
+    groups: Dict[int, List[int]] = {}
+    for pk in list(parent):
+        root = find(pk)
+        if pk != root:
+            groups.setdefault(root, []).append(pk)
+    return groups
+
+
+def merge_company_pairs(pairs: Iterable[Tuple[int, int]]) -> Dict[int, List[int]]:
+    """Зливає пакет пар (основна, дублікат). Кожна група — окрема транзакція."""
+    groups = group_pairs(pairs)
+    for keep_id, loser_ids in groups.items():
+        merge_companies(keep_id, loser_ids)
+    return groups
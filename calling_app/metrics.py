@@ -0,0 +1,256 @@
+"""
+Метрики застосунку в текстовому форматі Prometheus (/metrics).
+
+- calling_app_request_duration_seconds — гістограма тривалості запитів за url name;
+- calling_app_db_queries_total / calling_app_db_query_seconds_total — SQL за view;
+- calling_app_cache_requests_total — влучання/промахи кешів застосунку
+  (список компаній, довідники, індекси автодоповнення);
+- calling_app_table_rows — розміри таблиць Company/Call/CallPlan, що
+  оновлюються не частіше ніж раз на TABLE_SAMPLE_INTERVAL секунд.
+
+Значення накопичуються в пам'яті процесу. Якщо задано settings.METRICS_DIR,
+кожен процес періодично скидає свої значення у <pid>.json у цій теці, а /metrics
+підсумовує файли всіх воркерів (файли завершених процесів лишаються —
+лічильники монотонні, як у multiprocess-режимі prometheus_client).
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FLUSH_INTERVAL = 1.0
+TABLE_SAMPLE_INTERVAL = 60.0
+TABLES_FILE = "tables.json"
+
+HELP = {
+    "calling_app_request_duration_seconds": ("histogram", "Тривалість обробки запиту"),
+    "calling_app_requests_total": ("counter", "Кількість запитів за статусом відповіді"),
+    "calling_app_db_queries_total": ("counter", "Кількість SQL-запитів"),
+    "calling_app_db_query_seconds_total": ("counter", "Сумарний час SQL-запитів"),
+    "calling_app_cache_requests_total": ("counter", "Звернення до кешів застосунку"),
+    "calling_app_table_rows": ("gauge", "Кількість рядків у таблиці"),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(**labels) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class Registry:
+    """Лічильники і гістограми процесу; ключ — (ім'я метрики, мітки)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        # значення гістограми: [лічильники по кошиках (не кумулятивні) + +Inf, сума, кількість]
+        self.histograms: Dict[Tuple[str, Labels], list] = {}
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        key = (name, _labels(**labels))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = (name, _labels(**labels))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [[0] * (len(LATENCY_BUCKETS) + 1), 0.0, 0]
+            index = next((i for i, bound in enumerate(LATENCY_BUCKETS) if value <= bound), len(LATENCY_BUCKETS))
+            histogram[0][index] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def dump(self) -> dict:
+        with self.lock:
+            return {
+                "counters": [[name, dict(labels), value] for (name, labels), value in self.counters.items()],
+                "histograms": [
+                    [name, dict(labels), list(buckets), total, count]
+                    for (name, labels), (buckets, total, count) in self.histograms.items()
+                ],
+            }
+
+    def merge(self, data: dict) -> None:
+        """Додає до реєстру значення, вивантажені dump() іншого процесу."""
+        with self.lock:
+            for name, labels, value in data.get("counters", []):
+                key = (name, _labels(**labels))
+                self.counters[key] = self.counters.get(key, 0) + value
+            for name, labels, buckets, total, count in data.get("histograms", []):
+                key = (name, _labels(**labels))
+                histogram = self.histograms.setdefault(key, [[0] * (len(LATENCY_BUCKETS) + 1), 0.0, 0])
+                histogram[0] = [a + b for a, b in zip(histogram[0], buckets)]
+                histogram[1] += total
+                histogram[2] += count
+
+
+REGISTRY = Registry()
+_last_flush = 0.0
+
+
+# -----------------------
+# Запис
+# -----------------------
+def observe_request(view: str, method: str, status: int, seconds: float, queries: int, db_seconds: float) -> None:
+    REGISTRY.observe("calling_app_request_duration_seconds", seconds, view=view, method=method)
+    REGISTRY.inc("calling_app_requests_total", view=view, method=method, status=status)
+    REGISTRY.inc("calling_app_db_queries_total", queries, view=view)
+    REGISTRY.inc("calling_app_db_query_seconds_total", db_seconds, view=view)
+    maybe_flush()
+
+
+def cache_hit(cache_name: str) -> None:
+    REGISTRY.inc("calling_app_cache_requests_total", cache=cache_name, result="hit")
+
+
+def cache_miss(cache_name: str) -> None:
+    REGISTRY.inc("calling_app_cache_requests_total", cache=cache_name, result="miss")
+
+
+# -----------------------
+# Кілька процесів
+# -----------------------
+def metrics_dir() -> Optional[Path]:
+    directory = getattr(settings, "METRICS_DIR", None)
+    return Path(directory) if directory else None
+
+
+def _write_json(path: Path, data) -> None:
+    """Атомарний запис: читачі бачать або старий, або новий файл повністю."""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def flush() -> None:
+    global _last_flush
+    directory = metrics_dir()
+    if directory is None:
+        return
+    directory.mkdir(parents=True, exist_ok=True)
+    _write_json(directory / f"{os.getpid()}.json", REGISTRY.dump())
+    _last_flush = time.monotonic()
+
+
+def maybe_flush() -> None:
+    if time.monotonic() - _last_flush >= FLUSH_INTERVAL:
+        flush()
+
+
+atexit.register(flush)
+
+
+def collect() -> Registry:
+    """Реєстр з підсумованими значеннями всіх процесів (або лише поточного)."""
+    directory = metrics_dir()
+    if directory is None:
+        return REGISTRY
+    flush()
+    total = Registry()
+    for path in directory.glob("*.json"):
+        if path.name == TABLES_FILE:
+            continue
+        try:
+            with open(path, encoding="utf-8") as f:
+                total.merge(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return total
+
+
+# -----------------------
+# Розміри таблиць
+# -----------------------
+_tables_sample: dict = {}
+
+
+def table_rows() -> Dict[str, int]:
+    """
+    Кількість рядків Company/Call/CallPlan. Вибірка спільна для процесів
+    (через METRICS_DIR) і робиться не частіше ніж раз на TABLE_SAMPLE_INTERVAL.
+    Великі таблиці — оцінка зі статистики БД, як у EstimatedCountPaginator адмінки,
+    без COUNT(*) по всьому індексу; точний COUNT(*) — лише для малих.
+    """
+    global _tables_sample
+    from .models import Call, CallPlan, Company
+    from .utils import ESTIMATE_MIN_ROWS, estimated_rows
+
+    directory = metrics_dir()
+    path = directory / TABLES_FILE if directory else None
+    if path is not None and path.is_file():
+        try:
+            with open(path, encoding="utf-8") as f:
+                _tables_sample = json.load(f)
+        except (OSError, ValueError):
+            pass
+    if time.time() - _tables_sample.get("sampled_at", 0) < TABLE_SAMPLE_INTERVAL:
+        return _tables_sample["rows"]
+
+    rows = {}
+    for model in (Company, Call, CallPlan):
+        estimate = estimated_rows(model)
+        exact = estimate is None or estimate < ESTIMATE_MIN_ROWS
+        rows[model._meta.db_table] = model.objects.count() if exact else estimate
+    _tables_sample = {"sampled_at": time.time(), "rows": rows}
+    if path is not None:
+        directory.mkdir(parents=True, exist_ok=True)
+        _write_json(path, _tables_sample)
+    return rows
+
+
+# -----------------------
+# Текстовий формат
+# -----------------------
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    labels = list(labels)
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(registry: Registry, tables: Optional[Dict[str, int]] = None) -> str:
+    lines: List[str] = []
+    series: Dict[str, List[str]] = {}
+
+    for (name, labels), value in sorted(registry.counters.items()):
+        series.setdefault(name, []).append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+    for (name, labels), (buckets, total, count) in sorted(registry.histograms.items()):
+        rows = series.setdefault(name, [])
+        cumulative = 0
+        for bound, bucket in zip(LATENCY_BUCKETS + (float("inf"),), buckets):
+            cumulative += bucket
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            rows.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+        rows.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+        rows.append(f"{name}_count{_format_labels(labels)} {count}")
+
+    for table, count in sorted((tables or {}).items()):
+        series.setdefault("calling_app_table_rows", []).append(
+            f"calling_app_table_rows{_format_labels(_labels(table=table))} {count}"
+        )
+
+    for name, rows in series.items():
+        kind, help_text = HELP.get(name, ("untyped", name))
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(rows)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,342 @@
+"""
+Middleware інструментування запитів: SQL-статистика і профайлер на вимогу.
+
+QueryInstrumentationMiddleware
+
+Через connection.execute_wrapper рахує кількість запитів, сумарний час БД,
+повтори однакових запитів (відбитки SQL — ознака N+1) і найповільніші запити.
+Звіт пишеться в лог "calling_app.sql" одним JSON-рядком (WARNING для повільних
+запитів і підозри на N+1) і зберігається в кільцевому буфері для сторінки
+/sql-report/ (лише staff).
+
+Вмикається settings.SQL_INSTRUMENTATION; вимкнене — піднімає MiddlewareNotUsed
+і зовсім не потрапляє в ланцюжок обробки.
+
+MetricsMiddleware
+Тривалість, кількість і час SQL кожного запиту за url name для /metrics
+(див. calling_app/metrics.py).
+
+ProfilerMiddleware
+Для staff-користувача запит з ?_profile=1 або заголовком X-Profile: 1
+виконується під cProfile і tracemalloc. Звіт (найдорожчі функції, місця
+алокацій, SQL-підсумок) і сирий .prof пишуться в settings.PROFILE_DIR;
+список — на сторінці /profiles/. Middleware лише синхронне: під ASGI Django
+сам виконує його і синхронні view в потоці, тож профілюється той самий потік,
+що й під WSGI.
+"""
+import cProfile
+import heapq
+import json
+import logging
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from collections import Counter, deque
+from contextlib import ExitStack
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils.text import slugify
+
+from . import metrics
+
+logger = logging.getLogger("calling_app.sql")
+
+# останні звіти для сторінки sql-report (deque.append потокобезпечний)
+RECENT_REPORTS: deque = deque(maxlen=getattr(settings, "SQL_INSTRUMENTATION_KEEP", 200))
+
+_IN_LIST = re.compile(r"\(\s*%s(?:\s*,\s*%s)+\s*\)")
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+_SPACES = re.compile(r"\s+")
+
+
+def sql_fingerprint(sql: str) -> str:
+    """
+    Нормалізований SQL без значень: параметри вже %s, числа і рядки
+    замінюються на ?, списки IN (...) згортаються.
+    """
+    sql = _IN_LIST.sub("(...)", sql)
+    sql = _LITERALS.sub("?", sql)
+    return _SPACES.sub(" ", sql).strip()
+
+
+class QueryRecorder:
+    """Обгортка для connection.execute_wrapper: збирає статистику запитів."""
+
+    def __init__(self, keep_slowest: int = 5, max_sql_length: int = 500):
+        self.count = 0
+        self.total_ms = 0.0
+        self.fingerprints: Counter = Counter()
+        self.keep_slowest = keep_slowest
+        self.max_sql_length = max_sql_length
+        self._slowest: List[Tuple[float, int, str]] = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.count += 1
+            self.total_ms += elapsed
+            self.fingerprints[sql_fingerprint(sql)] += 1
+            item = (elapsed, self.count, sql[:self.max_sql_length])
+            if len(self._slowest) < self.keep_slowest:
+                heapq.heappush(self._slowest, item)
+            elif elapsed > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, item)
+
+    def duplicates(self, min_count: int = 2) -> List[Tuple[str, int]]:
+        return [(fp, n) for fp, n in self.fingerprints.most_common() if n >= min_count]
+
+    def slowest(self) -> List[Tuple[float, str]]:
+        return [(round(ms, 2), sql) for ms, _, sql in sorted(self._slowest, reverse=True)]
+
+
+def record_queries(recorder) -> ExitStack:
+    stack = ExitStack()
+    for alias in connections:
+        stack.enter_context(connections[alias].execute_wrapper(recorder))
+    return stack
+
+
+class QueryInstrumentationMiddleware:
+    def __init__(self, get_response):
+        if not getattr(settings, "SQL_INSTRUMENTATION", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, "SQL_SLOW_REQUEST_MS", 500)
+        self.duplicate_threshold = getattr(settings, "SQL_DUPLICATE_THRESHOLD", 5)
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with record_queries(recorder):
+            # для StreamingHttpResponse враховуються лише запити до початку віддачі тіла
+            response = self.get_response(request)
+        duration_ms = (time.perf_counter() - start) * 1000
+
+        duplicates = recorder.duplicates(self.duplicate_threshold)
+        report = {
+            "method": request.method,
+            "path": request.get_full_path(),
+            "status": response.status_code,
+            "duration_ms": round(duration_ms, 2),
+            "queries": recorder.count,
+            "db_ms": round(recorder.total_ms, 2),
+            "duplicates": [{"sql": fp, "count": n} for fp, n in duplicates[:5]],
+            "slowest": [{"sql": sql, "ms": ms} for ms, sql in recorder.slowest()],
+            "slow": duration_ms >= self.slow_ms,
+        }
+        RECENT_REPORTS.append(report)
+        level = logging.WARNING if report["slow"] or duplicates else logging.INFO
+        logger.log(level, json.dumps(report, ensure_ascii=False))
+
+        response["Server-Timing"] = f'db;dur={recorder.total_ms:.1f};desc="{recorder.count} queries"'
+        return response
+
+
+# -----------------------
+# Метрики Prometheus
+# -----------------------
+class QueryCounter:
+    """Легка обгортка execute_wrapper: лише кількість і сумарний час запитів."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.count += 1
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        if not getattr(settings, "METRICS_ENABLED", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        start = time.perf_counter()
+        with record_queries(counter):
+            response = self.get_response(request)
+        match = getattr(request, "resolver_match", None)
+        metrics.observe_request(
+            view=(match.url_name or match.view_name) if match else "unmatched",
+            method=request.method,
+            status=response.status_code,
+            seconds=time.perf_counter() - start,
+            queries=counter.count,
+            db_seconds=counter.seconds,
+        )
+        return response
+
+
+# -----------------------
+# Профайлер на вимогу
+# -----------------------
+PROFILE_PARAM = "_profile"
+PROFILE_HEADER = "HTTP_X_PROFILE"
+
+# cProfile і tracemalloc глобальні для процесу — одночасно профілюється один запит
+_profile_lock = threading.Lock()
+
+
+def profile_dir() -> Path:
+    return Path(getattr(settings, "PROFILE_DIR", Path(settings.BASE_DIR) / "profiles"))
+
+
+def _short_path(filename: str) -> str:
+    base = str(settings.BASE_DIR)
+    return os.path.relpath(filename, base) if filename.startswith(base) else filename
+
+
+def top_functions(profiler: cProfile.Profile, limit: int = 30) -> List[dict]:
+    """Функції з найбільшим кумулятивним часом."""
+    stats = pstats.Stats(profiler).stats
+    rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [
+        {
+            "function": f"{_short_path(filename)}:{line}({name})",
+            "calls": nc,
+            "tottime_ms": round(tt * 1000, 2),
+            "cumtime_ms": round(ct * 1000, 2),
+        }
+        for (filename, line, name), (cc, nc, tt, ct, callers) in rows
+    ]
+
+
+def top_allocations(snapshot: tracemalloc.Snapshot, limit: int = 20) -> List[dict]:
+    """Рядки коду, що виділили найбільше пам'яті (ще не звільненої на момент знімка)."""
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    ))
+    return [
+        {
+            "line": f"{_short_path(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+            "size_kb": round(stat.size / 1024, 1),
+            "count": stat.count,
+        }
+        for stat in snapshot.statistics("lineno")[:limit]
+    ]
+
+
+def save_profile(report: dict, profiler: cProfile.Profile) -> str:
+    """Пише <id>.json і <id>.prof у PROFILE_DIR, повертає id профілю."""
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    profile_id = f"{datetime.now():%Y%m%d-%H%M%S-%f}-{slugify(report['path'])[:60] or 'root'}"
+    profiler.dump_stats(directory / f"{profile_id}.prof")
+    with open(directory / f"{profile_id}.json", "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return profile_id
+
+
+def recent_profiles(limit: int = 100) -> List[dict]:
+    """Збережені звіти, новіші першими."""
+    directory = profile_dir()
+    if not directory.is_dir():
+        return []
+    result = []
+    for path in sorted(directory.glob("*.json"), reverse=True)[:limit]:
+        try:
+            with open(path, encoding="utf-8") as f:
+                report = json.load(f)
+        except (OSError, ValueError):
+            continue
+        report["id"] = path.stem
+        result.append(report)
+    return result
+
+
+def profile_file(profile_id: str) -> Optional[Path]:
+    """Шлях до .prof за id (лише з PROFILE_DIR, без виходу за його межі)."""
+    path = profile_dir() / f"{profile_id}.prof"
+    if "/" in profile_id or "\\" in profile_id or profile_id.startswith(".") or not path.is_file():
+        return None
+    return path
+
+
+class ProfilerMiddleware:
+    """
+    Має стояти після AuthenticationMiddleware. Запити без тригера чи не від
+    staff проходять без змін; якщо вже профілюється інший запит — теж.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "PROFILER_ENABLED", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    @staticmethod
+    def wants_profile(request) -> bool:
+        if not (request.GET.get(PROFILE_PARAM) or request.META.get(PROFILE_HEADER)):
+            return False
+        user = getattr(request, "user", None)
+        return bool(user and user.is_active and user.is_staff)
+
+    def __call__(self, request):
+        if not self.wants_profile(request) or not _profile_lock.acquire(blocking=False):
+            return self.get_response(request)
+        try:
+            return self._profile(request)
+        finally:
+            _profile_lock.release()
+
+    def _profile(self, request):
+        recorder = QueryRecorder(keep_slowest=10)
+        profiler = cProfile.Profile()
+        own_tracemalloc = not tracemalloc.is_tracing()
+        if own_tracemalloc:
+            tracemalloc.start(1)
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            with record_queries(recorder):
+                profiler.enable()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    profiler.disable()
+            duration_ms = (time.perf_counter() - start) * 1000
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            if own_tracemalloc:
+                tracemalloc.stop()
+
+        report = {
+            "method": request.method,
+            "path": request.get_full_path(),
+            "status": response.status_code,
+            "user": request.user.get_username(),
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "duration_ms": round(duration_ms, 2),
+            "peak_memory_kb": round(peak / 1024, 1),
+            "sql": {
+                "queries": recorder.count,
+                "db_ms": round(recorder.total_ms, 2),
+                "duplicates": [{"sql": fp, "count": n} for fp, n in recorder.duplicates()[:10]],
+                "slowest": [{"sql": sql, "ms": ms} for ms, sql in recorder.slowest()],
+            },
+            "functions": top_functions(profiler),
+            "allocations": top_allocations(snapshot),
+        }
+        profile_id = save_profile(report, profiler)
+        response["X-Profile-Id"] = profile_id
+        return response
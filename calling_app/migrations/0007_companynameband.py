@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calling_app', '0006_callplan_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompanyNameBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField()),
+                ('hash', models.BigIntegerField()),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='name_bands', to='calling_app.company')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['band', 'hash'], name='calling_app_band_5f055b_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+"""
+FTS5-таблиця з trigram-токенізатором для швидкого пошуку компаній на SQLite
+(див. calling_app/sqlite_profile.py). На інших базах і на SQLite без trigram
+(старіше 3.34) нічого не робить — пошук лишається через LIKE.
+"""
+from django.db import migrations
+
+from calling_app.sqlite_profile import create_company_fts, drop_company_fts
+
+
+def create_fts(apps, schema_editor):
+    create_company_fts(schema_editor)
+
+
+def drop_fts(apps, schema_editor):
+    drop_company_fts(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calling_app', '0007_companynameband'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts, drop_fts),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calling_app', '0010_changelogentry'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='contactperson',
+            name='full_name',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+    ]
@@ -0,0 +1,41 @@
+"""
+Комірка geohash складу (calling_app/geo.py) з індексом — для пошуку найближчих
+складів без PostGIS. Наявні склади заповнюються тут.
+"""
+from django.db import migrations, models
+
+from calling_app.geo import grid_cell
+
+BATCH_SIZE = 2000
+
+
+def fill_grid_cells(apps, schema_editor):
+    Warehouse = apps.get_model('calling_app', 'Warehouse')
+    warehouses = Warehouse.objects.using(schema_editor.connection.alias).filter(
+        latitude__isnull=False, longitude__isnull=False,
+    ).only('latitude', 'longitude')
+    batch = []
+    for warehouse in warehouses.iterator(chunk_size=BATCH_SIZE):
+        warehouse.grid_cell = grid_cell(warehouse.latitude, warehouse.longitude)
+        batch.append(warehouse)
+        if len(batch) >= BATCH_SIZE:
+            Warehouse.objects.using(schema_editor.connection.alias).bulk_update(batch, ['grid_cell'])
+            batch = []
+    if batch:
+        Warehouse.objects.using(schema_editor.connection.alias).bulk_update(batch, ['grid_cell'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calling_app', '0011_contactperson_full_name_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='warehouse',
+            name='grid_cell',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=12, null=True),
+        ),
+        migrations.RunPython(fill_grid_cells, migrations.RunPython.noop),
+    ]
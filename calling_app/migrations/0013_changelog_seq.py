@@ -0,0 +1,38 @@
+"""
+Номер журналу змін у порядку коміту (ChangeLogEntry.seq) і рядок-лічильник
+ChangeLogSequence. Уже наявні записи нумеруються за id.
+"""
+from django.db import migrations, models
+from django.db.models import F
+
+
+def number_existing(apps, schema_editor):
+    alias = schema_editor.connection.alias
+    ChangeLogEntry = apps.get_model('calling_app', 'ChangeLogEntry')
+    ChangeLogSequence = apps.get_model('calling_app', 'ChangeLogSequence')
+    ChangeLogEntry.objects.using(alias).update(seq=F('id'))
+    last = ChangeLogEntry.objects.using(alias).aggregate(models.Max('id'))['id__max'] or 0
+    ChangeLogSequence.objects.using(alias).create(pk=1, last_seq=last)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calling_app', '0012_warehouse_grid_cell'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='changelogentry',
+            name='seq',
+            field=models.BigIntegerField(blank=True, null=True, unique=True),
+        ),
+        migrations.CreateModel(
+            name='ChangeLogSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_seq', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(number_existing, migrations.RunPython.noop),
+    ]
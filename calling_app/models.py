@@ -1,3 +1,4 @@
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.utils import timezone
 
@@ -51,6 +52,22 @@ class Company(models.Model):
     district = models.ForeignKey(
         District, on_delete=models.SET_NULL, null=True, blank=True, related_name="companies", db_index=True
     )
+    # Остання зміна компанії або будь-чого, що показує її сторінка (контакти, телефони, дзвінки, плани...):
+    # оновлюється сигналами і utils.touch_companies(); на ньому — ETag/Last-Modified сторінок компанії
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+
+class CompanyNameBand(models.Model):
+    """
+    LSH-індекс назв компаній: хеш кожної смуги MinHash-підпису назви.
+    Компанії з однаковим (band, hash) — кандидати в дублікати (див. name_lsh.py).
+    """
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name="name_bands")
+    band = models.PositiveSmallIntegerField()
+    hash = models.BigIntegerField()
+
+    class Meta:
+        indexes = [models.Index(fields=["band", "hash"])]
 
 
 class CompanyEmail(models.Model):
@@ -63,7 +80,7 @@ class CompanyEmail(models.Model):
 
 class ContactPerson(models.Model):
     companies = models.ManyToManyField("Company", related_name="contacts", blank=True) #related_name="contacts" задає ім’я, за яким можна з Company отримати всіх її контактних осіб.
-    full_name = models.CharField(max_length=255)
+    full_name = models.CharField(max_length=255, db_index=True)   # пошук за префіксом в адмінці
     position = models.CharField(max_length=255, blank=True, null=True)
 
     def __str__(self):
@@ -141,6 +158,8 @@ class Warehouse(models.Model):
     transport_type = models.CharField(max_length=10, choices=TRANSPORT_CHOICES, default="auto")
     latitude = models.DecimalField(max_digits=9, decimal_places=6, blank=True, null=True)
     longitude = models.DecimalField(max_digits=9, decimal_places=6, blank=True, null=True)
+    # geohash координат (geo.GRID_PRECISION) для пошуку найближчих складів; заповнюється сигналом при збереженні
+    grid_cell = models.CharField(max_length=12, blank=True, null=True, editable=False, db_index=True)
     region = models.ForeignKey(
         Region, on_delete=models.SET_NULL, null=True, blank=True, related_name="warehouses"
     )
@@ -159,4 +178,38 @@ class Crop(models.Model):
 class StockItem(models.Model):
     company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name="stock_items")
     crop = models.ForeignKey(Crop, on_delete=models.CASCADE)
-    quantity = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True)
\ No newline at end of file
+    quantity = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True)
+
+
+class ChangeLogEntry(models.Model):
+    """
+    Журнал змін (лише додавання) для інкрементальної синхронізації. seq — номер
+    у порядку коміту (призначається вже закоміченим записам), споживач читає
+    "зміни після seq N" (див. changelog.py).
+    """
+    ACTION_CHOICES = [
+        ("create", "Create"),
+        ("update", "Update"),
+        ("delete", "Delete"),
+        ("add", "M2M add"),
+        ("remove", "M2M remove"),
+    ]
+
+    model = models.CharField(max_length=32)                     # "company", "phone", ...
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=6, choices=ACTION_CHOICES)
+    # create/update — значення полів; add/remove — {"field": ..., "ids": [...]}
+    data = models.JSONField(encoder=DjangoJSONEncoder, default=dict)
+    changed_at = models.DateTimeField(default=timezone.now)
+    seq = models.BigIntegerField(null=True, blank=True, unique=True)   # None — ще не пронумеровано
+
+    class Meta:
+        indexes = [models.Index(fields=["model", "object_id"])]
+
+    def __str__(self):
+        return f"#{self.seq or '-'} {self.action} {self.model}:{self.object_id}"
+
+
+class ChangeLogSequence(models.Model):
+    """Єдиний рядок: останній виданий seq журналу; SELECT ... FOR UPDATE по ньому — блокування нумерації."""
+    last_seq = models.BigIntegerField(default=0)
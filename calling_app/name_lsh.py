@@ -0,0 +1,278 @@
+"""
+Пошук схожих назв компаній через MinHash + LSH.
+
+Назва нормалізується (регістр, лапки, організаційно-правова форма),
+розбивається на символьні 3-грами, для них рахується MinHash-підпис
+з NUM_PERM значень. Підпис ділиться на BANDS смуг по ROWS значень, хеш кожної
+смуги зберігається в CompanyNameBand. Кандидати в дублікати — компанії,
+що мають хоча б одну спільну смугу; вони перевіряються точним Jaccard.
+Пошук іде по індексу (band, hash), а не попарно по всій таблиці.
+
+Як і address_parser, модуль не імпортує моделі на рівні модуля — підписи
+можна рахувати в дочірніх процесах.
+"""
+import hashlib
+import os
+import random
+import re
+import struct
+import zlib
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations, groupby, islice
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS  # поріг спрацювання LSH ≈ (1/BANDS)^(1/ROWS) ≈ 0.5
+SHINGLE_SIZE = 3
+DEFAULT_THRESHOLD = 0.5
+# бакети більші за це (надто загальні назви на кшталт "агро") у звіті пропускаються
+MAX_BUCKET = 200
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20250913)  # фіксоване зерно: підписи мають бути стабільні між запусками
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+# Повні назви організаційно-правових форм (довші — першими) та їх абревіатури
+_LEGAL_FORMS = sorted((
+    "сільськогосподарське товариство з обмеженою відповідальністю",
+    "товариство з обмеженою відповідальністю",
+    "товариство з додатковою відповідальністю",
+    "сільськогосподарський виробничий кооператив",
+    "приватне акціонерне товариство",
+    "публічне акціонерне товариство",
+    "акціонерне товариство",
+    "приватне сільськогосподарське підприємство",
+    "приватне підприємство",
+    "дочірнє підприємство",
+    "селянське фермерське господарство",
+    "фермерське господарство",
+    "фізична особа-підприємець",
+    "фізична особа підприємець",
+), key=len, reverse=True)
+_LEGAL_ABBR = {"тов", "стов", "тдв", "свк", "прат", "пат", "ат", "пп", "псп", "дп", "сфг", "фг", "кфг", "фоп"}
+_LEGAL_FORMS_RE = re.compile("|".join(re.escape(form) for form in _LEGAL_FORMS))
+_PUNCT = re.compile(r"[^\w\s]+")
+_SPACES = re.compile(r"\s+")
+
+Bands = List[Tuple[int, int]]
+
+
+def normalize_name(name: Optional[str]) -> str:
+    """
+    'ТОВ "Агро-Світ"' і 'Товариство з обмеженою відповідальністю «Агро Світ»' -> 'агро світ'.
+    """
+    value = (name or "").lower().replace("’", "'").replace("ʼ", "'")
+    value = _LEGAL_FORMS_RE.sub(" ", value)
+    value = _PUNCT.sub(" ", value)
+    words = [w for w in value.split() if w not in _LEGAL_ABBR]
+    if not words:
+        # назва складається лише з форми — залишаємо як є, аби не злити все в одне
+        return _SPACES.sub(" ", _PUNCT.sub(" ", (name or "").lower())).strip()
+    return " ".join(words)
+
+
+def name_shingles(name: Optional[str]) -> FrozenSet[str]:
+    value = normalize_name(name)
+    if len(value) <= SHINGLE_SIZE:
+        return frozenset([value]) if value else frozenset()
+    return frozenset(value[i:i + SHINGLE_SIZE] for i in range(len(value) - SHINGLE_SIZE + 1))
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def minhash_signature(shingles: Iterable[str]) -> Tuple[int, ...]:
+    values = [zlib.crc32(s.encode("utf-8")) for s in shingles]
+    if not values:
+        return ()
+    return tuple(min((a * x + b) % _PRIME for x in values) for a, b in _PERMUTATIONS)
+
+
+def name_bands(name: Optional[str]) -> Bands:
+    """Повертає список (номер смуги, 64-бітний хеш смуги) для назви."""
+    signature = minhash_signature(name_shingles(name))
+    if not signature:
+        return []
+    bands = []
+    for band in range(BANDS):
+        packed = struct.pack(f"<{ROWS}Q", *signature[band * ROWS:(band + 1) * ROWS])
+        digest = hashlib.blake2b(packed, digest_size=8).digest()
+        bands.append((band, int.from_bytes(digest, "little", signed=True)))
+    return bands
+
+
+def bands_chunk(rows: List[Tuple[int, str]]) -> List[Tuple[int, int, int]]:
+    """(company_id, name) -> [(company_id, band, hash)]. Виконується в дочірньому процесі."""
+    return [(pk, band, value) for pk, name in rows for band, value in name_bands(name)]
+
+
+# -----------------------
+# Індекс у БД
+# -----------------------
+def _save_bands(rows: List[Tuple[int, int, int]]) -> None:
+    from .models import CompanyNameBand
+
+    CompanyNameBand.objects.bulk_create(
+        [CompanyNameBand(company_id=pk, band=band, hash=value) for pk, band, value in rows], batch_size=5000
+    )
+
+
+def index_companies(companies: Iterable[Tuple[int, str]]) -> None:
+    """Переіндексовує назви переданих компаній (company_id, name)."""
+    from .models import CompanyNameBand
+
+    companies = list(companies)
+    if not companies:
+        return
+    CompanyNameBand.objects.filter(company_id__in=[pk for pk, _ in companies]).delete()
+    _save_bands(bands_chunk(companies))
+
+
+def _chunks(iterable: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def rebuild_index(chunk_size: int = 5000, workers: Optional[int] = None) -> int:
+    """
+    Повністю перебудовує індекс. Підписи рахуються порціями в пулі процесів
+    (workers=1 — у поточному процесі), запис — bulk_create по порціях.
+    Повертає кількість проіндексованих компаній.
+    """
+    from django.db import transaction
+
+    from .models import Company, CompanyNameBand
+
+    rows = Company.objects.order_by("id").values_list("id", "name").iterator(chunk_size=chunk_size)
+    chunks = _chunks(rows, chunk_size)
+    total = 0
+    with transaction.atomic():
+        CompanyNameBand.objects.all().delete()
+        if workers == 1:
+            for chunk in chunks:
+                _save_bands(bands_chunk(chunk))
+                total += len(chunk)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                window = (workers or os.cpu_count() or 1) * 2
+                pending = []
+                for chunk in chunks:
+                    pending.append((len(chunk), pool.submit(bands_chunk, chunk)))
+                    if len(pending) >= window:
+                        size, future = pending.pop(0)
+                        _save_bands(future.result())
+                        total += size
+                for size, future in pending:
+                    _save_bands(future.result())
+                    total += size
+    return total
+
+
+# -----------------------
+# Пошук
+# -----------------------
+def similar_companies(company, threshold: float = DEFAULT_THRESHOLD, limit: int = 10) -> List[Tuple[object, float]]:
+    """
+    Можливі дублікати компанії: [(Company, схожість)], найсхожіші першими.
+    Кандидати беруться з індексу за спільними смугами.
+    """
+    from django.db.models import Count, Q
+
+    from .models import Company, CompanyNameBand
+
+    bands = name_bands(company.name)
+    if not bands:
+        return []
+    condition = Q()
+    for band, value in bands:
+        condition |= Q(band=band, hash=value)
+    candidate_ids = list(
+        CompanyNameBand.objects.filter(condition).exclude(company_id=company.pk)
+        .values("company_id").annotate(matches=Count("id")).order_by("-matches")
+        .values_list("company_id", flat=True)[:limit * 5]
+    )
+
+    own = name_shingles(company.name)
+    result = []
+    for other in Company.objects.filter(id__in=candidate_ids).only("id", "edrpou", "name"):
+        similarity = jaccard(own, name_shingles(other.name))
+        if similarity >= threshold:
+            result.append((other, round(similarity, 2)))
+    result.sort(key=lambda item: -item[1])
+    return result[:limit]
+
+
+def _find(parent: Dict[int, int], x: int) -> int:
+    while parent.setdefault(x, x) != x:
+        parent[x] = parent[parent[x]]
+        x = parent[x]
+    return x
+
+
+def duplicate_groups(threshold: float = DEFAULT_THRESHOLD, chunk_size: int = 5000) -> List[dict]:
+    """
+    Пакетний звіт: групи компаній зі схожими назвами.
+    Читаються лише рядки індексу зі спільними бакетами, пари порівнюються лише
+    всередині бакета.
+
+    :return: [{"ids": [...], "similarity": мінімальна схожість ребер групи}], найбільші групи першими
+    """
+    from django.db.models import Exists, OuterRef
+
+    from .models import Company, CompanyNameBand
+
+    shared = CompanyNameBand.objects.filter(band=OuterRef("band"), hash=OuterRef("hash")).exclude(
+        company_id=OuterRef("company_id")
+    )
+    rows = (
+        CompanyNameBand.objects.filter(Exists(shared))
+        .order_by("band", "hash", "company_id")
+        .values_list("band", "hash", "company_id")
+        .iterator(chunk_size=chunk_size)
+    )
+
+    pairs = set()
+    for _, bucket in groupby(rows, key=lambda row: (row[0], row[1])):
+        ids = [row[2] for row in bucket]
+        if len(ids) > MAX_BUCKET:
+            continue
+        pairs.update(combinations(ids, 2))
+
+    ids = sorted({pk for pair in pairs for pk in pair})
+    shingles: Dict[int, FrozenSet[str]] = {}
+    for chunk in _chunks(ids, chunk_size):
+        for pk, name in Company.objects.filter(id__in=chunk).values_list("id", "name"):
+            shingles[pk] = name_shingles(name)
+
+    parent: Dict[int, int] = {}
+    edge_min: Dict[int, float] = {}
+    edges = []
+    for a, b in pairs:
+        similarity = jaccard(shingles.get(a, frozenset()), shingles.get(b, frozenset()))
+        if similarity >= threshold:
+            parent[_find(parent, a)] = _find(parent, b)
+            edges.append((a, similarity))
+
+    groups: Dict[int, List[int]] = defaultdict(list)
+    for pk in parent:
+        groups[_find(parent, pk)].append(pk)
+    for a, similarity in edges:
+        root = _find(parent, a)
+        edge_min[root] = min(edge_min.get(root, 1.0), similarity)
+
+    result = [
+        {"ids": sorted(members), "similarity": round(edge_min.get(root, 1.0), 2)}
+        for root, members in groups.items()
+        if len(members) > 1
+    ]
+    result.sort(key=lambda group: (-len(group["ids"]), group["ids"][0]))
+    return result
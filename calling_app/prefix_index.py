@@ -0,0 +1,232 @@
+"""
+Префіксні індекси в пам'яті для автодоповнення: області, райони, компанії.
+
+Індекс — відсортований список нормалізованих ключів; пошук — bisect до першого
+ключа з префіксом і прохід вперед до top-K результатів, тобто O(log N + K)
+без запитів до БД. Ключами є повна назва і кожне її слово, тож "світ" знаходить
+"ТОВ Агро-Світ"; для компаній додатково індексується ЄДРПОУ.
+
+- області/райони будуються з ref_cache і перебудовуються разом з ним;
+- компанії будуються у фоновому потоці при старті процесу, що обслуговує запити
+  (CallingAppConfig.ready → warm_company_index); запит, що прийшов раніше,
+  чекає на цю побудову. Зміни Company (сигнали) збільшують
+  версію в спільному кеші, і кожен процес перебудовує індекс у фоні,
+  продовжуючи відповідати зі старого до завершення.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from django.core.cache import cache
+from django.db import transaction
+
+from . import metrics, ref_cache
+from .name_lsh import normalize_name
+
+logger = logging.getLogger(__name__)
+
+COMPANY_VERSION_KEY = "calling_app:company_prefix_index:version"
+CHECK_INTERVAL = 1.0
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+# перебудова індексу компаній у фоновому потоці (у тестах вимикається)
+BACKGROUND_REBUILD = True
+
+
+def normalize_key(value: Optional[str]) -> str:
+    return " ".join((value or "").lower().replace("’", "'").replace("ʼ", "'").replace("-", " ").split())
+
+
+def _word_keys(text: str) -> List[str]:
+    """Ключі для тексту: весь текст і кожен його хвіст, що починається зі слова."""
+    words = text.split()
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+class PrefixIndex:
+    """
+    Відсортований масив (ключ, позиція запису). Записи — довільні кортежі,
+    що повертаються з search().
+    """
+
+    def __init__(self, items: Iterable[Tuple[Iterable[str], tuple]]):
+        self.records: List[tuple] = []
+        keys: List[Tuple[str, int]] = []
+        for item_keys, record in items:
+            position = len(self.records)
+            self.records.append(record)
+            keys.extend((key, position) for key in set(item_keys) if key)
+        keys.sort()
+        self.keys = [key for key, _ in keys]
+        self.positions = [position for _, position in keys]
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def search(self, prefix: str, limit: int = DEFAULT_LIMIT, accept: Optional[Callable[[tuple], bool]] = None) -> List[tuple]:
+        prefix = normalize_key(prefix)
+        if not prefix:
+            return []
+        result, seen = [], set()
+        i = bisect_left(self.keys, prefix)
+        while i < len(self.keys) and len(result) < limit and self.keys[i].startswith(prefix):
+            position = self.positions[i]
+            i += 1
+            if position in seen:
+                continue
+            seen.add(position)
+            record = self.records[position]
+            if accept is None or accept(record):
+                result.append(record)
+        return result
+
+
+# -----------------------
+# Області та райони (з ref_cache)
+# -----------------------
+def region_index() -> PrefixIndex:
+    return ref_cache.derived("region_prefix_index", lambda: PrefixIndex(
+        (_word_keys(normalize_key(r.region)), (r.pk, r.region)) for r in ref_cache.regions()
+    ))
+
+
+def district_index() -> PrefixIndex:
+    return ref_cache.derived("district_prefix_index", lambda: PrefixIndex(
+        (_word_keys(normalize_key(d.district)), (d.pk, d.district, d.region_id)) for d in ref_cache.districts()
+    ))
+
+
+def search_regions(query: str, limit: int = DEFAULT_LIMIT) -> List[dict]:
+    return [{"id": pk, "label": name} for pk, name in region_index().search(query, limit)]
+
+
+def search_districts(query: str, region_id: Optional[int] = None, limit: int = DEFAULT_LIMIT) -> List[dict]:
+    accept = (lambda record: record[2] == region_id) if region_id else None
+    return [
+        {"id": pk, "label": name, "region_id": rid}
+        for pk, name, rid in district_index().search(query, limit, accept)
+    ]
+
+
+# -----------------------
+# Компанії
+# -----------------------
+class _CompanyIndexState:
+    def __init__(self):
+        self.index: Optional[PrefixIndex] = None
+        self.version: Optional[int] = None
+        self.checked_at = 0.0
+        self.rebuilding = False
+        self.lock = threading.Lock()
+
+
+_company = _CompanyIndexState()
+
+
+def _company_version() -> int:
+    version = cache.get(COMPANY_VERSION_KEY)
+    if version is None:
+        cache.add(COMPANY_VERSION_KEY, 1, timeout=None)
+        version = cache.get(COMPANY_VERSION_KEY, 1)
+    return version
+
+
+def build_company_index(chunk_size: int = 5000) -> PrefixIndex:
+    from .models import Company
+
+    def items():
+        rows = Company.objects.order_by("id").values_list("id", "edrpou", "name").iterator(chunk_size=chunk_size)
+        for pk, edrpou, name in rows:
+            keys = _word_keys(normalize_key(name)) + _word_keys(normalize_name(name)) + [edrpou]
+            yield keys, (pk, edrpou, name)
+
+    return PrefixIndex(items())
+
+
+def _rebuild_company_index(version: int) -> None:
+    from django.db import close_old_connections
+
+    try:
+        index = build_company_index()
+        with _company.lock:
+            _company.index, _company.version = index, version
+    finally:
+        _company.rebuilding = False
+        if threading.current_thread() is not threading.main_thread():
+            close_old_connections()
+
+
+def warm_company_index() -> threading.Thread:
+    """
+    Будує індекс компаній у фоновому потоці, щоб перший запит автодоповнення
+    не чекав на читання всієї таблиці. Потік тримає lock під час побудови,
+    тож company_index() не будує індекс удруге, а чекає на готовий.
+    """
+    def warm():
+        from django.db import close_old_connections
+
+        try:
+            with _company.lock:
+                if _company.index is None:
+                    version = _company_version()
+                    _company.index, _company.version = build_company_index(), version
+        except Exception:
+            # БД ще не готова (немає таблиць тощо) — індекс побудує перший запит
+            logger.exception("Не вдалося прогріти префіксний індекс компаній")
+        finally:
+            close_old_connections()
+
+    thread = threading.Thread(target=warm, name="company-prefix-index", daemon=True)
+    thread.start()
+    return thread
+
+
+def company_index() -> PrefixIndex:
+    now = time.monotonic()
+    if _company.index is not None and now - _company.checked_at < CHECK_INTERVAL:
+        metrics.cache_hit("company_prefix_index")
+        return _company.index
+    _company.checked_at = now
+
+    version = _company_version()
+    if _company.index is None:
+        metrics.cache_miss("company_prefix_index")
+        with _company.lock:
+            if _company.index is None:
+                _company.index, _company.version = build_company_index(), version
+    elif _company.version != version and not _company.rebuilding:
+        # до кінця перебудови відповідаємо зі старого індексу
+        metrics.cache_miss("company_prefix_index")
+        _company.rebuilding = True
+        if BACKGROUND_REBUILD:
+            threading.Thread(target=_rebuild_company_index, args=(version,), daemon=True).start()
+        else:
+            _rebuild_company_index(version)
+    else:
+        metrics.cache_hit("company_prefix_index")
+    return _company.index
+
+
+def company_index_version() -> int:
+    """Версія даних, з яких побудовано індекс, що зараз відповідає на пошук (для ETag)."""
+    company_index()
+    return _company.version
+
+
+def invalidate_company_index() -> None:
+    """Сигнал зміни компаній: після коміту всі процеси перебудують індекс."""
+    def bump():
+        try:
+            cache.incr(COMPANY_VERSION_KEY)
+        except ValueError:
+            cache.set(COMPANY_VERSION_KEY, _company_version() + 1, timeout=None)
+        _company.checked_at = 0.0
+
+    transaction.on_commit(bump)
+
+
+def search_companies(query: str, limit: int = DEFAULT_LIMIT) -> List[dict]:
+    return [{"id": pk, "edrpou": edrpou, "label": name} for pk, edrpou, name in company_index().search(query, limit)]
@@ -0,0 +1,176 @@
+"""
+Кеш довідників у пам'яті процесу: Region, District, CompanyStatus, Crop.
+
+Таблиці читаються один раз і далі обслуговуються з пам'яті (choices для форм,
+пошук за id). Зміни між процесами/воркерами синхронізуються через номер версії
+в спільному кеші Django (settings.CACHES): сигнали збереження/видалення
+довідників збільшують версію, а кожен процес, помітивши нову версію,
+перечитує таблиці. Версія перевіряється не частіше ніж раз на CHECK_INTERVAL секунд.
+"""
+import copy
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from django.core.cache import cache
+from django.db import transaction
+
+from . import metrics
+from .models import CompanyStatus, Crop, District, Region
+
+VERSION_KEY = "calling_app:ref_cache:version"
+CHECK_INTERVAL = 1.0
+
+
+class _Snapshot:
+    def __init__(self, version: int):
+        self.version = version
+        self.checked_at = time.monotonic()
+        self.regions: Dict[int, Region] = {r.pk: r for r in Region.objects.order_by("region")}
+        self.districts: Dict[int, District] = {}
+        self.districts_by_region: Dict[int, List[District]] = {}
+        for district in District.objects.order_by("district"):
+            # FK на область береться з того ж знімка, без окремих запитів
+            district.region = self.regions[district.region_id]
+            self.districts[district.pk] = district
+            self.districts_by_region.setdefault(district.region_id, []).append(district)
+        self.statuses: Dict[int, CompanyStatus] = {s.pk: s for s in CompanyStatus.objects.order_by("id")}
+        self.crops: Dict[int, Crop] = {c.pk: c for c in Crop.objects.order_by("name")}
+        self.derived: Dict[str, object] = {}
+
+
+_snapshot: Optional[_Snapshot] = None
+_lock = threading.Lock()
+
+
+def _shared_version() -> int:
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, timeout=None)
+        version = cache.get(VERSION_KEY, 1)
+    return version
+
+
+def _tables() -> _Snapshot:
+    global _snapshot
+    snapshot = _snapshot
+    now = time.monotonic()
+    if snapshot is not None and now - snapshot.checked_at < CHECK_INTERVAL:
+        metrics.cache_hit("ref_cache")
+        return snapshot
+
+    version = _shared_version()
+    if snapshot is not None and snapshot.version == version:
+        snapshot.checked_at = now
+        metrics.cache_hit("ref_cache")
+        return snapshot
+
+    metrics.cache_miss("ref_cache")
+    with _lock:
+        if _snapshot is None or _snapshot.version != version:
+            _snapshot = _Snapshot(version)
+        return _snapshot
+
+
+def invalidate() -> None:
+    """Скидає кеш у всіх процесах (збільшує спільну версію) і в поточному одразу."""
+    global _snapshot
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, _shared_version() + 1, timeout=None)
+    _snapshot = None
+
+
+def invalidate_on_commit() -> None:
+    """
+    Для сигналів: локальний знімок скидається одразу, а спільна версія — після
+    коміту, щоб інші процеси не перечитали таблиці до того, як зміни стануть видимі.
+    """
+    global _snapshot
+    _snapshot = None
+    transaction.on_commit(invalidate)
+
+
+def version() -> int:
+    """Версія знімка, з якого зараз відповідає кеш (для ETag відповідей із довідників)."""
+    return _tables().version
+
+
+# -----------------------
+# Списки
+# -----------------------
+def regions() -> List[Region]:
+    return list(_tables().regions.values())
+
+
+def districts(region_id: Optional[int] = None) -> List[District]:
+    tables = _tables()
+    if region_id is None:
+        return list(tables.districts.values())
+    return list(tables.districts_by_region.get(int(region_id), []))
+
+
+def statuses() -> List[CompanyStatus]:
+    return list(_tables().statuses.values())
+
+
+def crops() -> List[Crop]:
+    return list(_tables().crops.values())
+
+
+# -----------------------
+# Пошук за id (повертаються копії, щоб зміни об'єкта не потрапили в спільний кеш)
+# -----------------------
+def _get(table: str, pk) -> Optional[object]:
+    if pk in (None, ""):
+        return None
+    try:
+        obj = getattr(_tables(), table).get(int(pk))
+    except (TypeError, ValueError):
+        return None
+    return copy.copy(obj) if obj is not None else None
+
+
+def region(pk) -> Optional[Region]:
+    return _get("regions", pk)
+
+
+def district(pk) -> Optional[District]:
+    return _get("districts", pk)
+
+
+def status(pk) -> Optional[CompanyStatus]:
+    return _get("statuses", pk)
+
+
+def crop(pk) -> Optional[Crop]:
+    return _get("crops", pk)
+
+
+def derived(name: str, build: Callable[[], object]) -> object:
+    """
+    Похідна структура над довідниками (наприклад, префіксний індекс), що
+    будується один раз і автоматично перебудовується разом зі знімком.
+    """
+    tables = _tables()
+    value = tables.derived.get(name)
+    if value is None:
+        value = tables.derived[name] = build()
+    return value
+
+
+def choices(objects) -> List[Tuple[int, str]]:
+    return [(obj.pk, str(obj)) for obj in objects]
+
+
+def attach_company_refs(company) -> None:
+    """
+    Підставляє status/region/district компанії з кешу, щоб шаблон
+    не робив окремих запитів на кожне FK-поле.
+    """
+    for field, lookup in (("status", status), ("region", region), ("district", district)):
+        pk = getattr(company, f"{field}_id")
+        obj = lookup(pk)
+        if pk is not None and obj is not None:
+            setattr(company, field, obj)
@@ -0,0 +1,172 @@
+"""
+Обробники сигналів моделей calling_app. Підключаються в CallingAppConfig.ready().
+"""
+from typing import Set
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import changelog, ref_cache
+from .prefix_index import invalidate_company_index
+from .utils import invalidate_companies_cache, touch_companies
+from .models import (
+    Call, CallPlan, Company, CompanyEmail, CompanyStatus, ContactPerson, Crop, District, Holding, Phone, Region,
+    StockItem, Warehouse,
+)
+from .geo import grid_cell
+from .name_lsh import index_companies
+
+
+@receiver(post_save, sender=Company, dispatch_uid="company_name_index")
+def update_company_name_index(sender, instance: Company, created: bool, update_fields=None, raw=False, **kwargs):
+    """Оновлює LSH-індекс назви при збереженні компанії (bulk-операції оновлюють індекс самі)."""
+    if raw or (update_fields is not None and "name" not in update_fields):
+        return
+    index_companies([(instance.pk, instance.name)])
+
+
+@receiver(post_save, sender=Company, dispatch_uid="company_prefix_index_save")
+@receiver(post_delete, sender=Company, dispatch_uid="company_prefix_index_delete")
+def update_company_prefix_index(sender, update_fields=None, raw=False, **kwargs):
+    """Назва/ЄДРПОУ змінились або компанію видалено — індекс автодоповнення застарів."""
+    if raw or (update_fields is not None and not {"name", "edrpou"} & set(update_fields)):
+        return
+    invalidate_company_index()
+
+
+@receiver(pre_save, sender=Warehouse, dispatch_uid="warehouse_grid_cell")
+def set_warehouse_grid_cell(sender, instance: Warehouse, **kwargs):
+    """Комірка сітки з координат (bulk_create/update() мають заповнювати grid_cell самі)."""
+    instance.grid_cell = grid_cell(instance.latitude, instance.longitude)
+
+
+def invalidate_ref_cache(sender, **kwargs):
+    """Будь-яка зміна довідника скидає кеш довідників у всіх процесах."""
+    ref_cache.invalidate_on_commit()
+
+
+for _model in (Region, District, CompanyStatus, Crop):
+    post_save.connect(invalidate_ref_cache, sender=_model, dispatch_uid=f"ref_cache_save_{_model.__name__}")
+    post_delete.connect(invalidate_ref_cache, sender=_model, dispatch_uid=f"ref_cache_delete_{_model.__name__}")
+
+
+def invalidate_companies_list(sender, raw=False, **kwargs):
+    """Компанії, дзвінки і плани впливають на список компаній (last_call/next_call) — скидаємо його кеш."""
+    if not raw:
+        invalidate_companies_cache()
+
+
+for _model in (Company, Call, CallPlan):
+    post_save.connect(invalidate_companies_list, sender=_model, dispatch_uid=f"companies_list_save_{_model.__name__}")
+    post_delete.connect(invalidate_companies_list, sender=_model, dispatch_uid=f"companies_list_delete_{_model.__name__}")
+m2m_changed.connect(invalidate_companies_list, sender=Call.company.through, dispatch_uid="companies_list_call_company")
+
+
+# -----------------------
+# Company.updated_at — для ETag/Last-Modified сторінок компанії
+# -----------------------
+# Рядки, які показують сторінки компанії: FK на компанію або M2M до компаній
+COMPANY_FK = {CallPlan: "company_id", StockItem: "company_id"}
+COMPANY_M2M = {Phone: "companies", ContactPerson: "companies", Call: "company", CompanyEmail: "companies",
+               Warehouse: "owners"}
+
+
+def _linked_company_ids(instance) -> Set[int]:
+    model = type(instance)
+    if model in COMPANY_FK:
+        return {getattr(instance, COMPANY_FK[model])}
+    ids = set(getattr(instance, COMPANY_M2M[model]).values_list("pk", flat=True))
+    if model is Call and instance.phone_id:
+        # дзвінок змінює кількість і останній дзвінок телефону — на сторінках усіх його компаній
+        ids |= set(Phone.companies.through.objects.filter(phone_id=instance.phone_id).values_list("company_id", flat=True))
+    return ids
+
+
+def touch_linked_companies(sender, instance, raw=False, **kwargs):
+    if not raw:
+        touch_companies(_linked_company_ids(instance))
+
+
+for _model in (*COMPANY_FK, *COMPANY_M2M):
+    post_save.connect(touch_linked_companies, sender=_model, dispatch_uid=f"company_touch_save_{_model.__name__}")
+    # до видалення: після нього M2M-рядків уже немає
+    pre_delete.connect(touch_linked_companies, sender=_model, dispatch_uid=f"company_touch_delete_{_model.__name__}")
+
+
+def touch_m2m_companies(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Зміна M2M-зв'язку з компаніями: змінені компанії і всі компанії, пов'язані
+    з тими ж телефонами/контактами/... (сторінка зв'язків показує їх одна одній).
+    """
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    company_col = next(f.attname for f in sender._meta.concrete_fields if f.related_model is Company)
+    other_col = next(f.attname for f in sender._meta.concrete_fields
+                     if f.remote_field and f.related_model is not Company)
+    if reverse:   # instance — компанія, pk_set — телефони/контакти/...
+        company_ids = {instance.pk}
+        other_ids = pk_set if pk_set is not None else set(
+            sender.objects.filter(**{company_col: instance.pk}).values_list(other_col, flat=True))
+    else:         # instance — телефон/контакт/..., pk_set — компанії
+        company_ids, other_ids = set(pk_set or ()), {instance.pk}
+    company_ids |= set(sender.objects.filter(**{f"{other_col}__in": other_ids}).values_list(company_col, flat=True))
+    touch_companies(company_ids)
+
+
+for _model, _field in COMPANY_M2M.items():
+    _through = getattr(_model, _field).through
+    m2m_changed.connect(touch_m2m_companies, sender=_through, dispatch_uid=f"company_touch_m2m_{_through.__name__}")
+
+
+# Зміни інших компаній холдингу (площа, склад) ETag враховує сам — через їхні updated_at;
+# назва холдингу є лише в самому Holding
+@receiver(post_save, sender=Holding, dispatch_uid="holding_touch_companies")
+def touch_companies_of_holding(sender, instance: Holding, raw=False, **kwargs):
+    if not raw:
+        touch_companies(instance.companies.values_list("pk", flat=True))
+
+
+# -----------------------
+# Журнал змін (changelog.py)
+# -----------------------
+def log_save(sender, instance, created: bool, raw=False, **kwargs):
+    if not raw:
+        changelog.record(instance, "create" if created else "update", changelog.field_values(instance))
+
+
+def log_delete(sender, instance, **kwargs):
+    changelog.record(instance, "delete")
+
+
+for _model in changelog.TRACKED_MODELS:
+    post_save.connect(log_save, sender=_model, dispatch_uid=f"changelog_save_{_model.__name__}")
+    post_delete.connect(log_delete, sender=_model, dispatch_uid=f"changelog_delete_{_model.__name__}")
+
+
+def _log_m2m(model, field: str):
+    through = getattr(model, field).through
+    owner_col = next(f.attname for f in through._meta.concrete_fields if f.related_model is model)
+    other_col = next(f.attname for f in through._meta.concrete_fields
+                     if f.remote_field and f.attname != owner_col)
+
+    def handler(sender, instance, action, reverse, pk_set, **kwargs):
+        """Зв'язок пишеться з боку model: {"field": field, "ids": [id компаній]}; clear — як remove."""
+        if action in ("post_add", "post_remove"):
+            kind = "add" if action == "post_add" else "remove"
+            if reverse:   # instance — компанія, pk_set — власники поля
+                changelog.record_m2m(model, pk_set, kind, field, [instance.pk])
+            else:
+                changelog.record_m2m(model, [instance.pk], kind, field, pk_set)
+        elif action == "pre_clear":
+            if reverse:
+                owners = through.objects.filter(**{other_col: instance.pk}).values_list(owner_col, flat=True)
+                changelog.record_m2m(model, list(owners), "remove", field, [instance.pk])
+            else:
+                ids = through.objects.filter(**{owner_col: instance.pk}).values_list(other_col, flat=True)
+                changelog.record_m2m(model, [instance.pk], "remove", field, list(ids))
+
+    m2m_changed.connect(handler, sender=through, weak=False, dispatch_uid=f"changelog_m2m_{through.__name__}")
+
+
+for _model, _field in changelog.TRACKED_M2M:
+    _log_m2m(_model, _field)
@@ -0,0 +1,188 @@
+"""
+Профіль SQLite для невеликих філій і тестів.
+
+Кожне нове SQLite-з'єднання отримує PRAGMA з settings.SQLITE_PRAGMAS
+(за замовчуванням TUNED_PRAGMAS):
+- journal_mode=WAL      — читачі не блокують запис і навпаки;
+- synchronous=NORMAL    — у WAL безпечно, без fsync на кожен коміт;
+- mmap_size, cache_size — читання з пам'яті замість read() по сторінці;
+- busy_timeout          — чекати на блокування замість "database is locked";
+- temp_store=MEMORY     — тимчасові таблиці сортувань/DISTINCT у пам'яті.
+SQLITE_PRAGMAS = {} вимикає налаштування (звичайний SQLite).
+
+Міграція 0008 створює FTS5-таблицю з trigram-токенізатором для
+ЄДРПОУ/назви/адреси компаній (тригери тримають її в актуальному стані) —
+quick_search_companies шукає по ній замість LIKE '%...%' по всій таблиці.
+SQLite змінює стовпці перебудовою таблиці, і тригери зникають разом зі старою —
+тому після кожного migrate вони відновлюються (repair_company_fts).
+
+Порівняння з налаштуваннями SQLite за замовчуванням:
+    python manage.py benchmark --sqlite-profile=compare
+"""
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
+from django.db.models.expressions import RawSQL
+from django.dispatch import receiver
+from django.test.utils import override_settings
+
+TUNED_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,   # від'ємне — у КБ: 64 МБ
+    "busy_timeout": 5000,
+    "temp_store": "MEMORY",
+}
+
+# Значення SQLite за замовчуванням — щоб повернути файл у звичайний режим для порівняння
+DEFAULT_PRAGMAS = {
+    "journal_mode": "DELETE",
+    "synchronous": "FULL",
+    "mmap_size": 0,
+    "cache_size": -2000,
+    "busy_timeout": 0,
+    "temp_store": "DEFAULT",
+}
+
+PROFILES = {"tuned": TUNED_PRAGMAS, "default": DEFAULT_PRAGMAS}
+
+COMPANY_FTS_TABLE = "calling_app_company_fts"
+TRIGRAM_MIN_LENGTH = 3   # trigram-індекс не знаходить коротші рядки
+
+_COLUMNS = "edrpou, name, legal_address"
+_DELETE_OLD = (f"INSERT INTO {COMPANY_FTS_TABLE}({COMPANY_FTS_TABLE}, rowid, {_COLUMNS}) "
+               f"VALUES ('delete', old.id, old.edrpou, old.name, old.legal_address);")
+_INSERT_NEW = (f"INSERT INTO {COMPANY_FTS_TABLE}(rowid, {_COLUMNS}) "
+               f"VALUES (new.id, new.edrpou, new.name, new.legal_address);")
+COMPANY_FTS_TRIGGERS = {
+    f"{COMPANY_FTS_TABLE}_ai": f"AFTER INSERT ON calling_app_company BEGIN {_INSERT_NEW} END",
+    f"{COMPANY_FTS_TABLE}_ad": f"AFTER DELETE ON calling_app_company BEGIN {_DELETE_OLD} END",
+    f"{COMPANY_FTS_TABLE}_au": f"AFTER UPDATE OF {_COLUMNS} ON calling_app_company BEGIN {_DELETE_OLD} {_INSERT_NEW} END",
+}
+
+# alias -> чи є FTS-таблиця (перевіряється один раз на з'єднання)
+_fts_tables: Dict[str, bool] = {}
+
+
+def pragmas() -> Dict[str, object]:
+    return getattr(settings, "SQLITE_PRAGMAS", TUNED_PRAGMAS)
+
+
+def apply_pragmas(connection, values: Optional[Dict[str, object]] = None) -> None:
+    values = pragmas() if values is None else values
+    with connection.cursor() as cursor:
+        for name, value in values.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+@receiver(connection_created, dispatch_uid="calling_app_sqlite_pragmas")
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor == "sqlite":
+        apply_pragmas(connection)
+        _fts_tables.pop(connection.alias, None)
+
+
+# -----------------------
+# FTS5 trigram
+# -----------------------
+def trigram_supported(connection) -> bool:
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute("CREATE VIRTUAL TABLE temp.trigram_probe USING fts5(x, tokenize='trigram')")
+        except Exception:
+            return False
+        cursor.execute("DROP TABLE temp.trigram_probe")
+    return True
+
+
+def create_company_fts(schema_editor) -> None:
+    connection = schema_editor.connection
+    if connection.vendor != "sqlite" or not trigram_supported(connection):
+        return
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE {COMPANY_FTS_TABLE} USING fts5("
+        f"{_COLUMNS}, content='calling_app_company', content_rowid='id', tokenize='trigram')"
+    )
+    _create_triggers(schema_editor.execute)
+
+
+def drop_company_fts(schema_editor) -> None:
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for name in COMPANY_FTS_TRIGGERS:
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {name}")
+    schema_editor.execute(f"DROP TABLE IF EXISTS {COMPANY_FTS_TABLE}")
+
+
+def _create_triggers(execute) -> None:
+    for name, body in COMPANY_FTS_TRIGGERS.items():
+        execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+    # індекс наповнюється заново: поки тригерів не було, зміни в нього не потрапляли
+    execute(f"INSERT INTO {COMPANY_FTS_TABLE}({COMPANY_FTS_TABLE}) VALUES ('rebuild')")
+
+
+def repair_company_fts(connection) -> bool:
+    """Відновлює тригери FTS, якщо таблицю компаній перебудувала міграція. True — якщо відновлено."""
+    if connection.vendor != "sqlite" or COMPANY_FTS_TABLE not in connection.introspection.table_names():
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name IN (%s, %s, %s)",
+            list(COMPANY_FTS_TRIGGERS),
+        )
+        if cursor.fetchone()[0] == len(COMPANY_FTS_TRIGGERS):
+            return False
+        _create_triggers(cursor.execute)
+    return True
+
+
+@receiver(post_migrate, dispatch_uid="calling_app_company_fts_repair")
+def repair_company_fts_after_migrate(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    if sender.label == "calling_app":
+        repair_company_fts(connections[using])
+
+
+def company_fts_ready(using: str = DEFAULT_DB_ALIAS) -> bool:
+    if not getattr(settings, "SQLITE_FTS", True):
+        return False
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return False
+    if using not in _fts_tables:
+        _fts_tables[using] = COMPANY_FTS_TABLE in connection.introspection.table_names()
+    return _fts_tables[using]
+
+
+def fts_match(search: str) -> str:
+    """Рядок пошуку як одна фраза FTS5 (лапки всередині подвоюються)."""
+    return '"' + search.replace('"', '""') + '"'
+
+
+def company_fts_ids(search: str, using: str = DEFAULT_DB_ALIAS) -> Optional[RawSQL]:
+    """
+    Підзапит id компаній, у яких ЄДРПОУ/назва/адреса містять search, або None,
+    якщо FTS недоступний чи рядок закороткий для trigram.
+    """
+    if len(search) < TRIGRAM_MIN_LENGTH or not company_fts_ready(using):
+        return None
+    return RawSQL(f"SELECT rowid FROM {COMPANY_FTS_TABLE} WHERE {COMPANY_FTS_TABLE} MATCH %s", [fts_match(search)])
+
+
+@contextmanager
+def use_profile(name: str, using: str = DEFAULT_DB_ALIAS):
+    """
+    Перевідкриває з'єднання з PRAGMA профілю ("tuned" або "default";
+    для "default" ще й без FTS) — для бенчмарків.
+    """
+    connections[using].close()
+    with override_settings(SQLITE_PRAGMAS=PROFILES[name], SQLITE_FTS=name == "tuned"):
+        try:
+            connections[using].ensure_connection()
+            yield
+        finally:
+            connections[using].close()
@@ -1,30 +1,95 @@
+// Автодоповнення для полів з атрибутом data-autocomplete-url.
+//   data-list      — id <ul>, куди виводяться варіанти
+//   data-target    — id <select>/<input>, куди при виборі записується id варіанта
+//   data-depends   — id елемента, значення якого передається як ?region=
+//   data-link      — шаблон посилання для переходу, напр. "/company/{edrpou}/"
+//   data-multi     — ім'я прихованого поля для множинного вибору; вибрані варіанти
+//                    додаються "чіпами" в елемент data-chips (значення — edrpou або id)
+// Запити відкладаються (debounce), застарілі запити скасовуються через AbortController.
 document.addEventListener("DOMContentLoaded", function() {
-  const regionInput = document.getElementById("id_region");
-  const districtInput = document.getElementById("id_district");
+  const DEBOUNCE_MS = 150;
 
-  function autocomplete(input, url, listId) {
-      input.addEventListener("input", function() {
-          let query = input.value;
-          if(query.length < 1) { document.getElementById(listId).innerHTML = ""; return; }
-          fetch(`${url}?q=${query}`)
-              .then(response => response.json())
-              .then(data => {
-                  let list = document.getElementById(listId);
+  function setTarget(target, item) {
+      if (!target) return;
+      if (target.tagName === "SELECT" && !target.querySelector(`option[value="${item.id}"]`)) {
+          target.add(new Option(item.label, item.id));
+      }
+      target.value = item.id;
+      target.dispatchEvent(new Event("change", { bubbles: true }));
+  }
+
+  function addChip(input, item) {
+      const chips = document.getElementById(input.dataset.chips);
+      const value = item.edrpou || item.id;
+      if (chips.querySelector(`input[value="${value}"]`)) return;
+      const chip = document.createElement("span");
+      chip.classList.add("autocomplete-chip");
+      chip.textContent = item.edrpou ? `${item.label} (${item.edrpou}) ` : `${item.label} `;
+      const hidden = document.createElement("input");
+      hidden.type = "hidden";
+      hidden.name = input.dataset.multi;
+      hidden.value = value;
+      const remove = document.createElement("button");
+      remove.type = "button";
+      remove.textContent = "×";
+      remove.addEventListener("click", () => chip.remove());
+      chip.append(hidden, remove);
+      chips.appendChild(chip);
+  }
+
+  function autocomplete(input) {
+      const url = input.dataset.autocompleteUrl;
+      const list = document.getElementById(input.dataset.list);
+      const target = input.dataset.target ? document.getElementById(input.dataset.target) : null;
+      const depends = input.dataset.depends ? document.getElementById(input.dataset.depends) : null;
+      let timer = null;
+      let controller = null;
+
+      function render(data) {
+          list.innerHTML = "";
+          data.forEach(item => {
+              let li = document.createElement("li");
+              li.textContent = item.edrpou ? `${item.label} (${item.edrpou})` : item.label;
+              li.classList.add("autocomplete-item");
+              li.addEventListener("click", function() {
                   list.innerHTML = "";
-                  data.forEach(item => {
-                      let li = document.createElement("li");
-                      li.textContent = item;
-                      li.classList.add("autocomplete-item");
-                      li.addEventListener("click", function() {
-                          input.value = item;
-                          list.innerHTML = "";
-                      });
-                      list.appendChild(li);
-                  });
+                  if (input.dataset.link) {
+                      window.location = input.dataset.link.replace("{edrpou}", item.edrpou).replace("{id}", item.id);
+                      return;
+                  }
+                  if (input.dataset.multi) {
+                      addChip(input, item);
+                      input.value = "";
+                      input.focus();
+                      return;
+                  }
+                  input.value = item.label;
+                  setTarget(target, item);
               });
+              list.appendChild(li);
+          });
+      }
+
+      input.addEventListener("input", function() {
+          clearTimeout(timer);
+          const query = input.value.trim();
+          if (query.length < 1) {
+              if (controller) controller.abort();
+              list.innerHTML = "";
+              return;
+          }
+          timer = setTimeout(function() {
+              if (controller) controller.abort();
+              controller = new AbortController();
+              const params = new URLSearchParams({ q: query });
+              if (depends && depends.value) params.set("region", depends.value);
+              fetch(`${url}?${params}`, { signal: controller.signal })
+                  .then(response => response.json())
+                  .then(render)
+                  .catch(error => { if (error.name !== "AbortError") console.error(error); });
+          }, DEBOUNCE_MS);
       });
   }
 
-  autocomplete(regionInput, "/autocomplete/region/", "region-list");
-  autocomplete(districtInput, "/autocomplete/district/", "district-list");
+  document.querySelectorAll("[data-autocomplete-url]").forEach(autocomplete);
 });
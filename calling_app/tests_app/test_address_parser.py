@@ -0,0 +1,38 @@
+import json
+import os
+import tempfile
+
+from django.test import SimpleTestCase
+
+from calling_app.address_parser import (NO_DISTRICT, NO_REGION_DISTRICT, PARSED, EMPTY, build_gazetteer,
+                                        parse_address, write_gazetteer)
+
+
+class AddressParserTest(SimpleTestCase):
+    addresses = [
+        "08000, Київська обл., Макарівський р-н, с. Ясногородка",
+        "Київська обл., Макарівський р-н, с. Бишів",
+        "Київська обл., Фастівський р-н",
+        "Полтавська обл., м. Полтава",
+        "м. Київ, вул. Хрещатик, 1",
+        None,
+    ]
+
+    def test_parse_address_categories(self):
+        assert parse_address(self.addresses[0]) == ("Київська", "Макарівський", PARSED)
+        assert parse_address(self.addresses[3])[2] == NO_DISTRICT
+        assert parse_address(self.addresses[4])[2] == NO_REGION_DISTRICT
+        assert parse_address(None)[2] == EMPTY
+
+    def test_build_and_write_gazetteer(self):
+        chunks = [self.addresses[:3], self.addresses[3:]]
+        gazetteer, categories, samples = build_gazetteer(chunks, workers=1)
+        assert gazetteer["Київська"]["Макарівський"] == 2
+        assert categories[PARSED] == 3
+        assert samples[NO_DISTRICT] == ["Полтавська обл., м. Полтава"]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "regions_districts.json")
+            assert write_gazetteer(gazetteer, path, min_count=2) == 1
+            with open(path, encoding="utf-8") as f:
+                assert json.load(f) == {"Київська": ["Макарівський"]}
@@ -0,0 +1,75 @@
+from unittest import mock
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from calling_app import admin as calling_admin
+from calling_app.models import Call, ChangeLogEntry, Company, CompanyStatus, ContactPerson, Holding, Phone
+
+
+class AdminTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        status = CompanyStatus.objects.create(status_name="active")
+        cls.company = Company.objects.create(edrpou="10000001", name="ТОВ Агро", hectares=100, status=status)
+        contact = ContactPerson.objects.create(full_name="Петренко Іван")
+        for i in range(5):
+            phone = Phone.objects.create(number=f"+38050000000{i}", contact=contact)
+            phone.companies.add(cls.company)
+            Call.objects.create(phone=phone)
+        cls.user = User.objects.create_superuser("admin")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_every_model_registered_and_changelist_opens(self):
+        from django.apps import apps
+        for model in apps.get_app_config("calling_app").get_models():
+            with self.subTest(model=model.__name__):
+                assert admin.site.is_registered(model)
+                url = reverse(f"admin:calling_app_{model._meta.model_name}_changelist")
+                assert self.client.get(url).status_code == 200
+
+    def test_call_changelist_queries_do_not_grow(self):
+        url = reverse("admin:calling_app_call_changelist")
+        self.client.get(url)
+        with self.assertNumQueries(5):  # сесія, користувач, оцінка (sqlite_stat1), COUNT, рядки з телефоном (JOIN)
+            self.client.get(url)
+
+    def test_estimated_count_only_without_filter(self):
+        with mock.patch.object(calling_admin, "estimated_rows", return_value=250_000):
+            assert calling_admin.EstimatedCountPaginator(Call.objects.order_by("pk"), 50).count == 250_000
+            assert calling_admin.EstimatedCountPaginator(Call.objects.filter(phone__number="x").order_by("pk"), 50).count == 0
+        with mock.patch.object(calling_admin, "estimated_rows", return_value=10):
+            assert calling_admin.EstimatedCountPaginator(Call.objects.order_by("pk"), 50).count == 5
+
+    def test_phone_action_is_set_based_and_logged(self):
+        before = Company.objects.get(pk=self.company.pk).updated_at
+        ids = list(Phone.objects.values_list("pk", flat=True))
+        url = reverse("admin:calling_app_phone_changelist")
+        response = self.client.post(url, {"action": "mark_inactive", "_selected_action": ids})
+        assert response.status_code == 302
+        assert set(Phone.objects.values_list("status", flat=True)) == {"off"}
+        assert ChangeLogEntry.objects.filter(model="phone", action="update", data={"status": "off"}).count() == 5
+        assert Company.objects.get(pk=self.company.pk).updated_at > before
+
+    def test_detach_from_holding_updates_by_id_list(self):
+        Company.objects.filter(pk=self.company.pk).update(holding=Holding.objects.create(name="Холдинг"))
+        url = reverse("admin:calling_app_company_changelist")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, {"action": "detach_from_holding", "_selected_action": [self.company.pk]})
+        assert response.status_code == 302
+        assert Company.objects.get(pk=self.company.pk).holding_id is None
+        # без UPDATE ... WHERE id IN (SELECT ... FROM calling_app_company) — MySQL відхиляє його (1093)
+        updates = [q["sql"] for q in queries if q["sql"].startswith('UPDATE "calling_app_company"')]
+        assert updates and not any("SELECT" in sql for sql in updates)
+
+    def test_company_autocomplete(self):
+        response = self.client.get(reverse("admin:autocomplete"), {
+            "term": "10000001", "app_label": "calling_app", "model_name": "phone", "field_name": "companies",
+        })
+        assert [r["id"] for r in response.json()["results"]] == [str(self.company.pk)]
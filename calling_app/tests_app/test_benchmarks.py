@@ -0,0 +1,34 @@
+from django.test import TestCase
+
+from calling_app.benchmarks import Case, compare, measure, percentile, run_suite
+from calling_app.dataset import generate_dataset
+from calling_app.models import Company, CompanyStatus
+
+
+class BenchmarkTest(TestCase):
+    def test_percentile_nearest_rank(self):
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 99) == 99
+        assert percentile([5.0], 95) == 5.0
+
+    def test_measure_counts_queries(self):
+        CompanyStatus.objects.create(status_name="active")
+        result = measure(Case("statuses", lambda: list(CompanyStatus.objects.all())), repeat=4, warmup=0)
+        assert result["runs"] == 4 and result["queries"] == 1
+        assert result["p50_ms"] <= result["p99_ms"]
+
+    def test_compare_flags_regressions(self):
+        baseline = {"a": {"p50_ms": 10.0, "queries": 3}, "b": {"p50_ms": 10.0, "queries": 3}}
+        results = {"a": {"p50_ms": 20.0, "queries": 3}, "b": {"p50_ms": 10.5, "queries": 4}, "c": {"p50_ms": 1, "queries": 1}}
+        rows = {row["name"]: row for row in compare(results, baseline, threshold=0.2)}
+        assert set(rows) == {"a", "b"}
+        assert rows["a"]["regression"] and rows["b"]["regression"]
+        assert not compare({"a": {"p50_ms": 10.4, "queries": 3}}, baseline)[0]["regression"]
+
+    def test_suite_runs_on_generated_data(self):
+        generate_dataset(companies=60, calls=200, seed=2)
+        results = run_suite(["company_page", "import"], repeat=1, warmup=0)
+        assert "company_page:0" in results and "import:csv_2000" in results
+        # імпорт відкочується — дані не змінюються
+        assert Company.objects.count() == 60
@@ -0,0 +1,78 @@
+import re
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from calling_app import ref_cache, utils
+from calling_app.bulk_actions import apply_bulk_action
+from calling_app.models import CallPlan, Company, CompanyStatus, District, Holding, Region
+
+
+class CompaniesBulkActionTest(TestCase):
+    def setUp(self):
+        ref_cache.invalidate()
+        self.status, _ = CompanyStatus.objects.get_or_create(status_name="active")
+        self.closed = CompanyStatus.objects.create(status_name="nonactive")
+        self.kyiv = Region.objects.create(region="Київська")
+        self.fastiv = District.objects.create(region=self.kyiv, district="Фастівський")
+        self.holding = Holding.objects.create(name="Агрохолдинг")
+        self.companies = [
+            Company.objects.create(edrpou=f"0000000{i}", name=f"Агро {i}", hectares=100 * i, status=self.status)
+            for i in range(1, 5)
+        ]
+        self.client.force_login(User.objects.create_user("u"))
+
+    def post(self, data):
+        return self.client.post("/companies/bulk/", data)
+
+    def test_selected_ids_single_update(self):
+        ids = [self.companies[0].id, self.companies[2].id]
+        ref_cache.regions()
+        with self.assertNumQueries(8):  # сесія, користувач, холдинг, savepoint, id, журнал змін, один UPDATE, release
+            response = self.post({"action": "holding", "holding": self.holding.id, "company_ids": ids})
+        assert response.status_code == 302
+        assert sorted(self.holding.companies.values_list("id", flat=True)) == ids
+
+    def test_all_matching_filter(self):
+        self.post({"action": "status", "status": self.closed.id, "select_all": "on",
+                   "query": "search=&hectares_min=250&fast_search=on"})
+        assert set(Company.objects.filter(status=self.closed).values_list("hectares", flat=True)) == {300, 400}
+
+    def test_region_and_plan_calls(self):
+        ids = [c.id for c in self.companies[:2]]
+        self.post({"action": "region", "district": self.fastiv.id, "company_ids": ids})
+        assert set(Company.objects.filter(district=self.fastiv).values_list("region_id", flat=True)) == {self.kyiv.id}
+
+        response = self.post({"action": "plan_calls", "planned_datetime": "2026-01-01T10:00", "company_ids": ids})
+        assert response.status_code == 302
+        assert CallPlan.objects.filter(company_id__in=ids, status="on").count() == 2
+
+    def test_list_cache_invalidated(self):
+        self.client.get("/companies/?fast_search=on")
+        version = utils.companies_list_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post({"action": "status", "status": self.closed.id, "company_ids": [self.companies[0].id]})
+        assert utils.companies_list_version() == version + 1
+
+    def test_requires_selection(self):
+        self.post({"action": "status", "status": self.closed.id})
+        assert not Company.objects.filter(status=self.closed).exists()
+
+    def test_update_has_no_self_subquery(self):
+        """MySQL відхиляє UPDATE t ... WHERE id IN (SELECT ... FROM t) (помилка 1093)."""
+        companies = Company.objects.filter(hectares__gte=200)
+        cases = [
+            ("holding", {"holding": self.holding}),
+            ("status", {"status": self.closed}),
+            ("region", {"region": self.kyiv, "district": None}),
+            ("plan_calls", {"planned_datetime": "2026-01-01T10:00", "notes": ""}),
+        ]
+        for action, data in cases:
+            with CaptureQueriesContext(connection) as queries:
+                assert apply_bulk_action(action, companies, data) == 3
+            updates = [q["sql"] for q in queries if re.match(r'UPDATE\s+"calling_app_company"', q["sql"])]
+            assert updates, action
+            for sql in updates:
+                assert "SELECT" not in sql.upper(), sql
@@ -0,0 +1,141 @@
+import csv
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from calling_app import changelog
+from calling_app.bulk_actions import apply_bulk_action
+from calling_app.importers import import_companies
+from calling_app.merge import merge_companies
+from calling_app.models import ChangeLogEntry, Company, CompanyStatus, ContactPerson, Holding, Phone
+
+
+class ChangeLogTest(TestCase):
+    def setUp(self):
+        self.status = CompanyStatus.objects.create(status_name="active")
+        self.company = Company.objects.create(edrpou="10000001", name="ТОВ Агро", hectares=100, status=self.status)
+        self.start_pk = ChangeLogEntry.objects.latest("pk").pk
+        # курсор споживача — seq після всього, що вже є в журналі
+        self.start = changelog.changes_since(0, changelog.MAX_LIMIT)[1]
+
+    def entries(self):
+        return list(ChangeLogEntry.objects.filter(pk__gt=self.start_pk).values_list("model", "object_id", "action"))
+
+    def test_signals_log_save_delete_and_m2m(self):
+        self.start_pk = 0
+        phone = Phone.objects.create(number="+380501234567")
+        phone.companies.add(self.company)
+        phone.companies.clear()
+        phone_id = phone.pk
+        phone.delete()
+        assert self.entries() == [
+            ("company", self.company.pk, "create"),
+            ("phone", phone_id, "create"),
+            ("phone", phone_id, "add"),
+            ("phone", phone_id, "remove"),
+            ("phone", phone_id, "delete"),
+        ]
+        added = ChangeLogEntry.objects.get(model="phone", action="add")
+        assert added.data == {"field": "companies", "ids": [self.company.pk]}
+
+    def test_bulk_action_logs_every_company(self):
+        other = Company.objects.create(edrpou="10000002", name="ТОВ Поле", hectares=50, status=self.status)
+        self.start_pk = ChangeLogEntry.objects.latest("pk").pk
+        holding = Holding.objects.create(name="Холдинг")
+        apply_bulk_action("holding", Company.objects.all(), {"holding": holding})
+        logged = ChangeLogEntry.objects.filter(pk__gt=self.start_pk, model="company")
+        assert {entry.object_id for entry in logged} == {self.company.pk, other.pk}
+        assert logged[0].data == {"bulk_action": "holding", "holding_id": holding.pk}
+
+    def test_bulk_plan_calls_log_created_plans(self):
+        when = self.company.updated_at
+        apply_bulk_action("plan_calls", Company.objects.all(), {"planned_datetime": when})
+        entry = ChangeLogEntry.objects.get(model="callplan")
+        assert entry.action == "create"
+        assert entry.data["company_id"] == self.company.pk and entry.data["status"] == "on"
+        # MySQL не повертає id з bulk INSERT — плани дочитуються
+        with mock.patch.object(type(connection.features), "can_return_rows_from_bulk_insert", False):
+            apply_bulk_action("plan_calls", Company.objects.all(), {"planned_datetime": when})
+        assert ChangeLogEntry.objects.filter(model="callplan", action="create").count() == 2
+
+    def test_import_logs_creates_updates_and_links(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, "registry.csv")
+
+        def run(name):
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                writer = csv.writer(f, delimiter=";")
+                writer.writerow(["ЄДРПОУ", "Назва", "Телефони", "ПІБ"])
+                writer.writerow(["20000002", name, "0971234567", "Петренко Петро"])
+            start = ChangeLogEntry.objects.latest("pk").pk
+            import_companies(path)
+            return ChangeLogEntry.objects.filter(pk__gt=start)
+
+        first = run("Нова")
+        actions = {(e.model, e.action) for e in first}
+        assert actions == {("company", "create"), ("phone", "create"), ("contactperson", "create"),
+                           ("phone", "add"), ("contactperson", "add")}
+        company = Company.objects.get(edrpou="20000002")
+        assert first.get(model="company").data["name"] == "Нова"
+        assert first.get(model="phone", action="add").data == {"field": "companies", "ids": [company.pk]}
+
+        second = run("Перейменована")
+        assert [(e.model, e.action, e.data["name"]) for e in second] == [("company", "update", "Перейменована")]
+
+    def test_merge_records_merged_ids(self):
+        loser = Company.objects.create(edrpou="10000002", name="ТОВ Агро", hectares=100, status=self.status)
+        merge_companies(self.company.pk, [loser.pk])
+        entry = ChangeLogEntry.objects.filter(model="company", object_id=self.company.pk).latest("pk")
+        assert entry.data["merged"] == [loser.pk]
+
+    def test_cursor_pagination(self):
+        for i in range(5):
+            ContactPerson.objects.create(full_name=f"Контакт {i}")
+        first, cursor, has_more = changelog.changes_since(self.start, limit=3)
+        assert [c["model"] for c in first] == ["contactperson"] * 3 and has_more
+        rest, cursor, has_more = changelog.changes_since(cursor, limit=3)
+        assert len(rest) == 2 and not has_more
+        assert changelog.changes_since(cursor) == ([], cursor, False)
+
+    def test_entry_committed_late_with_lower_id_is_not_skipped(self):
+        # транзакція отримала id раніше, а закомітилась після того, як споживач прочитав новіші записи
+        reserved = ChangeLogEntry.objects.create(model="contactperson", object_id=0, action="create")
+        reserved_pk = reserved.pk
+        reserved.delete()
+        ContactPerson.objects.create(full_name="Швидкий")
+        changes, cursor, _ = changelog.changes_since(self.start)
+        assert [c["data"]["full_name"] for c in changes] == ["Швидкий"]
+
+        ChangeLogEntry.objects.create(pk=reserved_pk, model="contactperson", object_id=0, action="create",
+                                      data={"full_name": "Повільний"})
+        changes, next_cursor, _ = changelog.changes_since(cursor)
+        assert [c["data"]["full_name"] for c in changes] == ["Повільний"]
+        assert next_cursor > cursor
+
+    @override_settings(CHANGES_TOKEN="secret")
+    def test_feed_access_and_response(self):
+        ContactPerson.objects.create(full_name="Контакт")
+        url = f"/changes/?since={self.start}"
+        assert self.client.get(url).status_code == 403
+        data = self.client.get(url, HTTP_AUTHORIZATION="Bearer secret").json()
+        assert [c["model"] for c in data["changes"]] == ["contactperson"]
+        assert data["next"] == data["changes"][-1]["seq"] and data["has_more"] is False
+        self.client.force_login(User.objects.create_user("staff", is_staff=True))
+        assert self.client.get("/changes/?since=x").status_code == 400
+
+    def test_command_prints_json_lines(self):
+        for i in range(3):
+            ContactPerson.objects.create(full_name=f"Контакт {i}")
+        out, err = StringIO(), StringIO()
+        call_command("changes", since=self.start, limit=2, all=True, stdout=out, stderr=err)
+        lines = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert len(lines) == 3
+        assert f"--since={lines[-1]['seq']}" in err.getvalue()
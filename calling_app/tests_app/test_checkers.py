@@ -0,0 +1,32 @@
+from django.test import SimpleTestCase
+
+from calling_app.checkers import (check_edrpou, check_edrpous, check_emails, check_person, check_persons,
+                                  check_phone, check_phones, is_valid_email)
+
+
+class BatchCheckersTest(SimpleTestCase):
+    def test_phones_match_single_value_checker(self):
+        values = ["097 123-45-67", "+38 (050) 111 22 33", "12", None, ""]
+        numbers, errors = check_phones(values)
+        assert numbers == [check_phone(v) for v in values]
+        assert errors == [False, False, True, False, False]
+
+    def test_edrpous(self):
+        values = ["1234567", "ЄДРПОУ 87654321", "123456789", None, "0"]
+        result, errors = check_edrpous(values)
+        assert result == ["01234567", "87654321", "00000000", "00000000", "00000000"]
+        assert errors == [False, False, True, True, True]
+        assert result[:3] == [check_edrpou(v) for v in values[:3]]
+
+    def test_persons(self):
+        values = ["  іванов   ІВАН ", "аа", "О’Коннор", ""]
+        result, errors = check_persons(values)
+        assert result == ["Іванов Іван", "Офіс", "О'коннор", "Невідома"]
+        assert result == [check_person(v) for v in values]
+        assert errors == [False, False, False, True]
+
+    def test_emails(self):
+        result, errors = check_emails([" Info@Agro.UA ", "bad@", None])
+        assert result == ["info@agro.ua", None, None]
+        assert errors == [False, True, False]
+        assert is_valid_email("bad@") is False
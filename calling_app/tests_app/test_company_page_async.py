@@ -0,0 +1,40 @@
+import re
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.test import RequestFactory, TransactionTestCase
+
+from calling_app import views
+from calling_app.models import CompanyStatus, Crop, District, Region
+from calling_app.tests_app.test_query_budget import build_company
+
+CSRF_INPUT = re.compile(rb'<input type="hidden" name="csrfmiddlewaretoken" value="[^"]*">')
+
+
+# Секції читаються в окремих потоках зі своїми з'єднаннями — їм потрібні закомічені дані
+class CompanyPageAsyncTest(TransactionTestCase):
+    def setUp(self):
+        status = CompanyStatus.objects.create(status_name="active")
+        region = Region.objects.create(region="Київська")
+        district = District.objects.create(region=region, district="Бучанський")
+        crop = Crop.objects.create(name="Пшениця")
+        self.company = build_company("10000000", 3, status, region, district, crop)
+        self.user = User.objects.create_user("manager")
+
+    def request(self):
+        request = RequestFactory().get(f"/company/{self.company['edrpou']}/")
+        request.user = self.user
+        return request
+
+    def test_renders_same_page_as_sync_view(self):
+        sync = views.company_page(self.request(), self.company["edrpou"])
+        concurrent = async_to_sync(views.company_page_async)(self.request(), self.company["edrpou"])
+        assert concurrent.status_code == 200
+        assert CSRF_INPUT.sub(b"", concurrent.content) == CSRF_INPUT.sub(b"", sync.content)
+        assert "ТОВ Агро 10000000" in concurrent.content.decode()
+
+    def test_unknown_company_is_404(self):
+        from django.http import Http404
+
+        with self.assertRaises(Http404):
+            async_to_sync(views.company_page_async)(self.request(), "99999999")
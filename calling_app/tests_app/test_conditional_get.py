@@ -0,0 +1,70 @@
+import gzip
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from calling_app import prefix_index
+from calling_app.models import Company, CompanyStatus, Holding, Phone
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        status = CompanyStatus.objects.create(status_name="active")
+        holding = Holding.objects.create(name="Агрохолдинг")
+        cls.company = Company.objects.create(edrpou="12345678", name="ТОВ Агро", hectares=100, status=status,
+                                             holding=holding)
+        cls.sibling = Company.objects.create(edrpou="87654321", name="ФГ Колос", hectares=50, status=status,
+                                             holding=holding)
+        cls.user = User.objects.create_user("manager")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        prefix_index.BACKGROUND_REBUILD = False
+        self.addCleanup(setattr, prefix_index, "BACKGROUND_REBUILD", True)
+        self.url = f"/company/{self.company.edrpou}/"
+
+    def etag(self, url=None) -> str:
+        response = self.client.get(url or self.url)
+        assert response.status_code == 200
+        return response["ETag"]
+
+    def test_unchanged_page_is_304_after_one_lookup(self):
+        etag = self.etag()
+        assert self.client.get(self.url)["Last-Modified"]
+        with self.assertNumQueries(3):  # сесія, користувач, updated_at компанії
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+    def test_related_rows_change_etag(self):
+        etag = self.etag()
+        phone = Phone.objects.create(number="+380671234567")
+        phone.companies.add(self.company)
+        assert self.etag() != etag
+
+        etag = self.etag()
+        phone.number = "+380671234568"
+        phone.save()
+        assert self.etag() != etag
+
+    def test_holding_sibling_change_etag(self):
+        etag = self.etag()
+        self.sibling.hectares = 70
+        self.sibling.save()
+        assert self.etag() != etag
+
+    def test_calls_and_links_pages(self):
+        for url in (f"/company/calls_of_company/{self.company.edrpou}/",
+                    f"/company/show_all_company_links/{self.company.edrpou}/"):
+            etag = self.etag(url)
+            assert self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    def test_autocomplete_json_304(self):
+        url = "/autocomplete/company/?q=Агро"
+        etag = self.etag(url)
+        assert self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    def test_companies_list_is_gzipped(self):
+        response = self.client.get("/companies/", HTTP_ACCEPT_ENCODING="gzip")
+        assert response["Content-Encoding"] == "gzip"
+        assert "ТОВ Агро" in gzip.decompress(response.content).decode()
@@ -0,0 +1,97 @@
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from calling_app.models import Call, Company, ContactPerson, Holding, Region, District, Phone, CompanyStatus
+from calling_app.management.commands import copy_db
+from calling_app.management.commands.copy_db import _dependency_order, _insert_rows as insert_rows, _scan_table
+
+TARGET = "secondary"
+
+
+class DependencyOrderTest(SimpleTestCase):
+    def test_referenced_tables_go_first(self):
+        through = Phone.companies.through
+        order = _dependency_order([through, Company, Phone, District, Region, Holding, CompanyStatus])
+        assert order.index(Region) < order.index(District) < order.index(Company)
+        assert order.index(Holding) < order.index(Company)
+        assert order.index(Company) < order.index(through)
+        assert order.index(Phone) < order.index(through)
+
+
+class ScanTableTest(TestCase):
+    def test_count_and_checksum_are_stable(self):
+        Holding.objects.create(name="A")
+        Holding.objects.create(name="B")
+        batches = []
+        count, checksum = _scan_table("default", Holding, 1, on_batch=batches.append)
+        assert count == 2
+        assert [row[1] for batch in batches for row in batch] == ["A", "B"]
+        assert _scan_table("default", Holding, 100) == (count, checksum)
+
+
+@skipUnless(TARGET in settings.DATABASES, f"потрібна друга база DATABASES[{TARGET!r}] (DB_ENGINE=sqlite)")
+class CopyDbCommandTest(TransactionTestCase):
+    """
+    Повне копіювання default → secondary: читачі в потоках, INSERT у порядку FK,
+    звірка контрольних сум. TransactionTestCase — потоки-читачі мають бачити дані.
+    """
+    databases = {"default", TARGET}
+    models = [Region, District, Holding, CompanyStatus, Company, ContactPerson, Phone, Phone.companies.through,
+              Call, Call.company.through]
+
+    def setUp(self):
+        region = Region.objects.create(region="Київська")
+        district = District.objects.create(region=region, district="Бучанський")
+        holding = Holding.objects.create(name="Агро")
+        status = CompanyStatus.objects.create(status_name="Активна")
+        self.companies = [
+            Company.objects.create(edrpou=f"{i:08d}", name=f"Компанія {i}", hectares=i * 10, holding=holding,
+                                   status=status, region=region, district=district)
+            for i in range(1, 8)
+        ]
+        contact = ContactPerson.objects.create(full_name="Іван Петренко", position="Агроном")
+        contact.companies.add(*self.companies[:2])
+        self.phone = Phone.objects.create(number="+380501112233", contact=contact)
+        self.phone.companies.add(*self.companies[:3])
+        call = Call.objects.create(phone=self.phone, notes="Дзвінок")
+        call.company.add(self.companies[0])
+
+    def copy(self, **options):
+        call_command("copy_db", source="default", target=TARGET, apps=["calling_app"], truncate=True,
+                     batch_size=2, workers=3, stdout=StringIO(), stderr=StringIO(), **options)
+
+    def test_copies_rows_with_matching_checksums_and_relations(self):
+        self.copy()
+
+        for model in self.models:
+            source = _scan_table("default", model, 100)
+            assert source[0] == model.objects.count() > 0, model
+            assert _scan_table(TARGET, model, 100) == source, model
+
+        company = Company.objects.using(TARGET).select_related("region", "district__region").get(edrpou="00000002")
+        assert company.region.region == "Київська"
+        assert company.district.region_id == company.region_id
+        phone = Phone.objects.using(TARGET).get(number="+380501112233")
+        assert phone.pk == self.phone.pk
+        assert phone.contact.full_name == "Іван Петренко"
+        assert sorted(phone.companies.values_list("edrpou", flat=True)) == ["00000001", "00000002", "00000003"]
+        assert list(phone.calls.values_list("company__edrpou", flat=True)) == ["00000001"]
+
+    def test_checksum_mismatch_fails(self):
+        name = Company._meta.concrete_fields.index(Company._meta.get_field("name"))
+
+        def corrupt(alias, model, rows, batch_size):
+            if model is Company:   # у ціль потрапляє інша назва першої компанії, кількість рядків та сама
+                rows = [(*row[:name], "Інша назва", *row[name + 1:]) if i == 0 else row for i, row in enumerate(rows)]
+            insert_rows(alias, model, rows, batch_size)
+
+        stderr = StringIO()
+        with mock.patch.object(copy_db, "_insert_rows", corrupt), \
+                self.assertRaisesMessage(CommandError, "Дані не збігаються у 1 таблицях: calling_app_company"):
+            call_command("copy_db", source="default", target=TARGET, apps=["calling_app"], truncate=True,
+                         stdout=StringIO(), stderr=stderr)
+        assert "[MISMATCH] calling_app_company" in stderr.getvalue()
+        assert Company.objects.using(TARGET).count() == Company.objects.count()
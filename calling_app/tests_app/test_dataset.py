@@ -0,0 +1,28 @@
+from django.db.models import F
+from django.test import TestCase
+
+from calling_app.dataset import generate_dataset
+from calling_app.models import Call, CallPlan, Company, ContactPerson, Phone, StockItem, Warehouse
+
+
+class GenerateDatasetTest(TestCase):
+    def test_generates_linked_rows(self):
+        created = generate_dataset(companies=300, calls=2000, seed=7, batch_size=128)
+
+        assert Company.objects.count() == created["calling_app.Company"] == 300
+        assert Call.objects.count() == 2000 and Call.company.through.objects.count() == 2000
+        assert CallPlan.objects.count() == 90
+        assert Warehouse.objects.count() == 3
+        assert ContactPerson.objects.count() >= 300 and StockItem.objects.exists()
+        # кожен дзвінок — на телефон своєї компанії
+        assert not Call.objects.exclude(company__phones=F("phone")).exists()
+        # спільні телефони є
+        assert Phone.objects.count() < Phone.companies.through.objects.count()
+
+    def test_same_seed_same_data(self):
+        generate_dataset(companies=50, calls=100, seed=3)
+        first = list(Company.objects.order_by("pk").values_list("name", "hectares", "region_id"))
+        Company.objects.all().delete()
+        generate_dataset(companies=50, calls=100, seed=3)
+        second = list(Company.objects.order_by("pk").values_list("name", "hectares", "region_id"))
+        assert first == second
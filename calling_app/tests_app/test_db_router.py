@@ -0,0 +1,94 @@
+from unittest import skipUnless
+
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TransactionTestCase, override_settings
+from django.urls import resolve
+
+from calling_app.db_router import PIN_COOKIE, ReplicaRoutingMiddleware, is_pinned, read_from_replica
+from calling_app.models import Company, CompanyStatus, Region
+
+
+# Репліка — друга база з власними даними (DATABASES["secondary"] у профілі DB_ENGINE=sqlite),
+# тож видно, куди пішло читання. TransactionTestCase: транзакція TestCase закріпила б усі читання за primary.
+REPLICA = "secondary"
+
+
+@skipUnless(REPLICA in settings.DATABASES, f"потрібна друга база DATABASES[{REPLICA!r}] (DB_ENGINE=sqlite)")
+@override_settings(DATABASE_REPLICAS=[REPLICA], READ_REPLICA_VIEWS=["companies"])
+class ReplicaRouterTest(TransactionTestCase):
+    databases = {"default", REPLICA}
+
+    def setUp(self):
+        Region.objects.using(REPLICA).create(region="Лише на репліці")
+
+    def on_replica(self) -> bool:
+        return Region.objects.filter(region="Лише на репліці").exists()
+
+    def test_reads_go_to_primary_by_default(self):
+        assert not self.on_replica()
+
+    def test_reads_go_to_replica_inside_block(self):
+        with read_from_replica():
+            assert Company.objects.all().db == REPLICA
+            assert self.on_replica()
+        assert not self.on_replica()
+
+    def test_write_pins_rest_of_block_to_primary(self):
+        with read_from_replica():
+            Region.objects.create(region="Нова")
+            assert is_pinned()
+            assert Region.objects.filter(region="Нова").exists()
+            with read_from_replica():
+                assert not self.on_replica()
+        assert not is_pinned()
+        with read_from_replica():
+            assert self.on_replica()
+
+    def test_atomic_block_reads_from_primary(self):
+        with read_from_replica(), transaction.atomic():
+            assert not self.on_replica()
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas_everything_is_primary(self):
+        with read_from_replica():
+            assert Company.objects.all().db == "default"
+
+    def run_middleware(self, method: str = "get", cookies: dict = None, write: bool = False):
+        seen = {}
+
+        def view(request):
+            if write:
+                CompanyStatus.objects.create(status_name="Новий")
+            seen["replica"] = self.on_replica()
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(view)
+        request = getattr(RequestFactory(), method)("/companies/")
+        request.COOKIES.update(cookies or {})
+        request.resolver_match = resolve("/companies/")
+
+        def get_response(req):
+            middleware.process_view(req, view, (), {})
+            return view(req)
+
+        middleware.get_response = get_response
+        return middleware(request), seen["replica"]
+
+    def test_middleware_routes_listed_get_views_to_replica(self):
+        response, replica = self.run_middleware()
+        assert replica
+        assert PIN_COOKIE not in response.cookies
+
+    def test_middleware_keeps_post_on_primary(self):
+        _, replica = self.run_middleware("post")
+        assert not replica
+
+    def test_write_sets_pin_cookie_and_cookie_pins_next_request(self):
+        response, replica = self.run_middleware(write=True)
+        assert not replica
+        assert response.cookies[PIN_COOKIE]["max-age"] == 5
+
+        _, replica = self.run_middleware(cookies={PIN_COOKIE: "1"})
+        assert not replica
@@ -0,0 +1,156 @@
+import os
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from calling_app.dedup import (
+    contact_blocking_key,
+    find_contact_duplicates,
+    find_phone_duplicates,
+    phone_blocking_key,
+    score_contacts,
+)
+from calling_app.merge import group_pairs, merge_companies, merge_contacts, merge_phones
+from calling_app.models import (Call, CallPlan, Company, CompanyEmail, CompanyNameBand, CompanyStatus, ContactPerson,
+                                Crop, Phone, StockItem, Warehouse)
+
+
+class BlockingKeysTest(TestCase):
+    def test_phone_key(self):
+        assert phone_blocking_key("+380971234567") == phone_blocking_key("097 123-45-67") == "971234567"
+        assert phone_blocking_key("12") is None
+
+    def test_contact_key_and_score(self):
+        assert contact_blocking_key("іванов іван петрович") == contact_blocking_key("Іванов І.П.") == "іванов іп"
+        assert contact_blocking_key("Офіс") is None
+        assert score_contacts("Іванов Іван Петрович", "Іванов І. П.") >= 0.6
+        assert score_contacts("Іванов Іван", "Іванов Ігор") == 0.0
+
+
+class MergeDuplicatesTest(TestCase):
+    def setUp(self):
+        status, _ = CompanyStatus.objects.get_or_create(status_name="active")
+        self.c1 = Company.objects.create(edrpou="11111111", name="Агро", status=status)
+        self.c2 = Company.objects.create(edrpou="22222222", name="Поле", status=status)
+
+    def test_merge_phones_rewires_relations(self):
+        keep = Phone.objects.create(number="+380971234567")
+        dup = Phone.objects.create(number="0971234567", contact=ContactPerson.objects.create(full_name="Іванов Іван"))
+        keep.companies.add(self.c1)
+        dup.companies.add(self.c1, self.c2)
+        call = Call.objects.create(phone=dup)
+        plan = CallPlan.objects.create(phone=dup, company=self.c1, planned_datetime=timezone.now())
+
+        proposals = list(find_phone_duplicates())
+        assert [(p.keep_id, p.merge_ids) for p in proposals] == [(keep.id, (dup.id,))]
+
+        merge_phones(keep.id, [dup.id])
+        keep.refresh_from_db()
+        assert not Phone.objects.filter(pk=dup.id).exists()
+        assert keep.contact.full_name == "Іванов Іван"
+        assert set(keep.companies.all()) == {self.c1, self.c2}
+        assert Call.objects.get(pk=call.pk).phone_id == keep.id
+        assert CallPlan.objects.get(pk=plan.pk).phone_id == keep.id
+
+    def test_merge_contacts(self):
+        full = ContactPerson.objects.create(full_name="Іванов Іван Петрович")
+        short = ContactPerson.objects.create(full_name="Іванов І.П.", position="директор")
+        other = ContactPerson.objects.create(full_name="Іванов Ігор Петрович")
+        full.companies.add(self.c1)
+        short.companies.add(self.c1, self.c2)
+        phone = Phone.objects.create(number="+380501112233", contact=short)
+
+        proposals = list(find_contact_duplicates())
+        assert [(p.keep_id, p.merge_ids) for p in proposals] == [(full.id, (short.id,))]
+
+        merge_contacts(full.id, [short.id])
+        full.refresh_from_db()
+        assert full.position == "директор"
+        assert set(full.companies.all()) == {self.c1, self.c2}
+        assert Phone.objects.get(pk=phone.pk).contact_id == full.id
+        assert ContactPerson.objects.filter(pk=other.pk).exists()
+
+    def test_merges_touch_linked_companies(self):
+        past = timezone.now() - timezone.timedelta(days=1)
+        keep = ContactPerson.objects.create(full_name="Іванов Іван", position="директор")
+        dup = ContactPerson.objects.create(full_name="Іванов І.")
+        dup.companies.add(self.c2)
+        phone = Phone.objects.create(number="+380501112233", contact=dup)
+        phone_dup = Phone.objects.create(number="0501112233")
+        Call.objects.create(phone=phone_dup).company.add(self.c1)
+
+        Company.objects.update(updated_at=past)
+        merge_contacts(keep.id, [dup.id])   # посада вже є — keep.save() не викликається
+        assert Company.objects.get(pk=self.c2.pk).updated_at > past
+
+        Company.objects.update(updated_at=past)
+        merge_phones(phone.id, [phone_dup.id])
+        assert Company.objects.get(pk=self.c1.pk).updated_at > past
+
+    def test_commands_roundtrip(self):
+        Phone.objects.create(number="+380971234567")
+        Phone.objects.create(number="380971234567")
+        path = os.path.join(self.id().replace(".", "_") + ".csv")
+        devnull = open(os.devnull, "w")
+        try:
+            call_command("find_duplicates", kind="phones", output=path, stdout=devnull)
+            call_command("merge_duplicates", kind="phones", input=path, dry_run=True, stdout=devnull)
+            assert Phone.objects.count() == 2
+            call_command("merge_duplicates", kind="phones", input=path, stdout=devnull)
+            assert list(Phone.objects.values_list("number", flat=True)) == ["+380971234567"]
+        finally:
+            devnull.close()
+            os.remove(path)
+
+
+class MergeCompaniesTest(TestCase):
+    def setUp(self):
+        status, _ = CompanyStatus.objects.get_or_create(status_name="active")
+        self.keep = Company.objects.create(edrpou="11111111", name="Агро", status=status)
+        self.dup = Company.objects.create(edrpou="22222222", name="ТОВ Агро", status=status, hectares=500)
+
+    def test_group_pairs_follows_chains(self):
+        assert group_pairs([(1, 2), (2, 3), (4, 5)]) == {1: [2, 3], 4: [5]}
+
+    def test_merge_companies_rewires_everything(self):
+        phone = Phone.objects.create(number="+380971234567")
+        phone.companies.add(self.keep, self.dup)
+        contact = ContactPerson.objects.create(full_name="Іванов Іван")
+        contact.companies.add(self.dup)
+        email = CompanyEmail.objects.create(email="a@agro.ua")
+        email.companies.add(self.dup)
+        call = Call.objects.create(phone=phone)
+        call.company.add(self.dup)
+        plan = CallPlan.objects.create(company=self.dup, planned_datetime=timezone.now())
+        warehouse = Warehouse.objects.create(capacity_tons=100)
+        warehouse.owners.add(self.dup)
+        warehouse.clients.add(self.keep, self.dup)
+        wheat = Crop.objects.create(name="Пшениця")
+        StockItem.objects.create(company=self.keep, crop=wheat, quantity=10)
+        StockItem.objects.create(company=self.dup, crop=wheat, quantity=5)
+
+        merge_companies(self.keep.id, [self.dup.id])
+        keep = Company.objects.get(pk=self.keep.pk)
+
+        assert not Company.objects.filter(pk=self.dup.pk).exists()
+        assert keep.hectares == 500
+        assert list(keep.phones.all()) == [phone]
+        assert list(keep.contacts.all()) == [contact]
+        assert list(keep.emails.all()) == [email]
+        assert list(keep.calls.all()) == [call]
+        assert CallPlan.objects.get(pk=plan.pk).company_id == keep.id
+        assert list(keep.owned_warehouses.all()) == [warehouse]
+        assert list(warehouse.clients.all()) == [keep]
+        assert list(keep.stock_items.values_list("quantity", flat=True)) == [15]
+        assert set(CompanyNameBand.objects.values_list("company_id", flat=True)) == {keep.id}
+
+    def test_merge_companies_command(self):
+        devnull = open(os.devnull, "w")
+        try:
+            call_command("merge_companies", "11111111:22222222", dry_run=True, stdout=devnull)
+            assert Company.objects.count() == 2
+            call_command("merge_companies", "11111111:22222222", stdout=devnull)
+        finally:
+            devnull.close()
+        assert list(Company.objects.values_list("edrpou", flat=True)) == ["11111111"]
@@ -0,0 +1,36 @@
+import csv
+import io
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from calling_app.models import Company, CompanyStatus
+
+
+class ExportCompaniesCsvTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        CompanyStatus.objects.get_or_create(status_name="active")
+        cls.user = User.objects.create_user("operator", password="pass")
+        Company.objects.create(edrpou="12345678", name="Агро Плюс", hectares=500)
+        Company.objects.create(edrpou="87654321", name="Сонях", hectares=50)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def export(self, params):
+        response = self.client.get(reverse("export_companies"), params)
+        assert response.status_code == 200
+        assert response.streaming
+        content = b"".join(response.streaming_content).decode("utf-8-sig")
+        return list(csv.reader(io.StringIO(content)))
+
+    def test_export_uses_list_filters(self):
+        rows = self.export({"fast_search": "on", "search": "Агро"})
+        assert rows[0][0] == "ЄДРПОУ"
+        assert [row[0] for row in rows[1:]] == ["12345678"]
+
+    def test_export_hectares_range_and_sort(self):
+        rows = self.export({"hectares_min": "10", "sort": "hectares", "direction": "desc"})
+        assert [row[0] for row in rows[1:]] == ["12345678", "87654321"]
@@ -0,0 +1,77 @@
+import random
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from calling_app import geo
+from calling_app.models import Warehouse
+
+KYIV = (50.4501, 30.5234)
+
+
+class GeohashTest(TestCase):
+    def test_known_geohash_and_ranges(self):
+        assert geo.geohash(57.64911, 10.40744, 11) == "u4pruydqqvj"
+        assert geo.cell_range("u4z") == ("u4z", "u5")
+        assert geo.cell_range("zz") == ("zz", None)
+
+    def test_neighbour_cells_cover_radius(self):
+        precision = geo.search_precision(KYIV[0], 20)
+        cells = geo.neighbour_cells(*KYIV, precision)
+        assert len(cells) == 9
+        rng = random.Random(1)
+        for _ in range(200):   # будь-яка точка в межах 20 км потрапляє в одну з 9 комірок
+            lat = KYIV[0] + rng.uniform(-0.18, 0.18)
+            lon = KYIV[1] + rng.uniform(-0.28, 0.28)
+            if geo.haversine_km(*KYIV, [lat], [lon])[0] <= 20:
+                assert geo.geohash(lat, lon, precision) in cells
+
+
+class NearestWarehousesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(7)
+        for i in range(300):
+            Warehouse.objects.create(
+                name=f"Склад {i}", capacity_tons=Decimal(rng.randrange(500, 20_000)),
+                transport_type=rng.choice(["rail", "auto", "port"]),
+                latitude=Decimal(f"{KYIV[0] + rng.uniform(-1.5, 1.5):.6f}"),
+                longitude=Decimal(f"{KYIV[1] + rng.uniform(-2, 2):.6f}"),
+            )
+        Warehouse.objects.create(name="Без координат", capacity_tons=Decimal(100))
+
+    def brute_force(self, radius_km, k, **filters):
+        warehouses = [w for w in Warehouse.objects.filter(latitude__isnull=False, **filters)]
+        distances = geo.haversine_km(*KYIV, [float(w.latitude) for w in warehouses],
+                                     [float(w.longitude) for w in warehouses])
+        ranked = sorted((d, w.pk) for d, w in zip(distances, warehouses) if d <= radius_km)
+        return [pk for _, pk in ranked[:k]]
+
+    def test_matches_full_scan(self):
+        for radius in (10, 40, 150, 1000):
+            with self.subTest(radius=radius):
+                found = geo.nearest_warehouses(*KYIV, k=15, radius_km=radius)
+                assert [n.warehouse.pk for n in found] == self.brute_force(radius, 15)
+                assert all(n.distance_km <= radius for n in found)
+
+    def test_filters_and_query_count(self):
+        with self.assertNumQueries(2):   # кандидати з сусідніх комірок, потім k складів
+            found = geo.nearest_warehouses(*KYIV, k=5, radius_km=60, transport_types=["rail"],
+                                           min_capacity_tons=Decimal(5000))
+        assert [n.warehouse.pk for n in found] == self.brute_force(
+            60, 5, transport_type="rail", capacity_tons__gte=Decimal(5000))
+
+    def test_grid_cell_follows_coordinates(self):
+        warehouse = Warehouse.objects.create(name="Новий", capacity_tons=Decimal(10),
+                                             latitude=Decimal("49.8397"), longitude=Decimal("24.0297"))
+        assert warehouse.grid_cell == geo.geohash(49.8397, 24.0297)
+        warehouse.latitude = warehouse.longitude = None
+        warehouse.save()
+        assert Warehouse.objects.get(pk=warehouse.pk).grid_cell is None
+
+    def test_command(self):
+        out = StringIO()
+        call_command("nearest_warehouses", lat=KYIV[0], lon=KYIV[1], radius=30, k=3, stdout=out)
+        assert "Знайдено складів:" in out.getvalue()
@@ -0,0 +1,32 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from calling_app import utils
+from calling_app.models import Company, CompanyStatus, Holding
+
+
+class AddCompanyToHoldingTest(TestCase):
+    def setUp(self):
+        status, _ = CompanyStatus.objects.get_or_create(status_name="active")
+        self.holding = Holding.objects.create(name="Агрохолдинг")
+        for i in range(3):
+            Company.objects.create(edrpou=f"0000000{i}", name=f"Компанія {i}", hectares=100, status=status)
+        self.client.force_login(User.objects.create_user("u"))
+        self.url = f"/add_company_to_holding/{self.holding.id}/"
+
+    def test_page_does_not_render_all_companies(self):
+        response = self.client.get(self.url)
+        assert response.status_code == 200
+        assert "Компанія 1" not in response.content.decode()
+
+    def test_multi_select_attaches_with_one_update(self):
+        with self.assertNumQueries(7):  # сесія, користувач, холдинг, savepoint, журнал змін, один UPDATE, release
+            response = self.client.post(self.url, {"selected_company": ["00000000", "2"]})
+        assert response.status_code == 302
+        assert set(self.holding.companies.values_list("edrpou", flat=True)) == {"00000000", "00000002"}
+
+    def test_attach_invalidates_company_list_cache(self):
+        version = utils.companies_list_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.url, {"selected_company": ["00000001"]})
+        assert utils.companies_list_version() == version + 1
@@ -0,0 +1,118 @@
+import csv
+import os
+import sys
+import tempfile
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from calling_app import utils
+
+from calling_app.models import Company, CompanyStatus, ContactPerson, Phone
+
+
+class ImportCompaniesTest(TestCase):
+    def setUp(self):
+        CompanyStatus.objects.get_or_create(status_name="active")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "registry.csv")
+        self.reject = os.path.join(self.tmp.name, "rejected.csv")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, rows):
+        with open(self.path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f, delimiter=";")
+            writer.writerow(["ЄДРПОУ", "Назва", "Адреса", "Площа", "Телефони", "ПІБ", "Посада"])
+            writer.writerows(rows)
+
+    def test_import_creates_and_links(self):
+        self.write([
+            ["1234567", "Агро", "Київ", "150", "097 123 45 67; 0501112233", "іванов іван", "директор"],
+            ["87654321", "Поле", "Львів", "", "0971234567", "", ""],
+            ["", "Без коду", "", "", "", "", ""],
+            ["11111111", "Ліс", "", "", "12", "", ""],
+        ])
+        call_command("import_companies", self.path, chunk_size=2, reject=self.reject, stdout=open(os.devnull, "w"))
+
+        agro = Company.objects.get(edrpou="01234567")
+        assert agro.hectares == 150
+        assert set(agro.phones.values_list("number", flat=True)) == {"+380971234567", "+380501112233"}
+        assert list(agro.contacts.values_list("full_name", flat=True)) == ["Іванов Іван"]
+        assert Phone.objects.get(number="+380971234567").contact.full_name == "Іванов Іван"
+        # спільний телефон прив'язаний до обох компаній
+        assert Phone.objects.get(number="+380971234567").companies.count() == 2
+        assert Company.objects.filter(edrpou="11111111").exists()
+
+        with open(self.reject, encoding="utf-8-sig") as f:
+            reasons = [row["reason"] for row in csv.DictReader(f)]
+        assert len(reasons) == 2
+
+    def test_reimport_updates_without_duplicates(self):
+        self.write([["12345678", "Стара назва", "", "10", "0971234567", "Петренко", ""]])
+        call_command("import_companies", self.path, stdout=open(os.devnull, "w"))
+        self.write([["12345678", "Нова назва", "", "20", "0971234567", "Петренко", ""]])
+        call_command("import_companies", self.path, stdout=open(os.devnull, "w"))
+
+        company = Company.objects.get(edrpou="12345678")
+        assert (company.name, company.hectares) == ("Нова назва", 20)
+        assert Phone.objects.count() == 1
+        assert ContactPerson.objects.count() == 1
+        assert company.phones.count() == 1
+
+    def test_contacts_are_reused_only_within_company(self):
+        stranger = ContactPerson.objects.create(full_name="Петренко Петро")
+        self.write([
+            ["12345678", "Агро", "", "", "0971234567", "Офіс", ""],
+            ["87654321", "Поле", "", "", "0501112233", "Офіс", ""],
+            ["11111111", "Ліс", "", "", "", "Петренко Петро", ""],
+        ])
+        call_command("import_companies", self.path, stdout=open(os.devnull, "w"))
+        call_command("import_companies", self.path, stdout=open(os.devnull, "w"))
+
+        offices = ContactPerson.objects.filter(full_name="Офіс")
+        assert offices.count() == 2
+        for office in offices:
+            assert office.companies.count() == 1
+            assert list(office.phones.values_list("companies__pk", flat=True)) == [office.companies.get().pk]
+        assert ContactPerson.objects.filter(full_name="Петренко Петро").count() == 2
+        assert not stranger.companies.exists()
+
+    def test_empty_cells_keep_existing_values(self):
+        self.write([["12345678", "Стара назва", "Київ", "10", "", "", ""]])
+        call_command("import_companies", self.path, stdout=open(os.devnull, "w"))
+        self.write([
+            ["12345678", "Нова назва", "", "", "", "", ""],
+            ["87654321", "Поле", "Львів", "", "", "", ""],
+        ])
+        call_command("import_companies", self.path, stdout=open(os.devnull, "w"))
+
+        company = Company.objects.get(edrpou="12345678")
+        assert (company.name, company.legal_address, company.hectares) == ("Нова назва", "Київ", 10)
+        assert Company.objects.get(edrpou="87654321").legal_address == "Львів"
+
+    def test_duplicate_rows_keep_non_empty_values(self):
+        self.write([
+            ["12345678", "Агро", "Київ", "10", "0971234567", "", ""],
+            ["12345678", "Агро", "", "", "0501112233", "", ""],
+        ])
+        call_command("import_companies", self.path, stdout=open(os.devnull, "w"))
+
+        company = Company.objects.get(edrpou="12345678")
+        assert (company.name, company.legal_address, company.hectares) == ("Агро", "Київ", 10)
+        assert company.phones.count() == 2
+
+    def test_import_invalidates_company_list_cache(self):
+        version = utils.companies_list_version()
+        self.write([["12345678", "Агро", "", "", "", "", ""]])
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("import_companies", self.path, stdout=open(os.devnull, "w"))
+        assert utils.companies_list_version() == version + 1
+
+    def test_xlsx_without_openpyxl_is_command_error(self):
+        path = os.path.join(self.tmp.name, "registry.xlsx")
+        open(path, "wb").close()
+        with mock.patch.dict(sys.modules, {"openpyxl": None}), self.assertRaisesMessage(CommandError, "openpyxl"):
+            call_command("import_companies", path, stdout=open(os.devnull, "w"))
@@ -0,0 +1,74 @@
+import json
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from calling_app import metrics, utils
+from calling_app.models import Company, CompanyStatus
+
+
+class MetricsTest(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        override = override_settings(METRICS_DIR=str(self.dir))
+        override.enable()
+        self.addCleanup(override.disable)
+        metrics.REGISTRY = metrics.Registry()
+        metrics._tables_sample = {}
+
+    def test_histogram_rendering(self):
+        registry = metrics.Registry()
+        registry.observe("calling_app_request_duration_seconds", 0.02, view="companies", method="GET")
+        registry.observe("calling_app_request_duration_seconds", 3.0, view="companies", method="GET")
+        text = metrics.render(registry)
+        assert "# TYPE calling_app_request_duration_seconds histogram" in text
+        assert 'calling_app_request_duration_seconds_bucket{method="GET",view="companies",le="0.025"} 1' in text
+        assert 'calling_app_request_duration_seconds_bucket{method="GET",view="companies",le="+Inf"} 2' in text
+        assert 'calling_app_request_duration_seconds_count{method="GET",view="companies"} 2' in text
+
+    def test_other_process_files_are_aggregated(self):
+        other = metrics.Registry()
+        other.inc("calling_app_db_queries_total", 7, view="companies")
+        (self.dir / "99999.json").write_text(json.dumps(other.dump()))
+        metrics.REGISTRY.inc("calling_app_db_queries_total", 3, view="companies")
+
+        total = metrics.collect()
+        assert total.counters[("calling_app_db_queries_total", (("view", "companies"),))] == 10
+
+    def test_endpoint_reports_requests_cache_and_tables(self):
+        Company.objects.create(name="ТОВ Тест", edrpou="12345678", status=CompanyStatus.objects.create(status_name="active"))
+        self.client.get("/login/")
+        metrics.cache_hit("ref_cache")
+
+        assert self.client.get("/metrics").status_code == 403   # без токена — лише staff
+        with override_settings(METRICS_TOKEN="secret"):
+            assert self.client.get("/metrics").status_code == 403
+            response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer secret")
+        text = response.content.decode()
+        assert response["Content-Type"].startswith("text/plain")
+        assert 'calling_app_requests_total{method="GET",status="200",view="login"} 1' in text
+        assert 'calling_app_cache_requests_total{cache="ref_cache",result="hit"}' in text
+        assert 'calling_app_table_rows{table="calling_app_company"} 1' in text
+        assert (self.dir / metrics.TABLES_FILE).is_file()
+
+    def test_large_tables_use_estimate_instead_of_count(self):
+        with mock.patch.object(utils, "estimated_rows", return_value=5_000_000):
+            with self.assertNumQueries(0):
+                rows = metrics.table_rows()
+        assert rows["calling_app_call"] == 5_000_000
+
+        metrics._tables_sample = {}
+        (self.dir / metrics.TABLES_FILE).unlink()
+        with mock.patch.object(utils, "estimated_rows", return_value=None), self.assertNumQueries(3):
+            assert metrics.table_rows()["calling_app_call"] == 0   # статистики немає — точний COUNT(*)
+
+    def test_staff_without_token(self):
+        self.client.force_login(User.objects.create_user("u"))
+        assert self.client.get("/metrics").status_code == 403
+        self.client.force_login(User.objects.create_user("staff", is_staff=True))
+        assert self.client.get("/metrics").status_code == 200
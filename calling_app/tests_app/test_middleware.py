@@ -0,0 +1,78 @@
+import logging
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from calling_app.middleware import RECENT_REPORTS, QueryInstrumentationMiddleware, recent_profiles, sql_fingerprint
+from calling_app.models import CompanyStatus
+
+
+class QueryInstrumentationTest(TestCase):
+    def test_fingerprint_collapses_values(self):
+        assert sql_fingerprint('SELECT * FROM t WHERE id IN (%s, %s, %s) AND x = 5') == \
+            sql_fingerprint("SELECT *  FROM t WHERE id IN (%s, %s) AND x = 7")
+
+    @override_settings(SQL_INSTRUMENTATION=False)
+    def test_disabled_is_not_used(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            QueryInstrumentationMiddleware(lambda request: HttpResponse())
+
+    @override_settings(SQL_INSTRUMENTATION=True, SQL_DUPLICATE_THRESHOLD=3, SQL_SLOW_REQUEST_MS=10_000)
+    def test_records_queries_and_duplicates(self):
+        def view(request):
+            for pk in range(4):
+                CompanyStatus.objects.filter(pk=pk).first()
+            return HttpResponse("ok")
+
+        middleware = QueryInstrumentationMiddleware(view)
+        with self.assertLogs("calling_app.sql", level=logging.WARNING):
+            response = middleware(RequestFactory().get("/x/"))
+
+        report = RECENT_REPORTS[-1]
+        assert report["queries"] == 4 and report["path"] == "/x/"
+        assert report["duplicates"][0]["count"] == 4
+        assert len(report["slowest"]) == 4
+        assert "4 queries" in response["Server-Timing"]
+
+    def test_report_page_is_staff_only(self):
+        user = User.objects.create_user("u")
+        self.client.force_login(user)
+        assert self.client.get("/sql-report/").status_code == 302
+        user.is_staff = True
+        user.save()
+        assert self.client.get("/sql-report/").status_code == 200
+
+
+class ProfilerTest(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.settings_override = override_settings(PROFILE_DIR=Path(self.tmp.name))
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        self.user = User.objects.create_user("staff", is_staff=True)
+
+    def test_non_staff_is_not_profiled(self):
+        self.client.force_login(User.objects.create_user("u"))
+        response = self.client.get("/sql-report/?_profile=1")
+        assert "X-Profile-Id" not in response
+        assert not list(Path(self.tmp.name).glob("*"))
+
+    def test_staff_profile_is_saved_and_listed(self):
+        self.client.force_login(self.user)
+        response = self.client.get("/sql-report/", HTTP_X_PROFILE="1")
+        profile_id = response["X-Profile-Id"]
+
+        report = recent_profiles()[0]
+        assert report["id"] == profile_id and report["path"] == "/sql-report/"
+        assert report["functions"] and report["sql"]["queries"] == 0
+        assert (Path(self.tmp.name) / f"{profile_id}.prof").is_file()
+
+        page = self.client.get("/profiles/", {"id": profile_id})
+        assert page.context["selected"]["id"] == profile_id
+        assert self.client.get(f"/profiles/{profile_id}.prof").status_code == 200
+        assert self.client.get("/profiles/..%2Fsettings.prof").status_code == 404
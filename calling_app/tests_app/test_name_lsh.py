@@ -0,0 +1,51 @@
+from django.test import SimpleTestCase, TestCase
+
+from calling_app.models import Company, CompanyNameBand, CompanyStatus
+from calling_app.name_lsh import (BANDS, duplicate_groups, jaccard, name_bands, name_shingles, normalize_name,
+                                  rebuild_index, similar_companies)
+
+
+class NormalizeNameTest(SimpleTestCase):
+    def test_legal_forms_and_quotes(self):
+        assert normalize_name('ТОВ "Агро-Світ"') == "агро світ"
+        assert normalize_name("Товариство з обмеженою відповідальністю «Агро Світ»") == "агро світ"
+        assert normalize_name("ТОВ") == "тов"
+
+    def test_bands_are_stable_and_similar(self):
+        assert name_bands("ФГ Колос") == name_bands("фг колос")
+        assert len(name_bands("Колос")) == BANDS
+        assert name_bands("") == []
+        assert jaccard(name_shingles("Агросвіт Плюс"), name_shingles("Агросвiт Плюс")) > 0.5
+
+
+class CompanyNameIndexTest(TestCase):
+    def setUp(self):
+        status, _ = CompanyStatus.objects.get_or_create(status_name="active")
+        names = [
+            'ТОВ "Агросвіт Поділля"',
+            "Товариство з обмеженою відповідальністю «Агросвіт-Поділля»",
+            "Агросвіт Поділля",
+            "ФГ Колосок",
+            "Зовсім інша назва",
+        ]
+        self.companies = [
+            Company.objects.create(edrpou=f"{i:08d}", name=name, status=status) for i, name in enumerate(names, 1)
+        ]
+
+    def test_index_updated_on_save(self):
+        company = self.companies[3]
+        assert CompanyNameBand.objects.filter(company=company).count() == BANDS
+        before = set(company.name_bands.values_list("band", "hash"))
+        company.name = "ФГ Пшениця"
+        company.save()
+        assert set(company.name_bands.values_list("band", "hash")) != before
+
+    def test_similar_companies(self):
+        similar = [c for c, _ in similar_companies(self.companies[0])]
+        assert set(similar) == set(self.companies[1:3])
+
+    def test_rebuild_and_groups(self):
+        CompanyNameBand.objects.all().delete()
+        assert rebuild_index(workers=1) == len(self.companies)
+        groups = duplicate_groups()
+        assert [group["ids"] for group in groups] == [[c.id for c in self.companies[:3]]]
@@ -0,0 +1,88 @@
+import time
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+
+from calling_app import prefix_index, ref_cache
+from calling_app.apps import serves_requests
+from calling_app.models import Company, CompanyStatus, District, Region
+from calling_app.prefix_index import PrefixIndex
+
+
+class PrefixIndexTest(SimpleTestCase):
+    def test_search_by_any_word_and_limit(self):
+        index = PrefixIndex([
+            (["агро світ", "світ"], (1, "Агро Світ")),
+            (["агроном"], (2, "Агроном")),
+            (["колос"], (3, "Колос")),
+        ])
+        assert index.search("агро") == [(1, "Агро Світ"), (2, "Агроном")]
+        assert index.search("СВІТ") == [(1, "Агро Світ")]
+        assert index.search("агро", limit=1) == [(1, "Агро Світ")]
+        assert index.search("") == []
+
+
+@mock.patch.object(prefix_index, "BACKGROUND_REBUILD", False)
+class AutocompleteViewsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        ref_cache.invalidate()
+        prefix_index._company.index = None
+        status, _ = CompanyStatus.objects.get_or_create(status_name="active")
+        kyiv = Region.objects.create(region="Київська")
+        lviv = Region.objects.create(region="Львівська")
+        self.fastiv = District.objects.create(region=kyiv, district="Фастівський")
+        District.objects.create(region=lviv, district="Франківський")
+        self.kyiv = kyiv
+        Company.objects.create(edrpou="12345678", name='ТОВ "Агро-Світ"', status=status)
+        self.client.force_login(User.objects.create_user("u"))
+
+    def test_region_and_district(self):
+        assert self.client.get("/autocomplete/region/?q=ки").json() == [{"id": self.kyiv.id, "label": "Київська"}]
+        districts = self.client.get(f"/autocomplete/district/?q=ф&region={self.kyiv.id}").json()
+        assert [d["label"] for d in districts] == ["Фастівський"]
+        assert len(self.client.get("/autocomplete/district/?q=ф").json()) == 2
+
+    def test_company_by_name_and_edrpou_refreshes_on_change(self):
+        assert [c["edrpou"] for c in self.client.get("/autocomplete/company/?q=світ").json()] == ["12345678"]
+        assert [c["edrpou"] for c in self.client.get("/autocomplete/company/?q=1234").json()] == ["12345678"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Company.objects.create(edrpou="87654321", name="Колосок")
+        prefix_index._company.checked_at = time.monotonic() - prefix_index.CHECK_INTERVAL
+        assert [c["label"] for c in self.client.get("/autocomplete/company/?q=кол").json()] == ["Колосок"]
+
+
+class WarmCompanyIndexTest(TransactionTestCase):
+    """TransactionTestCase: фоновий потік читає через власне з'єднання."""
+
+    def setUp(self):
+        cache.clear()
+        prefix_index._company.index = None
+        status, _ = CompanyStatus.objects.get_or_create(status_name="active")
+        Company.objects.create(edrpou="12345678", name="Агро-Світ", status=status)
+
+    def tearDown(self):
+        prefix_index._company.index = None
+
+    def test_index_is_built_in_background(self):
+        prefix_index.warm_company_index().join(timeout=10)
+        assert prefix_index._company.index is not None
+        with mock.patch.object(prefix_index, "build_company_index") as build:
+            assert [c["edrpou"] for c in prefix_index.search_companies("світ")] == ["12345678"]
+        build.assert_not_called()
+
+    def test_only_server_processes_warm_up(self):
+        cases = [
+            (["manage.py", "migrate"], {}, False),
+            (["manage.py", "test", "calling_app"], {}, False),
+            (["manage.py", "runserver"], {}, False),
+            (["manage.py", "runserver"], {"RUN_MAIN": "true"}, True),
+            (["manage.py", "runserver", "--noreload"], {}, True),
+            (["/venv/bin/gunicorn", "calling_db.wsgi"], {}, True),
+        ]
+        for argv, env, expected in cases:
+            with mock.patch("sys.argv", argv), mock.patch.dict("os.environ", env):
+                assert serves_requests() is expected, argv
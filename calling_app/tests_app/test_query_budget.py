@@ -0,0 +1,184 @@
+"""
+Бюджет SQL-запитів для кожного URL з calling_db/urls.py.
+
+Кожна сторінка рендериться для двох компаній — з малою і з великою кількістю
+контактів, телефонів і дзвінків. Кількість запитів не має залежати від
+розміру (N+1) і не має перевищувати заявлений бюджет. Кожен URL міряється
+після прогрівного запиту, тож кеші довідників та індексів не впливають на число.
+У повідомленні про помилку — SQL, що повторювались.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import URLPattern, get_resolver, reverse
+from django.utils import timezone
+
+from calling_app import metrics, prefix_index, utils
+from calling_app.middleware import QueryRecorder, record_queries
+from calling_app.models import (
+    Call, CallPlan, Company, CompanyEmail, CompanyStatus, ContactPerson, Crop, District, Holding, Phone, Region,
+    StockItem, Warehouse,
+)
+
+SMALL, LARGE = 2, 6
+
+# Максимум запитів на один GET (разом із сесією та користувачем);
+# сторінки компанії — ще й з перевіркою ETag (Company.updated_at)
+BUDGETS = {
+    "login": 2,
+    "logout": 0,
+    "main": 2,
+    "home": 2,
+    "companies": 4,
+    "companies_bulk_action": 2,
+    "export_companies": 3,
+    "company_page": 14,
+    "create_company": 2,
+    "update_company": 3,
+    "create_contact": 2,
+    "add_company_to_holding": 5,
+    "sql_report": 2,
+    "metrics": 2,   # сесія і користувач (доступ staff); розміри таблиць — із вибірки раз на хвилину
+    "changes": 7,   # з нумерацією щойно закомічених записів (блокування лічильника)
+    "profiles": 2,
+    "profile_download": 2,
+    "autocomplete_region": 2,
+    "autocomplete_district": 2,
+    "autocomplete_company": 2,
+    "add_contact": 3,
+    "edit_contact": 8,
+    "add_holding": 4,
+    "edit_holding": 7,
+    "add_phone": 3,
+    "edit_phone": 7,
+    "add_call": 7,
+    "edit_call": 7,
+    "calls_of_company": 7,
+    "show_all_company_links": 12,
+    "plan_call_company": 3,
+    "plan_call_phone_call": 6,
+    "edit_plan_call": 4,
+}
+
+
+def iter_patterns():
+    """Іменовані URL проєкту (без вкладених include, як-от admin/)."""
+    for pattern in get_resolver().url_patterns:
+        if isinstance(pattern, URLPattern) and pattern.name:
+            yield pattern
+
+
+def build_company(edrpou: str, size: int, status, region, district, crop) -> dict:
+    """
+    Компанія з холдингом на size компаній, size контактами по size телефонів,
+    size дзвінками на кожен телефон (частина телефонів спільна з компаніями холдингу),
+    size планами, складами, залишками і email.
+    """
+    holding = Holding.objects.create(name=f"Холдинг {edrpou}")
+    company = Company.objects.create(
+        edrpou=edrpou, name=f"ТОВ Агро {edrpou}", legal_address=f"Київська обл., Бучанський р-н, {edrpou}",
+        hectares=1000, status=status, region=region, district=district, holding=holding,
+    )
+    siblings = [
+        Company.objects.create(edrpou=f"{edrpou[:6]}{i:02d}", name=f"Сусід {i}", status=status, holding=holding,
+                               legal_address=company.legal_address)
+        for i in range(1, size + 1)
+    ]
+    email = CompanyEmail.objects.create(email=f"office{edrpou}@agro.ua")
+    email.companies.add(company, *siblings)
+
+    first_phone = first_call = first_contact = None
+    for c in range(size):
+        contact = ContactPerson.objects.create(full_name=f"Петренко Іван Петрович{c}", position="Директор")
+        contact.companies.add(company, siblings[c])
+        first_contact = first_contact or contact
+        for p in range(size):
+            phone = Phone.objects.create(number=f"+380{edrpou}{c}{p}", contact=contact)
+            phone.companies.add(company, siblings[p])
+            first_phone = first_phone or phone
+            for k in range(size):
+                call = Call.objects.create(phone=phone, datetime=timezone.now() - timedelta(days=k), notes="Дзвінок")
+                call.company.add(company)
+                first_call = first_call or call
+    loose = Phone.objects.create(number=f"+380{edrpou}99")
+    loose.companies.add(company)
+
+    plan = None
+    for k in range(size):
+        plan = CallPlan.objects.create(company=company, phone=first_phone, planned_datetime=timezone.now() + timedelta(days=k))
+    for w in range(size):
+        warehouse = Warehouse.objects.create(name=f"Склад {edrpou} {w}", capacity_tons=Decimal(1000), region=region)
+        warehouse.owners.add(company)
+        StockItem.objects.create(company=company, crop=crop, quantity=Decimal(10))
+    return {
+        "edrpou": edrpou,
+        "holding_id": holding.pk,
+        "id_contact": first_contact.pk,
+        "id_phone": first_phone.pk,
+        "id_call": first_call.pk,
+        "id_plan_call": plan.pk,
+        "profile_id": "none",
+    }
+
+
+class QueryBudgetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        status = CompanyStatus.objects.create(status_name="active")
+        region = Region.objects.create(region="Київська")
+        district = District.objects.create(region=region, district="Бучанський")
+        crop = Crop.objects.create(name="Пшениця")
+        ContactPerson.objects.create(full_name="Офіс")
+        cls.small = build_company("10000000", SMALL, status, region, district, crop)
+        cls.large = build_company("20000000", LARGE, status, region, district, crop)
+        cls.user = User.objects.create_user("staff", is_staff=True)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        prefix_index.BACKGROUND_REBUILD = False
+        self.addCleanup(setattr, prefix_index, "BACKGROUND_REBUILD", True)
+        metrics._tables_sample = {}
+
+    def url_for(self, pattern: URLPattern, values: dict) -> str:
+        params = {name: values[name] for name in pattern.pattern.converters}
+        query = {
+            "autocomplete_region": "?q=Ки", "autocomplete_district": "?q=Бу", "autocomplete_company": "?q=Агро",
+            "companies": "?search=Агро",
+        }.get(pattern.name, "")
+        return reverse(pattern.name, kwargs=params) + query
+
+    def count_queries(self, url: str) -> QueryRecorder:
+        self.client.get(url)   # прогрів кешів
+        utils.SearchHash = {}  # але список компаній — без кешу результатів пошуку
+        recorder = QueryRecorder()
+        with record_queries(recorder):
+            response = self.client.get(url)
+            if hasattr(response, "streaming_content"):
+                b"".join(response.streaming_content)
+        return recorder
+
+    @staticmethod
+    def describe(recorder: QueryRecorder) -> str:
+        repeated = "\n".join(f"  ×{n} {sql}" for sql, n in recorder.duplicates()) or "  (повторів немає)"
+        return f"{recorder.count} запитів, повтори:\n{repeated}"
+
+    def test_every_url_has_budget(self):
+        missing = {p.name for p in iter_patterns()} - BUDGETS.keys()
+        assert not missing, f"Немає бюджету запитів для: {sorted(missing)}"
+
+    def test_queries_do_not_grow_and_fit_budget(self):
+        for pattern in iter_patterns():
+            with self.subTest(url=pattern.name):
+                small = self.count_queries(self.url_for(pattern, self.small))
+                large = self.count_queries(self.url_for(pattern, self.large))
+                self.assertEqual(
+                    small.count, large.count,
+                    f"{pattern.name}: кількість запитів росте з даними\n"
+                    f"мала компанія: {self.describe(small)}\nвелика компанія: {self.describe(large)}",
+                )
+                self.assertLessEqual(
+                    large.count, BUDGETS[pattern.name],
+                    f"{pattern.name}: перевищено бюджет {BUDGETS[pattern.name]}\n{self.describe(large)}",
+                )
@@ -0,0 +1,51 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from calling_app import ref_cache
+from calling_app.forms import CompanyForm
+from calling_app.models import CompanyStatus, District, Region
+
+
+class RefCacheTest(TestCase):
+    def setUp(self):
+        cache.delete(ref_cache.VERSION_KEY)
+        ref_cache.invalidate()
+        self.status, _ = CompanyStatus.objects.get_or_create(status_name="active")
+        self.kyiv = Region.objects.create(region="Київська")
+        self.lviv = Region.objects.create(region="Львівська")
+        self.fastiv = District.objects.create(region=self.kyiv, district="Фастівський")
+        self.stryi = District.objects.create(region=self.lviv, district="Стрийський")
+
+    def test_served_from_memory(self):
+        ref_cache.regions()
+        with self.assertNumQueries(0):
+            assert [r.region for r in ref_cache.regions()] == ["Київська", "Львівська"]
+            assert ref_cache.districts(self.kyiv.id) == [self.fastiv]
+            assert str(ref_cache.district(self.stryi.id)) == "Стрийський (Львівська)"
+            assert ref_cache.status("bad") is None
+
+    def test_invalidated_on_change(self):
+        ref_cache.regions()
+        version = cache.get(ref_cache.VERSION_KEY)
+        with self.captureOnCommitCallbacks(execute=True):
+            Region.objects.create(region="Одеська")
+        assert cache.get(ref_cache.VERSION_KEY) == version + 1
+        assert "Одеська" in [r.region for r in ref_cache.regions()]
+
+    def test_company_form_uses_cache(self):
+        ref_cache.regions()
+        with self.assertNumQueries(0):
+            form = CompanyForm()
+            assert [label for _, label in form.fields["district"].choices] == ["---------"]
+            str(form["region"])
+
+        data = {"edrpou": "12345678", "name": "Агро", "status": self.status.id,
+                "region": self.kyiv.id, "district": self.fastiv.id}
+        form = CompanyForm(data)
+        assert form.is_valid(), form.errors
+        company = form.save()
+        assert (company.region_id, company.district_id) == (self.kyiv.id, self.fastiv.id)
+
+        # район іншої області не проходить валідацію
+        form = CompanyForm({**data, "edrpou": "87654321", "district": self.stryi.id})
+        assert not form.is_valid() and "district" in form.errors
@@ -0,0 +1,53 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from calling_app import sqlite_profile
+from calling_app.models import Company, CompanyStatus
+from calling_app.utils import quick_search_companies
+
+
+@skipUnless(connection.vendor == "sqlite", "профіль лише для SQLite")
+class SQLiteProfileTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        status = CompanyStatus.objects.create(status_name="active")
+        cls.agro = Company.objects.create(edrpou="12345678", name="ТОВ Агро Світ", legal_address="м. Київ, вул. Садова 1",
+                                          hectares=750, status=status)
+        Company.objects.create(edrpou="87654321", name="ФГ Колос", legal_address="м. Суми", hectares=120, status=status)
+
+    def pragma(self, name: str):
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def search(self, text: str) -> set:
+        return set(quick_search_companies(Company.objects.all(), text).values_list("edrpou", flat=True))
+
+    def test_pragmas_applied_to_connection(self):
+        assert self.pragma("synchronous") == 1   # NORMAL
+        assert self.pragma("cache_size") == sqlite_profile.TUNED_PRAGMAS["cache_size"]
+        assert self.pragma("temp_store") == 2    # MEMORY
+
+    def test_quick_search_uses_fts(self):
+        assert sqlite_profile.company_fts_ready()
+        assert "calling_app_company_fts" in str(quick_search_companies(Company.objects.all(), "агро").query)
+        assert self.search("агро") == {"12345678"}
+        assert self.search("Садова") == {"12345678"}
+        assert self.search("765") == {"87654321"}
+        assert self.search("750") == {"12345678"}   # площа
+        assert self.search('"Агро') == set()
+
+    def test_triggers_keep_index_current(self):
+        self.agro.name = "ТОВ Нива"
+        self.agro.save()
+        assert self.search("Агро") == set()
+        assert self.search("Нива") == {"12345678"}
+        self.agro.delete()
+        assert self.search("Нива") == set()
+
+    def test_short_search_and_disabled_fts_fall_back_to_like(self):
+        assert "calling_app_company_fts" not in str(quick_search_companies(Company.objects.all(), "Аг").query)
+        with override_settings(SQLITE_FTS=False):
+            assert self.search("Колос") == {"87654321"}
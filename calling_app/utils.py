@@ -1,4 +1,4 @@
-from typing import Optional, Tuple, Set, Type, List
+from typing import Iterable, Optional, Tuple, Set, Type, List
 from django.apps import apps
 from django.contrib import messages
 from django.db.models import (Model, Q, QuerySet, CharField, TextField, ForeignKey, OneToOneField, 
@@ -7,6 +7,9 @@ from django.shortcuts import get_object_or_404, redirect
 from django.http import HttpRequest
 from .models import Phone, Company, ContactPerson, Call, Holding
 from .forms import PhoneForm, ContactForm, HoldingForm
+from . import metrics, sqlite_profile
+from django.core.cache import cache
+from django.db import DatabaseError, connections, transaction
 from django.utils import timezone
 import datetime
 
@@ -14,6 +17,79 @@ QsHash = None
 QsListHash = []
 SearchHash = {}
 
+# Версія даних списку компаній у спільному кеші: кеш SearchHash/QsListHash
+# дійсний лише для тієї версії, з якою його побудовано
+COMPANIES_VERSION_KEY = "calling_app:companies_list:version"
+
+
+def companies_list_version() -> int:
+    version = cache.get(COMPANIES_VERSION_KEY)
+    if version is None:
+        cache.add(COMPANIES_VERSION_KEY, 1, timeout=None)
+        version = cache.get(COMPANIES_VERSION_KEY, 1)
+    return version
+
+
+def invalidate_companies_cache() -> None:
+    """
+    Скидає кеш списку компаній у поточному процесі одразу, а в інших — після
+    коміту (збільшенням версії). Викликати після змін компаній, дзвінків і планів,
+    зокрема після масових update()/bulk_create(), які не надсилають сигналів.
+    """
+    global SearchHash
+
+    def bump():
+        try:
+            cache.incr(COMPANIES_VERSION_KEY)
+        except ValueError:
+            cache.set(COMPANIES_VERSION_KEY, companies_list_version() + 1, timeout=None)
+
+    SearchHash = {}
+    transaction.on_commit(bump)
+
+
+ESTIMATE_MIN_ROWS = 100_000   # менші таблиці рахуються точно
+
+
+def estimated_rows(model, using: str = "default") -> Optional[int]:
+    """
+    Оцінка кількості рядків таблиці зі статистики БД без COUNT(*):
+    information_schema (MySQL), pg_class (PostgreSQL), sqlite_stat1 (SQLite, після ANALYZE).
+    None — якщо статистика недоступна.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    if connection.vendor == "mysql":
+        sql = "SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s"
+    elif connection.vendor == "postgresql":
+        sql = "SELECT reltuples::bigint FROM pg_class WHERE relname = %s"
+    elif connection.vendor == "sqlite":
+        # перше число stat — кількість рядків таблиці (однакова для всіх її індексів)
+        sql = "SELECT CAST(stat AS INTEGER) FROM sqlite_stat1 WHERE tbl = %s LIMIT 1"
+    else:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [table])
+            row = cursor.fetchone()
+    except DatabaseError:   # sqlite_stat1 немає, доки не було ANALYZE
+        return None
+    return int(row[0]) if row and row[0] is not None and row[0] >= 0 else None
+
+
+def touch_companies(companies: Iterable[int] | QuerySet[Company]) -> int:
+    """
+    Позначає компанії (id або QuerySet) зміненими — Company.updated_at одним
+    UPDATE — для змін пов'язаних рядків і масових операцій, після яких сторінки
+    компаній мають віддати новий ETag/Last-Modified.
+    """
+    if isinstance(companies, QuerySet):
+        return companies.update(updated_at=timezone.now())
+    company_ids = {pk for pk in companies if pk}
+    if not company_ids:
+        return 0
+    return Company.objects.filter(pk__in=company_ids).update(updated_at=timezone.now())
+
 
 def get_company_contact(edrpou: str, contact_pk: int) -> Tuple[Company, ContactPerson]:
     """
@@ -64,47 +140,75 @@ def get_filtered_sorted_companies(
                   "hectares_val": hectares_max, 
                   "hectares_op": hectares_min,
                   "fast_search": fast_search,
+                  "version": companies_list_version(),
                   }
-    print(search_hash)
-    print(SearchHash)
-    
+
     if search_hash == SearchHash:
+        metrics.cache_hit("companies_list")
         qs = QsHash
         qs_list = QsListHash
         qs_list.sort(key=lambda c: _sort_key(c, sort), reverse=(direction == "desc"))
-        print("QsHash")
 
     else:
-        qs: QuerySet[Company] = Company.objects.all()
-        qs = Company.objects.annotate(
-            last_call=Max("calls__datetime"),
-            next_call=Min("planned_calls__planned_datetime", 
-                        filter=Q(planned_calls__status="on")  # враховуємо тільки активні плани
-                            )
-            )
-        if not fast_search:
-            qs = search_in_queryset(qs, search) # --- Пошук ---
-        else:
-            qs = quick_search_companies(qs, search)
-        
-        qs = _filter_by_hectares_range(qs, hectares_min, hectares_max) # --- Фільтр по гектарах ---
-
-        
-
-        qs = _sort_queryset(qs, sort, direction, company_headers) # --- Сортування ---
-        
+        metrics.cache_miss("companies_list")
+        qs = build_companies_queryset(company_headers, search, fast_search, hectares_max, hectares_min, sort, direction)
         qs_list = list(qs)
         SearchHash = search_hash
     
     QsHash = qs
     QsListHash = qs_list
 
-    print("QsHash")
     return qs, qs_list
 
 
 
 
+def build_companies_queryset(
+    company_headers: List[str],
+    search: str,
+    fast_search: bool,
+    hectares_max: Optional[str],
+    hectares_min: Optional[str],
+    sort: str,
+    direction: str,
+) -> QuerySet[Company]:
+    """
+    Лінивий QuerySet компаній з анотаціями last_call/next_call, пошуком,
+    фільтром по гектарах і сортуванням — без виконання запиту.
+    Спільний для списку компаній і експорту.
+    """
+    qs = Company.objects.annotate(
+        last_call=Max("calls__datetime"),
+        next_call=Min("planned_calls__planned_datetime",
+                      filter=Q(planned_calls__status="on")  # враховуємо тільки активні плани
+                      )
+    )
+    if not fast_search:
+        qs = search_in_queryset(qs, search) # --- Пошук ---
+    else:
+        qs = quick_search_companies(qs, search)
+
+    qs = _filter_by_hectares_range(qs, hectares_min, hectares_max) # --- Фільтр по гектарах ---
+    qs = _sort_queryset(qs, sort, direction, company_headers) # --- Сортування ---
+    return qs
+
+
+def filter_companies_queryset(
+    search: str,
+    fast_search: bool,
+    hectares_max: Optional[str],
+    hectares_min: Optional[str],
+    **kwargs,
+) -> QuerySet[Company]:
+    """
+    Компанії, що відповідають пошуку і фільтру списку, без анотацій і сортування —
+    для масових дій над "усіма знайденими".
+    """
+    qs = Company.objects.all()
+    qs = quick_search_companies(qs, search) if fast_search else search_in_queryset(qs, search)
+    return _filter_by_hectares_range(qs, hectares_min, hectares_max)
+
+
 def get_or_create_contact_in_company(contact_form: ContactForm, company: str) -> Tuple[ContactPerson, str]:
     
     contact = None
@@ -238,16 +342,18 @@ def get_index_from_post(key: str, prefix: str, len_qs_list: int) -> int | None:
 
 
 
-def get_companies_with_same_contact(contact_id: int):
+def get_companies_with_same_contact(contact: ContactPerson | int):
     """
     Повертає список компаній, де існує контакт з таким же full_name, 
     як у вказаного контакту, крім контакту з full_name == "Офіс" 
     та окрім поточної компанії за edrpou.
+    Приймає контакт або його id (тоді контакт читається з БД).
     """
-    try:
-        contact = ContactPerson.objects.get(id=contact_id)
-    except (ContactPerson.DoesNotExist):
-        return []
+    if not isinstance(contact, ContactPerson):
+        try:
+            contact = ContactPerson.objects.get(id=contact)
+        except (ContactPerson.DoesNotExist):
+            return []
 
     # Ім'я контактної особи
     name = contact.full_name
@@ -257,9 +363,6 @@ def get_companies_with_same_contact(contact_id: int):
 
     # Усі компанії, де є ці контакти
     companies = Company.objects.filter(contacts__in=matching_contacts).distinct()
-
-    print(matching_contacts)
-    print(companies)
     return list(companies)
 
 
@@ -359,6 +462,10 @@ def search_in_queryset(qs: QuerySet, search: str) -> QuerySet:
     - працює для будь-якого QuerySet
     - шукає по всіх текстових полях (CharField, TextField)
     - включає зв’язки (ForeignKey, OneToOne, ManyToMany) на 1 рівень глибини
+
+    ManyToMany-зв'язки перевіряються окремими підзапитами pk IN (...) — по одному
+    на зв'язок. Спільний JOIN усіх M2M множив рядки (телефони × дзвінки × контакти ...)
+    і потребував DISTINCT, що на великих компаніях робило пошук непридатним.
     """
 
     if not search:
@@ -366,16 +473,17 @@ def search_in_queryset(qs: QuerySet, search: str) -> QuerySet:
 
     model = qs.model
     q = Q()
-    sets = []
-    sets.append(_get_fields_name_from_model(model))
-    sets.append(_get_fields_name_from_model_one_to_one(model))
-    sets.append(_get_fields_name_from_model_m2m(model))
-    sets.append(_get_fields_name_from_model_m2m_reverse(model))
-    fields = set().union(*sets)
-    for field in fields:
+    for field in _get_fields_name_from_model(model) | _get_fields_name_from_model_one_to_one(model):
         q |= Q(**{f"{field}__icontains": search})
-    
-    return qs.filter(q).distinct()
+
+    by_relation: dict[str, Q] = {}
+    for field in _get_fields_name_from_model_m2m(model) | _get_fields_name_from_model_m2m_reverse(model):
+        relation = field.split("__", 1)[0]
+        by_relation[relation] = by_relation.get(relation, Q()) | Q(**{f"{field}__icontains": search})
+    for relation in sorted(by_relation):
+        q |= Q(pk__in=model._default_manager.filter(by_relation[relation]).values("pk"))
+
+    return qs.filter(q)
 
 
 def quick_search_companies(qs, search: Optional[str] = None) -> QuerySet[Company]:
@@ -386,9 +494,19 @@ def quick_search_companies(qs, search: Optional[str] = None) -> QuerySet[Company
     - legal_address
     - hectares (як текст)
 
+    На SQLite з FTS-таблицею (sqlite_profile.py) текстові стовпці шукаються
+    через trigram-індекс, площа — лише якщо запит схожий на число.
+
     :param search: рядок для пошуку
     :return: QuerySet з компаніями
     """
+    fts_ids = sqlite_profile.company_fts_ids(search, qs.db) if search else None
+    if fts_ids is not None:
+        q = Q(pk__in=fts_ids)
+        if search.isdigit():
+            q |= Q(hectares__icontains=search)
+        return qs.filter(q)
+
     qs = qs.filter(
         Q(edrpou__icontains=search) |
         Q(name__icontains=search) |
@@ -1,18 +1,80 @@
-from typing import Dict, Any
+import asyncio
+import hashlib
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from itertools import chain
 
+from asgiref.sync import sync_to_async
+
 from django.shortcuts import render, redirect, get_object_or_404, get_list_or_404
-from django.db.models import Sum, Prefetch
+from django.db import close_old_connections, transaction
+from django.db.models import Count, Max, OuterRef, Prefetch, Subquery, Sum
 from django.views.generic import CreateView, UpdateView
 from django.urls import reverse_lazy, reverse
-from django.http import HttpRequest, HttpResponse
+from django.http import FileResponse, Http404, HttpRequest, HttpResponse, JsonResponse, QueryDict, StreamingHttpResponse
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
+from django.utils import timezone
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import condition
 
 from .models import Company, ContactPerson, Phone, Call, Holding, CallPlan, Warehouse, StockItem
-from .forms import CompanyForm, ContactForm, PhoneForm, HoldingForm, CallForm, PlanCallForm
-from .checkers import check_phone
+from .forms import CompanyForm, ContactForm, PhoneForm, HoldingForm, CallForm, PlanCallForm, CompanyBulkActionForm
+from .bulk_actions import apply_bulk_action
+from .checkers import check_edrpou, check_phone
+from .name_lsh import similar_companies
+from . import changelog, ref_cache
+from .prefix_index import (
+    DEFAULT_LIMIT, MAX_LIMIT, company_index_version, search_companies, search_districts, search_regions,
+)
 from .utils import *
 from .views_utils import *
+from .views_utils import _company_filter_kwargs
+
+
+# -----------------------
+# Умовні GET (ETag/Last-Modified)
+# -----------------------
+def _etag(*parts) -> str:
+    """Слабкий ETag: однакові дані, але сторінка може відрізнятися байтами (CSRF-токен, gzip)."""
+    return 'W/"%s"' % hashlib.md5(":".join(map(str, parts)).encode()).hexdigest()
+
+
+def _company_validators(request: HttpRequest, edrpou: str) -> Tuple[Optional[str], Optional[datetime]]:
+    """
+    (ETag, Last-Modified) сторінки компанії одним запитом за унікальним індексом
+    ЄДРПОУ: Company.updated_at, а для холдингу — найновіший updated_at і кількість
+    його компаній (сумарна площа і склад холдингу). Рахується раз на запит.
+    """
+    known = request.__dict__.setdefault("_company_validators", {})
+    if edrpou not in known:
+        row = next(iter(
+            Company.objects.filter(edrpou=edrpou)
+            .annotate(holding_updated_at=Max("holding__companies__updated_at"), holding_size=Count("holding__companies"))
+            .values_list("updated_at", "holding_updated_at", "holding_size")[:1]
+        ), None)
+        if row is None:
+            known[edrpou] = (None, None)
+        else:
+            updated_at, holding_updated_at, holding_size = row
+            # користувач — у шапці сторінки, довідники (статус, область) — з ref_cache
+            etag = _etag(request.path, updated_at.isoformat(), holding_updated_at, holding_size,
+                         request.user.pk, ref_cache.version())
+            known[edrpou] = (etag, max(updated_at, holding_updated_at or updated_at))
+    return known[edrpou]
+
+
+# Сторінки однієї компанії: незмінна компанія — 304 після одного запиту
+company_condition = condition(
+    etag_func=lambda request, edrpou, **kwargs: _company_validators(request, edrpou)[0],
+    last_modified_func=lambda request, edrpou, **kwargs: _company_validators(request, edrpou)[1],
+)
+
+# JSON автодоповнення: відповідь залежить лише від параметрів і версії індексу
+ref_json_condition = condition(etag_func=lambda request, **kwargs: _etag(
+    request.get_full_path(), ref_cache.version()))
+company_json_condition = condition(etag_func=lambda request, **kwargs: _etag(
+    request.get_full_path(), company_index_version()))
 
 
 def mainpage(request):
@@ -23,12 +85,14 @@ def homepage(request):
     return render(request, "calling_app/home.html")
 
 
+@company_condition
 def company_page(request: HttpRequest, edrpou: str) -> HttpResponse:
     """
     Відображає сторінку компанії з усією інформацією: контакти, телефони, дзвінки,
     склади, товари на складі та інформацію про холдинг.
 
-    Оптимізовано через `prefetch_related` для мінімізації кількості запитів до БД.
+    Кожна секція сторінки — власні запити без N+1 (див. _company_page_sections);
+    під ASGI секції читаються одночасно — company_page_async.
 
     Args:
         request (HttpRequest): HTTP-запит.
@@ -49,116 +113,260 @@ def company_page(request: HttpRequest, edrpou: str) -> HttpResponse:
         planned_calls (QuerySet[Call]): Планові дзвінки компанії.
         warehouses (QuerySet[Warehouse]): Склади компанії.
         stock_items (QuerySet[StockItem]): Товари компанії.
+        similar_companies (list): Можливі дублікати компанії за схожістю назви [(Company, схожість)].
         edit_contact_url (str): Ідентифікатор URL для редагування контакту.
         for_company (bool): Позначка, що контекст для сторінки компанії.
     """
 
-    # Оптимізуємо запити: підвантажуємо контакти, телефони та дзвінки
-    company = get_object_or_404(
-        Company.objects.prefetch_related(
-            Prefetch("contacts__phones__calls"),
-            Prefetch("phones__calls"),
-            "planned_calls",
-            "owned_warehouses",
-            "stock_items",
+    company = _company_for_page(edrpou)
+    sections = {name: section(company) for name, section in _company_page_sections().items()}
+    return _render_company_page(request, company, sections)
+
+
+async def company_page_async(request: HttpRequest, edrpou: str) -> HttpResponse:
+    """
+    Асинхронна версія company_page (ASGI, див. calling_db/asgi.py): незалежні
+    секції сторінки читаються одночасно, кожна у своєму потоці зі своїм
+    з'єднанням з БД, тож затримка ≈ найдовшій секції, а не сумі всіх.
+
+    Async ORM Django тут не допоміг би: усі його запити виконуються
+    послідовно в одному потоці (thread_sensitive).
+    """
+    # condition() викликає etag_func синхронно — ETag рахуємо заздалегідь у потоці
+    await sync_to_async(_company_validators)(request, edrpou)
+    return await _company_page_async(request, edrpou)
+
+
+@company_condition
+async def _company_page_async(request: HttpRequest, edrpou: str) -> HttpResponse:
+    company = await sync_to_async(_company_for_page)(edrpou)
+    names = list(_company_page_sections())
+    results = await asyncio.gather(*(
+        sync_to_async(_in_own_connection(section, company), thread_sensitive=False)()
+        for section in _company_page_sections().values()
+    ))
+    return await sync_to_async(_render_company_page)(request, company, dict(zip(names, results)))
+
+
+def _company_for_page(edrpou: str) -> Company:
+    company = get_object_or_404(Company.objects.select_related("holding"), edrpou=edrpou)
+    # статус, область і район — з кешу довідників, без окремих запитів
+    ref_cache.attach_company_refs(company)
+    return company
+
+
+def _in_own_connection(section: Callable[[Company], Any], company: Company) -> Callable[[], Any]:
+    """Секція в окремому потоці: з'єднання цього потоку закриваються, як після звичайного запиту."""
+    def run():
+        close_old_connections()
+        try:
+            return section(company)
+        finally:
+            close_old_connections()
+    return run
+
+
+def _holding_hectares(company: Company) -> int:
+    if not company.holding_id:
+        return 0
+    return company.holding.companies.aggregate(total=Sum("hectares"))["total"] or 0
+
+
+def _company_phones(company: Company) -> Tuple[List[Phone], Dict[int, Call]]:
+    """Телефони компанії з кількістю дзвінків і останнім дзвінком кожного — анотаціями, без усіх дзвінків."""
+    phones = list(company.phones.annotate(
+        count_calls=Count("calls"),
+        last_call_id=Subquery(
+            Call.objects.filter(phone=OuterRef("pk")).order_by("-datetime", "-pk").values("pk")[:1]
         ),
-        edrpou=edrpou
-    )
+    ).order_by("pk"))
+    last_calls = Call.objects.in_bulk([phone.last_call_id for phone in phones if phone.last_call_id])
+    return phones, last_calls
+
+
+def _company_stock_items(company: Company) -> List[StockItem]:
+    stock_items = list(company.stock_items.all())
+    for item in stock_items:
+        item.crop = ref_cache.crop(item.crop_id) or item.crop
+    return stock_items
+
+
+def _company_page_sections() -> Dict[str, Callable[[Company], Any]]:
+    """Незалежні одна від одної секції сторінки компанії: назва → функція з власними запитами."""
+    return {
+        "holding_hectares": _holding_hectares,
+        "contacts": lambda company: list(company.contacts.all()),
+        "phones": _company_phones,
+        # Останні дзвінки по компанії
+        "calls": lambda company: list(
+            Call.objects.filter(phone__companies=company).select_related("phone").order_by("-datetime")[:5]
+        ),
+        "emails": lambda company: list(company.emails.all()),
+        "planned_calls": lambda company: list(company.planned_calls.all()),
+        "warehouses": lambda company: list(company.owned_warehouses.all()),
+        "stock_items": _company_stock_items,
+        "similar_companies": similar_companies,
+    }
+
 
-    holding = company.holding
-    holding_hectares = 0
-    if holding:
-        holding_hectares = holding.companies.aggregate(total=Sum("hectares"))["total"] or 0
+def _render_company_page(request: HttpRequest, company: Company, sections: Dict[str, Any]) -> HttpResponse:
+    # Обробка POST для кнопок додавання контакту або холдингу
+    if request.method == "POST":
+        if "add_contact" in request.POST:
+            return redirect("add_contact", edrpou=company.edrpou)
+        if "add_holding" in request.POST:
+            return redirect("add_holding", edrpou=company.edrpou)
 
-    contacts = company.contacts.all()
+    phones, last_calls = sections["phones"]
 
-    # Контакти з телефонами
+    def phone_item(phone: Phone) -> dict:
+        return {"phone": phone, "last_call": last_calls.get(phone.last_call_id), "count_calls": phone.count_calls}
+
+    # Контакти з телефонами (телефони контакту, закріплені за цією компанією)
     contact_phones = {
-        contact: [
-            {
-                "phone": phone,
-                "last_call": max(phone.calls.all(), key=lambda c: c.datetime, default=None),
-                "count_calls": phone.calls.count(),
-            }
-            for phone in contact.phones.filter(companies=company)
-        ]
-        for contact in contacts
+        contact: [phone_item(phone) for phone in phones if phone.contact_id == contact.id]
+        for contact in sections["contacts"]
     }
 
     # Телефони, що вже закріплені за контактами
-    phones_in_contacts_ids = [
+    phones_in_contacts_ids = {
         phone_data["phone"].id
-        for phones in contact_phones.values()
-        for phone_data in phones
-    ]
+        for phones_data in contact_phones.values()
+        for phone_data in phones_data
+    }
 
     # Телефони без контакту
-    phones_without_contact_qs = company.phones.exclude(id__in=phones_in_contacts_ids)
-    phones_without_contact = [
-        {
-            "phone": phone,
-            "last_call": max(phone.calls.all(), key=lambda c: c.datetime, default=None),
-            "count_calls": phone.calls.count(),
-        }
-        for phone in phones_without_contact_qs
-    ]
-
-    # Усі дзвінки по компанії (телефони, включаючи prefetch)
-    calls = Call.objects.filter(phone__companies=company).order_by("-datetime")[:5]
-    count_calls = len(calls)
-
-    emails = company.emails.all()
+    phones_without_contact = [phone_item(phone) for phone in phones if phone.id not in phones_in_contacts_ids]
 
+    calls = sections["calls"]
+    planned_calls = sections["planned_calls"]
     context: Dict[str, Any] = {
         "company": company,
-        "holding": holding,
-        "holding_hectares": holding_hectares,
-        "contacts": contacts,
-        "emails": emails,
+        "holding": company.holding,
+        "holding_hectares": sections["holding_hectares"],
+        "contacts": sections["contacts"],
+        "emails": sections["emails"],
         "contact_phones": contact_phones,
         "calls": calls,
-        "count_calls": count_calls,
-        "planned_calls": company.planned_calls.all(),
-        "next_plan": company.planned_calls.filter(status="on").order_by("planned_datetime").first(),
-        "warehouses": company.owned_warehouses.all(),
-        "stock_items": company.stock_items.all(),
+        "count_calls": len(calls),
+        "planned_calls": planned_calls,
+        "next_plan": min(
+            (plan for plan in planned_calls if plan.status == "on"),
+            key=lambda plan: plan.planned_datetime, default=None,
+        ),
+        "warehouses": sections["warehouses"],
+        "stock_items": sections["stock_items"],
         "phones_without_contact": phones_without_contact,
+        "similar_companies": sections["similar_companies"],
         "edit_contact_url": "edit_contact",
         "for_company": True,
     }
-
-    # Обробка POST для кнопок додавання контакту або холдингу
-    if request.method == "POST":
-        if "add_contact" in request.POST:
-            return redirect("add_contact", edrpou=company.edrpou)
-        if "add_holding" in request.POST:
-            return redirect("add_holding", edrpou=company.edrpou)
-
     return render(request, "calling_app/company_page.html", context)
 
 
+@gzip_page
 def companies(request):
     context = get_filtered_sorted_companies_context(request)
+    context["bulk_form"] = CompanyBulkActionForm(initial={"query": request.GET.urlencode()})
     return render(request, "calling_app/companies.html", context)
 
 
-def add_company_to_holding(request, holding_id):
-    context = get_filtered_sorted_companies_context(request)
+def companies_bulk_action(request: HttpRequest) -> HttpResponse:
+    """
+    Масова дія над компаніями списку (POST): вибрані чекбоксами company_ids
+    або всі, що відповідають фільтру списку (select_all). Після дії —
+    повернення до списку з тими ж параметрами фільтра.
+    """
+    if request.method != "POST":
+        return redirect("companies")
+
+    form = CompanyBulkActionForm(request.POST, company_ids=request.POST.getlist("company_ids"))
+    query = request.POST.get("query", "")
+    if not form.is_valid():
+        for errors in form.errors.values():
+            for error in errors:
+                messages.error(request, f"❌ {error}")
+        return redirect(f"{reverse('companies')}?{query}")
+
+    if form.cleaned_data["select_all"]:
+        targets = filter_companies_queryset(**_company_filter_kwargs(QueryDict(query)))
+    else:
+        targets = Company.objects.filter(pk__in=form.company_ids)
+
+    action = form.cleaned_data["action"]
+    count = apply_bulk_action(action, targets, form.cleaned_data)
+    label = dict(CompanyBulkActionForm.ACTION_CHOICES)[action]
+    messages.success(request, f"✅ {label}: {count}")
+    return redirect(f"{reverse('companies')}?{query}")
+
 
+def export_companies_csv(request: HttpRequest) -> StreamingHttpResponse:
+    """
+    Потоковий експорт у CSV списку компаній з тими ж GET-параметрами,
+    що й сторінка companies/ (search, fast_search, hectares_min/max, sort, direction).
+    """
+    response = StreamingHttpResponse(iter_companies_csv(request), content_type="text/csv; charset=utf-8")
+    response["Content-Disposition"] = 'attachment; filename="companies.csv"'
+    return response
+
+
+def _autocomplete_limit(request: HttpRequest) -> int:
+    try:
+        return max(1, min(int(request.GET.get("limit", DEFAULT_LIMIT)), MAX_LIMIT))
+    except ValueError:
+        return DEFAULT_LIMIT
+
+
+@ref_json_condition
+def autocomplete_region(request: HttpRequest) -> JsonResponse:
+    """Автодоповнення областей: ?q=<префікс> -> [{"id", "label"}]."""
+    return JsonResponse(search_regions(request.GET.get("q", ""), _autocomplete_limit(request)), safe=False)
+
+
+@ref_json_condition
+def autocomplete_district(request: HttpRequest) -> JsonResponse:
+    """Автодоповнення районів: ?q=<префікс>&region=<id області> -> [{"id", "label", "region_id"}]."""
+    region = request.GET.get("region")
+    region_id = int(region) if region and region.isdigit() else None
+    return JsonResponse(search_districts(request.GET.get("q", ""), region_id, _autocomplete_limit(request)), safe=False)
+
+
+@company_json_condition
+def autocomplete_company(request: HttpRequest) -> JsonResponse:
+    """Автодоповнення компаній за назвою або ЄДРПОУ: ?q=<префікс> -> [{"id", "edrpou", "label"}]."""
+    return JsonResponse(search_companies(request.GET.get("q", ""), _autocomplete_limit(request)), safe=False)
+
+
+def add_company_to_holding(request: HttpRequest, holding_id: int) -> HttpResponse:
+    """
+    Додає компанії до холдингу. Компанії вибираються typeahead-пікером
+    (/autocomplete/company/), тож сторінка не рендерить весь список компаній.
+    Кілька вибраних компаній (POST selected_company, ЄДРПОУ) приєднуються одним UPDATE.
+    """
     holding = get_object_or_404(Holding, id=holding_id)
-    context["add_company_to_holding"] = True
-    context["holding_id"] = holding_id
-    context["holding"] = holding  
 
     if request.method == "POST":
-        selected_edrpou = request.POST.get("selected_company")
-        if selected_edrpou:
-            company = Company.objects.get(edrpou=selected_edrpou)
-            company.holding = holding
-            company.save()
-            context["msg"] = f"✅ Компанію {company.name} додано до холдингу {holding.name}"
+        edrpous = [check_edrpou(e) for e in request.POST.getlist("selected_company") if e]
+        attached = Company.objects.filter(edrpou__in=edrpous)
+        # update() не надсилає сигналів: журнал змін і кеш списку компаній — тут, в одній транзакції
+        with transaction.atomic():
+            changelog.record_queryset(attached, "update", {"holding_id": holding.pk})
+            updated = attached.update(holding=holding, updated_at=timezone.now())
+            invalidate_companies_cache()
+        if updated:
+            messages.success(request, f"✅ До холдингу {holding.name} додано компаній: {updated}")
+        else:
+            messages.warning(request, "Не вибрано жодної компанії")
+        return redirect("add_company_to_holding", holding_id=holding_id)
 
-    return render(request, "calling_app/companies.html", context)
+    # holding_id — у only(): related manager проставляє company.holding і інакше довантажував би поле по рядку
+    companies = holding.companies.only("edrpou", "name", "hectares", "holding").order_by("name")
+    context = {
+        "holding": holding,
+        "companies": companies,
+        "holding_hectares": companies.aggregate(total=Sum("hectares"))["total"] or 0,
+    }
+    return render(request, "calling_app/add_company_to_holding.html", context)
 
 
 class CompanyCreate(CreateView):
@@ -166,10 +374,6 @@ class CompanyCreate(CreateView):
     form_class = CompanyForm
     template_name = 'calling_app/create_company.html'
     success_url = reverse_lazy('companies')  # змінити на свій URL
-    def post(self, request, *args, **kwargs):
-        # Тут request доступний
-        print("POST data:", request.POST)
-        return super().post(request, *args, **kwargs)
     def get_success_url(self):
         # self.object — це щойно створений об'єкт
         return reverse('company_page', kwargs={'edrpou': self.object.edrpou})
@@ -191,10 +395,6 @@ class ContactCreate(CreateView):
     model = ContactPerson
     form_class = ContactForm
     template_name = 'calling_app/edit_contact.html'
-    def post(self, request, *args, **kwargs):
-        # Тут request доступний
-        print("POST data:", request.POST)
-        return super().post(request, *args, **kwargs)
     def get_success_url(self):
         # self.object — це щойно створений об'єкт
         return reverse('companies')
@@ -233,27 +433,25 @@ def add_contact(request: HttpRequest, edrpou: str) -> HttpResponse:
 def edit_contact(request, edrpou, id_contact=1):
     company, contact = get_company_contact(edrpou, id_contact)
 
-    phones_qs = list(Phone.objects.filter(contact=contact, companies=company))  # Існуючі телефони цього контакту та компанії
+    phones = list(Phone.objects.filter(contact=contact, companies=company).prefetch_related("calls"))  # Існуючі телефони цього контакту та компанії
+    phones_qs = list(phones)
     phones_qs.append(Phone(number=None, status="on", contact=contact)) # додаємо пустий телефон для пустої форми до списку
 
     co_form = ContactForm(instance=contact, prefix="contact")
     ph_forms = [PhoneForm(instance=phone, prefix=f"phone-{i}") for i, phone in enumerate(phones_qs)]
 
-    contact_companies = get_companies_with_same_contact(id_contact)
+    contact_companies = get_companies_with_same_contact(contact)
     message = None
 
     if request.method == "POST":
-        print("POST")
         co_form = ContactForm(request.POST, instance=contact, prefix="contact")
         pressed_update_ph = next((k for k in request.POST if k.startswith("update_phone_")), None)
         pressed_dell_ph = next((k for k in request.POST if k.startswith("dell_phone_from_contact_")), None)
-        print(pressed_dell_ph)
 
         len_phone_qs = len(phones_qs)
         
         pressed_update_index = get_index_from_post(pressed_update_ph, "update_phone_", len_phone_qs)
         pressed_dell_index = get_index_from_post(pressed_dell_ph, "dell_phone_from_contact_", len_phone_qs)
-        print(pressed_dell_index)
 
 
         if "save_contact" in request.POST:
@@ -288,7 +486,6 @@ def edit_contact(request, edrpou, id_contact=1):
 
         return redirect(request.path)
 
-    phones = Phone.objects.filter(contact=contact, companies=company).prefetch_related("calls")
     calls = [call for phone in phones for call in phone.calls.all()]
     messages.info(request, message)
 
@@ -458,7 +655,7 @@ def add_call(request, edrpou, id_phone):
 
 
 def edit_call(request, id_call):
-    call = get_object_or_404(Call, id=id_call)
+    call = get_object_or_404(Call.objects.select_related("phone"), id=id_call)
     phone = call.phone
     company_list = list(call.company.all())
 
@@ -473,24 +670,28 @@ def edit_call(request, id_call):
     else:
         form = CallForm(instance=call, company=None, phone=None)
 
+    calls = list(phone.calls.order_by("-datetime"))
     context = {
         "form": form,
         "call": call,
         "phone": phone,
         "company": company_list[0] if company_list else None,  # перша компанія
         "related_companies": call.company.exclude(phones__number="+380000000000"),
-        "calls": list(phone.calls.order_by("-datetime")),
-        "count_calls": phone.calls.count(),
+        "calls": calls,
+        "count_calls": len(calls),
         "for_phone": True,
     }
     return render(request, "calling_app/call.html", context)
 
 
+@gzip_page
+@company_condition
 def calls_of_company(request: HttpRequest, edrpou: str) -> HttpResponse:
     """
     Відображає всі дзвінки конкретної компанії.
     """
     company = get_object_or_404(Company, edrpou=edrpou)
+    ref_cache.attach_company_refs(company)
     next_plan = company.planned_calls.filter(status="on").order_by("planned_datetime").first()
 
     # Всі дзвінки компанії (по всіх телефонах ManyToMany)
@@ -518,7 +719,7 @@ def add_plan_call(request, edrpou, id_phone=None, id_call=None):
     if id_phone:
         phone = get_object_or_404(Phone, id=id_phone)
     if id_call:
-        call = get_object_or_404(Call, id=id_call)
+        call = get_object_or_404(Call.objects.select_related("phone"), id=id_call)
         phone = call.phone  # щоб мати консистентність
 
     if request.method == "POST":
@@ -545,7 +746,7 @@ def add_plan_call(request, edrpou, id_phone=None, id_call=None):
 
 
 def edit_plan_call(request, id_plan_call):
-    plan_call = get_object_or_404(CallPlan, id=id_plan_call)
+    plan_call = get_object_or_404(CallPlan.objects.select_related("company", "phone", "call"), id=id_plan_call)
     company = plan_call.company
     phone = plan_call.phone
     call = plan_call.call
@@ -569,30 +770,32 @@ def edit_plan_call(request, id_plan_call):
     })
 
 
+def _company_link(c: Company) -> dict:
+    return {"edrpou": c.edrpou, "name": c.name, "hectares": c.hectares, "address": c.legal_address}
+
+
+@gzip_page
+@company_condition
 def show_all_company_links(request, edrpou: str):
-    company = get_object_or_404(Company, edrpou=edrpou)
+    # пов'язані компанії телефонів, контактів і email — одним prefetch на зв'язок, без запиту на кожен запис
+    company = get_object_or_404(
+        Company.objects.select_related("holding").prefetch_related(
+            Prefetch("phones", queryset=Phone.objects.exclude(number="+380000000000").prefetch_related("companies")),
+            "contacts__companies",
+            "emails__companies",
+        ),
+        edrpou=edrpou,
+    )
 
     # Холдинг
     holding_links = []
     if company.holding:
-        for c in company.holding.companies.exclude(id=company.id):
-            holding_links.append({
-                "edrpou": c.edrpou,
-                "name": c.name,
-                "hectares": c.hectares,
-                "address": c.legal_address
-            })
+        holding_links = [_company_link(c) for c in company.holding.companies.exclude(id=company.id)]
 
     # Зв'язки по номерах телефонів (крім конкретного номера)
     phone_links = []
-    for phone in company.phones.exclude(number="+380000000000"):
-        linked_companies = phone.companies.exclude(id=company.id)
-        linked_data = [{
-            "edrpou": c.edrpou,
-            "name": c.name,
-            "hectares": c.hectares,
-            "address": c.legal_address
-        } for c in linked_companies]
+    for phone in company.phones.all():
+        linked_data = [_company_link(c) for c in phone.companies.all() if c.id != company.id]
         if linked_data:
             phone_links.append({
                 "number": phone.number,
@@ -603,13 +806,7 @@ def show_all_company_links(request, edrpou: str):
     contact_links = []
     for contact in company.contacts.all():
         if len(contact.full_name.split()) >= 3:
-            linked_companies = contact.companies.exclude(id=company.id)
-            linked_data = [{
-                "edrpou": c.edrpou,
-                "name": c.name,
-                "hectares": c.hectares,
-                "address": c.legal_address
-            } for c in linked_companies]
+            linked_data = [_company_link(c) for c in contact.companies.all() if c.id != company.id]
             if linked_data:
                 contact_links.append({
                     "full_name": contact.full_name,
@@ -617,13 +814,13 @@ def show_all_company_links(request, edrpou: str):
                 })
 
     # Зв'язки по адресі
-    address_links = Company.objects.filter(legal_address=company.legal_address).exclude(id=company.id) if company.legal_address else []
+    address_links = list(Company.objects.filter(legal_address=company.legal_address).exclude(id=company.id)) if company.legal_address else []
 
     # Зв'язки по email
     email_links = []
     for email in company.emails.all():
-        linked_companies = email.companies.exclude(id=company.id)
-        if linked_companies.exists():
+        linked_companies = [c for c in email.companies.all() if c.id != company.id]
+        if linked_companies:
             email_links.append({
                 "email": email.email,
                 "companies": linked_companies
@@ -684,3 +881,82 @@ def show_all_company_links(request, edrpou: str):
 
 
 
+
+
+@staff_member_required
+def sql_report(request: HttpRequest) -> HttpResponse:
+    """
+    Останні звіти QueryInstrumentationMiddleware (новіші першими).
+    ?slow=1 — лише повільні запити або з підозрою на N+1.
+    """
+    from django.conf import settings
+    from .middleware import RECENT_REPORTS
+
+    reports = list(reversed(RECENT_REPORTS))
+    if request.GET.get("slow"):
+        reports = [r for r in reports if r["slow"] or r["duplicates"]]
+    context = {
+        "reports": reports,
+        "enabled": getattr(settings, "SQL_INSTRUMENTATION", False),
+    }
+    return render(request, "calling_app/sql_report.html", context)
+
+
+@staff_member_required
+def profiles(request: HttpRequest) -> HttpResponse:
+    """Збережені профілі ProfilerMiddleware (новіші першими); ?id= — повний звіт одного профілю."""
+    from .middleware import PROFILE_PARAM, recent_profiles
+
+    reports = recent_profiles()
+    selected = next((r for r in reports if r["id"] == request.GET.get("id")), None)
+    context = {
+        "reports": reports,
+        "selected": selected,
+        "profile_param": PROFILE_PARAM,
+    }
+    return render(request, "calling_app/profiles.html", context)
+
+
+@staff_member_required
+def profile_download(request: HttpRequest, profile_id: str) -> FileResponse:
+    """Сирий .prof для pstats / snakeviz."""
+    from .middleware import profile_file
+
+    path = profile_file(profile_id)
+    if path is None:
+        raise Http404("Профіль не знайдено")
+    return FileResponse(open(path, "rb"), as_attachment=True, filename=path.name)
+
+
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    """
+    Метрики в текстовому форматі Prometheus.
+    Доступ — staff або заголовок Authorization: Bearer <settings.METRICS_TOKEN>.
+    """
+    from django.conf import settings
+    from . import metrics
+
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if not request.user.is_staff and not (token and request.headers.get("Authorization") == f"Bearer {token}"):
+        return HttpResponse(status=403)
+    body = metrics.render(metrics.collect(), metrics.table_rows())
+    return HttpResponse(body, content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def changes_feed(request: HttpRequest) -> JsonResponse:
+    """
+    Журнал змін після курсора: ?since=<номер останнього прочитаного запису>&limit=<N>.
+    Доступ — staff або заголовок Authorization: Bearer <settings.CHANGES_TOKEN>.
+    """
+    from django.conf import settings
+
+    token = getattr(settings, "CHANGES_TOKEN", "")
+    if not request.user.is_staff and not (token and request.headers.get("Authorization") == f"Bearer {token}"):
+        return JsonResponse({"error": "forbidden"}, status=403)
+    try:
+        since = int(request.GET.get("since", 0))
+        limit = int(request.GET.get("limit", changelog.DEFAULT_LIMIT))
+    except ValueError:
+        return JsonResponse({"error": "since і limit мають бути цілими числами"}, status=400)
+    changes, next_since, has_more = changelog.changes_since(since, limit)
+    return JsonResponse({"changes": changes, "next": next_since, "has_more": has_more})
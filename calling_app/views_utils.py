@@ -1,5 +1,8 @@
-from .utils import get_filtered_sorted_companies, get_company_by_edrpou, get_company_calls_by_edrpou
+from .utils import (get_filtered_sorted_companies, get_company_by_edrpou, get_company_calls_by_edrpou,
+                    build_companies_queryset)
 from django.core.paginator import Paginator
+from django.utils import timezone
+import csv
 
 from django.db.models import Sum
 from .models import ContactPerson, Company, Holding
@@ -22,33 +25,27 @@ _company_context_columns = [
 _company_headers = [col["field"] for col in _company_context_columns]
 
 
-import time
+def _company_filter_kwargs(params) -> dict:
+    """
+    Параметри пошуку/фільтра/сортування списку компаній з QueryDict (request.GET).
+    """
+    return {
+        "search": params.get("search", "").strip(),
+        "fast_search": params.get("fast_search"),
+        "hectares_max": params.get("hectares_max"),
+        "hectares_min": params.get("hectares_min"),
+        "sort": params.get("sort", "edrpou"),
+        "direction": params.get("direction", "asc"),
+    }
+
 
 def get_filtered_sorted_companies_context(request):
-    timers = {}
-
-    # 1️⃣ get_filtered_sorted_companies
-    start = time.time()
-    qs, qs_list = get_filtered_sorted_companies(
-        _company_headers,
-        search=request.GET.get("search", "").strip(),
-        fast_search = request.GET.get("fast_search"),
-        hectares_max=request.GET.get("hectares_max"),
-        hectares_min=request.GET.get("hectares_min"),
-        sort=request.GET.get("sort", "edrpou"),
-        direction=request.GET.get("direction", "asc"),
-    )
-    timers['get_filtered_sorted_companies'] = time.time() - start
-
-
-    # 3️⃣ Paginator
-    start = time.time()
+    qs, qs_list = get_filtered_sorted_companies(_company_headers, **_company_filter_kwargs(request.GET))
+
     paginator = Paginator(qs_list, int(request.GET.get("per_page", 20)))
     page_obj = paginator.get_page(request.GET.get("page"))
-    timers['Paginator.get_page'] = time.time() - start
 
-    # 4️⃣ Формування querystring
-    start = time.time()
+    # Формування querystring
     sort_params = request.GET.copy()
     sort_params.pop("sort", None)
     sort_params.pop("direction", None)
@@ -62,16 +59,10 @@ def get_filtered_sorted_companies_context(request):
     if "show_calls" in show_calls_params:
         del show_calls_params["show_calls"]
     show_calls_querystring = show_calls_params.urlencode()
-    timers['querystring_processing'] = time.time() - start
 
-    # 5️⃣ get_company_by_edrpou і get_company_calls_by_edrpou
-    start = time.time()
     selected_company = get_company_by_edrpou(request.GET.get("show_calls"), qs)
     calls = get_company_calls_by_edrpou(request.GET.get("show_calls"), qs)
-    timers['company_calls_lookup'] = time.time() - start
 
-    # 6️⃣ Формування контексту
-    start = time.time()
     context = {
         "companies": page_obj,
         "per_page": int(request.GET.get("per_page", 20)),
@@ -88,14 +79,37 @@ def get_filtered_sorted_companies_context(request):
         "selected_company": selected_company,
         "calls": calls,
     }
-    timers['context_build'] = time.time() - start
+    return context
 
-    # 7️⃣ Друк таймерів
-    print("=== Timers (seconds) ===")
-    for k, v in timers.items():
-        print(f"{k}: {v:.4f}")
 
-    return context
+class _Echo:
+    """Псевдо-буфер для csv.writer: повертає рядок замість запису."""
+    def write(self, value):
+        return value
+
+
+def iter_companies_csv(request, chunk_size: int = 2000):
+    """
+    Генерує CSV-рядки відфільтрованого списку компаній з тими ж параметрами,
+    що й сторінка companies/. Дані читаються через values_list().iterator(),
+    тому весь результат не тримається в пам'яті.
+    """
+    qs = build_companies_queryset(_company_headers, **_company_filter_kwargs(request.GET))
+    writer = csv.writer(_Echo())
+
+    yield "\ufeff"  # BOM, щоб Excel правильно відкрив UTF-8
+    yield writer.writerow([col["label"] for col in _company_context_columns])
+
+    for row in qs.values_list(*_company_headers).iterator(chunk_size=chunk_size):
+        yield writer.writerow([_format_csv_value(value) for value in row])
+
+
+def _format_csv_value(value):
+    if value is None:
+        return ""
+    if hasattr(value, "tzinfo"):
+        return timezone.localtime(value).strftime("%d.%m.%Y %H:%M")
+    return value
 
 
 def get_or_create_holding_company(request, edrpou):
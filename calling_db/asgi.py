@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'calling_db.settings')
+# під ASGI сторінка компанії читає свої секції паралельно (views.company_page_async)
+os.environ.setdefault('ASYNC_COMPANY_PAGE', '1')
 
 application = get_asgi_application()
@@ -44,11 +44,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'calling_app.middleware.MetricsMiddleware',   # першим — щоб бачити запити всіх інших
+    'calling_app.middleware.QueryInstrumentationMiddleware',
+    'calling_app.db_router.ReplicaRoutingMiddleware',   # до сесій — щоб бачити і їхні записи
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'calling_app.middleware.ProfilerMiddleware',   # після auth — профілює лише staff
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -89,6 +93,75 @@ DATABASES = {
         'PORT': os.getenv('DB_PORT'),
     }
 }
+
+# Профіль SQLite для невеликих філій: DB_ENGINE=sqlite (файл — DB_NAME або db.sqlite3).
+# PRAGMA (WAL, synchronous=NORMAL, mmap, кеш, busy_timeout) ставить calling_app/sqlite_profile.py
+# на кожне з'єднання; SQLITE_PRAGMAS = {} — звичайний SQLite.
+if os.getenv('DB_ENGINE') == 'sqlite':
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.getenv('DB_NAME') or BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            'timeout': 20,
+            # BEGIN IMMEDIATE: запис бере блокування одразу, без deadlock при "апгрейді" читання в WAL
+            'transaction_mode': 'IMMEDIATE',
+        },
+    }
+    # Друга база з власними даними (без TEST MIRROR) — для тестів маршрутизатора реплік і copy_db;
+    # у роботі не використовується, поки її не вказати в DATABASE_REPLICAS чи copy_db --source/--target
+    DATABASES['secondary'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.getenv('DB_SECONDARY_NAME') or BASE_DIR / 'secondary.sqlite3',
+    }
+
+# Репліки для читання (calling_app/db_router.py): DB_REPLICA_HOSTS=host1,host2,
+# решта параметрів — як у default (або DB_REPLICA_USER/DB_REPLICA_PASSWORD)
+DATABASE_REPLICAS = []
+for _i, _host in enumerate(filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(','))):
+    _alias = f'replica{_i + 1}'
+    DATABASES[_alias] = {
+        **DATABASES['default'],
+        'HOST': _host.strip(),
+        'USER': os.getenv('DB_REPLICA_USER', DATABASES['default']['USER']),
+        'PASSWORD': os.getenv('DB_REPLICA_PASSWORD', DATABASES['default']['PASSWORD']),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(_alias)
+
+DATABASE_ROUTERS = ['calling_app.db_router.ReplicaRouter']
+
+# Спільний кеш процесів. У ньому лише номери версій (ref_cache, prefix_index, список компаній):
+# зміна в одному воркері має бути видна всім іншим. CACHE_BACKEND:
+#   file      — тека CACHE_LOCATION (за замовчуванням .cache/), спільна для процесів одного сервера;
+#   redis     — CACHE_LOCATION=redis://host:6379/1 (кілька серверів);
+#   memcached — CACHE_LOCATION=host:11211 (кілька серверів, потрібен pymemcache);
+#   locmem    — пам'ять процесу: ЛИШЕ для одного процесу (runserver), інвалідація між воркерами не працює.
+_CACHE_BACKENDS = {
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', str(BASE_DIR / '.cache')),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379/1'),
+    'memcached': ('django.core.cache.backends.memcached.PyMemcacheCache', '127.0.0.1:11211'),
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'calling_app'),
+}
+_cache_backend, _cache_location = _CACHE_BACKENDS[os.getenv('CACHE_BACKEND', 'file')]
+CACHES = {
+    'default': {
+        'BACKEND': _cache_backend,
+        'LOCATION': os.getenv('CACHE_LOCATION') or _cache_location,
+    }
+}
+
+# View, що лише читають і можуть іти на репліку (GET/HEAD)
+READ_REPLICA_VIEWS = [
+    'main', 'home', 'companies', 'export_companies', 'company_page', 'calls_of_company',
+    'show_all_company_links', 'autocomplete_company', 'metrics',
+]
+REPLICA_PIN_SECONDS = 5   # скільки після запису читати з primary (запас на відставання репліки)
+
+# Асинхронна сторінка компанії з паралельними секціями; calling_db/asgi.py вмикає її за замовчуванням.
+# Не для SQLite: локальні запити коротші за відкриття з'єднання в окремому потоці.
+ASYNC_COMPANY_PAGE = (
+    os.getenv('ASYNC_COMPANY_PAGE') == '1' and DATABASES['default']['ENGINE'] != 'django.db.backends.sqlite3'
+)
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -137,3 +210,34 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 LOGIN_REDIRECT_URL = "home"   # або 'main'
 LOGOUT_REDIRECT_URL = "login"
 LOGIN_URL = "login"
+
+# Інструментування SQL по запитах (calling_app/middleware.py), сторінка /sql-report/
+SQL_INSTRUMENTATION = os.getenv('SQL_INSTRUMENTATION', '0') == '1'
+SQL_SLOW_REQUEST_MS = int(os.getenv('SQL_SLOW_REQUEST_MS', '500'))
+SQL_DUPLICATE_THRESHOLD = 5   # стільки однакових запитів за запит — підозра на N+1
+SQL_INSTRUMENTATION_KEEP = 200
+
+# Профайлер на вимогу для staff (?_profile=1 або X-Profile: 1), сторінка /profiles/
+PROFILER_ENABLED = os.getenv('PROFILER_ENABLED', '1') == '1'
+PROFILE_DIR = Path(os.getenv('PROFILE_DIR', BASE_DIR / 'profiles'))
+
+# Метрики Prometheus (/metrics). METRICS_DIR — спільна тека для кількох воркерів
+# (gunicorn/uvicorn з кількома процесами); без неї кожен процес віддає лише свої.
+# Доступ — staff або Authorization: Bearer <METRICS_TOKEN> (для Prometheus задайте токен).
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1') == '1'
+METRICS_DIR = os.getenv('METRICS_DIR') or None
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Журнал змін (/changes/?since=N, manage.py changes) для інкрементальної синхронізації
+CHANGES_TOKEN = os.getenv('CHANGES_TOKEN', '')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'calling_app.sql': {'handlers': ['console'], 'level': 'WARNING', 'propagate': False},
+    },
+}
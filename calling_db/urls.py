@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path
 from django.contrib.auth import views as auth_views
@@ -18,13 +19,29 @@ urlpatterns = [
 
     # Компанії
     path("companies/", login_required(views.companies), name="companies"),  
-    path("company/<str:edrpou>/", login_required(views.company_page), name="company_page"),
+    path("companies/bulk/", login_required(views.companies_bulk_action), name="companies_bulk_action"),
+    path("companies/export/", login_required(views.export_companies_csv), name="export_companies"),
+    path("company/<str:edrpou>/",
+         login_required(views.company_page_async if settings.ASYNC_COMPANY_PAGE else views.company_page),
+         name="company_page"),
     path("create-company/", login_required(views.CompanyCreate.as_view()), name="create_company"),
     path("update-company/<str:edrpou>/", login_required(views.CompanyUpdate.as_view()), name="update_company"),
     path("create-contact/", login_required(views.ContactCreate.as_view()), name="create_contact"),
 
     path("add_company_to_holding/<int:holding_id>/", login_required(views.add_company_to_holding), name="add_company_to_holding"),  
 
+    # Діагностика (лише staff)
+    path("sql-report/", views.sql_report, name="sql_report"),
+    path("metrics", views.metrics_view, name="metrics"),
+    path("changes/", views.changes_feed, name="changes"),
+    path("profiles/", views.profiles, name="profiles"),
+    path("profiles/<str:profile_id>.prof", views.profile_download, name="profile_download"),
+
+    # Автодоповнення
+    path("autocomplete/region/", login_required(views.autocomplete_region), name="autocomplete_region"),
+    path("autocomplete/district/", login_required(views.autocomplete_district), name="autocomplete_district"),
+    path("autocomplete/company/", login_required(views.autocomplete_company), name="autocomplete_company"),
+
     # Компанія (деталі)
     path("company/add_contact/<str:edrpou>/", login_required(views.add_contact), name="add_contact"),
     path("company/edit_contact/<str:edrpou>/<int:id_contact>/", login_required(views.edit_contact), name="edit_contact"),
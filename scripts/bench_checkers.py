@@ -0,0 +1,114 @@
+"""
+Мікробенчмарк нормалізації: рядків/с для старої поштучної реалізації
+checkers (регулярка на кожен виклик, попередження на кожне погане значення)
+та нових пакетних функцій check_phones/check_edrpous/check_persons/check_emails.
+
+Запуск:
+    python scripts/bench_checkers.py --rows 200000
+"""
+import argparse
+import logging
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calling_app import checkers  # noqa: E402
+
+
+# ------------------------------
+# Стара реалізація (до оптимізації), для порівняння
+# ------------------------------
+def legacy_check_phone(phone_number):
+    if not phone_number:
+        return None
+    phone_number = re.sub(r'\D', '', str(phone_number))
+    prefixes = {9: "+380", 10: "+38", 11: "+3", 12: "+"}
+    if len(phone_number) in prefixes:
+        return prefixes[len(phone_number)] + phone_number
+    logging.warning(f"Некоректний номер {phone_number}")
+    return None
+
+
+def legacy_check_edrpou(edrpou):
+    if not edrpou:
+        return "00000000"
+    edrpou = re.sub(r'\D', '', str(edrpou))
+    if len(edrpou) > 8:
+        logging.warning(f"EDRPOU {edrpou} перевищує 8 символів, буде замінено на '00000000'")
+        return "00000000"
+    return edrpou.zfill(8)
+
+
+def legacy_check_person(name):
+    if not name or not str(name).strip():
+        return "Невідома"
+    name = str(name).strip()
+    if name.lower() in ["аа", "н/д", "none"]:
+        name = "Офіс"
+    name = re.sub(r"[^\w\s’'іІїЇєЄґҐа-яА-Я\-]", "", name, flags=re.UNICODE)
+    name = name.replace("’", "'").replace("`", "'")
+    name = " ".join(name.split())
+    return " ".join(word.capitalize() for word in name.lower().split())
+
+
+def legacy_is_valid_email(email):
+    if not email:
+        return False
+    email = email.strip()
+    if re.match(r'^[\w\.-]+@[\w\.-]+\.\w+$', email):
+        return email.lower()
+    return False
+
+
+def make_rows(n, seed=42):
+    rng = random.Random(seed)
+    surnames = ["Іваненко", "Петренко", "Коваль", "Шевчук", "Бондар", "Ткаченко", "Мельник"]
+    # ~10% унікальних значень, як у реальних вибірках зі спільними телефонами/контактами
+    pool = max(1, n // 10)
+    phones = [f"0{rng.randint(500000000, 999999999)}" for _ in range(pool)] + ["12", "abc"]
+    edrpous = [str(rng.randint(1, 99999999)) for _ in range(pool)] + ["123456789"]
+    names = [f"{rng.choice(surnames)} {rng.choice(surnames)[0]}. ’ivan" for _ in range(pool)] + ["аа"]
+    emails = [f"user{i}@agro.ua" for i in range(pool)] + ["bad@"]
+    return (
+        [rng.choice(phones) for _ in range(n)],
+        [rng.choice(edrpous) for _ in range(n)],
+        [rng.choice(names) for _ in range(n)],
+        [rng.choice(emails) for _ in range(n)],
+    )
+
+
+def bench(label, fn, n):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {n / elapsed:>14,.0f} рядків/с")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200000)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)  # не міряємо вивід у консоль
+    phones, edrpous, names, emails = make_rows(args.rows)
+    n = args.rows
+
+    print("До (поштучно):")
+    bench("  check_phone", lambda: [legacy_check_phone(v) for v in phones], n)
+    bench("  check_edrpou", lambda: [legacy_check_edrpou(v) for v in edrpous], n)
+    bench("  check_person", lambda: [legacy_check_person(v) for v in names], n)
+    bench("  is_valid_email", lambda: [legacy_is_valid_email(v) for v in emails], n)
+
+    print("Після (пакетно, з кешем):")
+    bench("  check_phones", lambda: checkers.check_phones(phones), n)
+    bench("  check_edrpous", lambda: checkers.check_edrpous(edrpous), n)
+    bench("  check_persons", lambda: checkers.check_persons(names), n)
+    bench("  check_emails", lambda: checkers.check_emails(emails), n)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,11 @@ sqlite3 db.sqlite3 .dump > dump.sql
 Запустити цей скрипт.
 
 Для MySQL виконати команду:
-cmd /c "mysql -u root -p --default-character-set=utf8mb4 call_db < dump_mysql_clean.sql" """
+cmd /c "mysql -u root -p --default-character-set=utf8mb4 call_db < dump_mysql_clean.sql"
+
+Швидший шлях без дампу (обидві БД описані в settings.DATABASES):
+python manage.py migrate --database=<ціль>
+python manage.py copy_db --source=<джерело> --target=<ціль> --truncate """
 
 import re
 import hashlib
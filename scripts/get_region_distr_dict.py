@@ -1,54 +1,46 @@
+"""
+Будує regions_districts.json зі старої БД old_db.sqlite3 (таблиця companies.address).
+
+Розбір іде через calling_app.address_parser: адреси читаються порціями,
+розбираються в пулі процесів, а замість друку кожної нерозпізнаної адреси
+виводиться зведений звіт по категоріях.
+
+Для будь-якого аліасу з settings.DATABASES є команда:
+    python manage.py build_gazetteer --database=<аліас> --table=companies --column=address
+"""
 import sqlite3
-import re
-import json
-from collections import defaultdict
 import os
+import sys
 
 # Отримати шлях до директорії скрипта
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-print(BASE_DIR)
-
-
-old_db = os.path.join(BASE_DIR, "old_db.sqlite3")
-
-# Підключення до БД
-conn = sqlite3.connect(old_db)
-cursor = conn.cursor()
-
-# Вибірка адрес з таблиці
-cursor.execute("SELECT address FROM companies")
-rows = cursor.fetchall()
-
-# Регулярки для пошуку
-region_pattern = re.compile(r"(\w+)\s*обл")
-district_pattern = re.compile(r"(\w+)\s*р-н")
-
-result = defaultdict(set)
+sys.path.append(BASE_DIR)
 
-for row in rows:
-    addr = row[0]
+from calling_app.address_parser import build_gazetteer, format_report, write_gazetteer  # noqa: E402
 
-    # пропускаємо None або пусті рядки
-    if not addr:
-        continue
+CHUNK_SIZE = 5000
 
-    region_match = region_pattern.search(addr)
-    district_match = district_pattern.search(addr)
 
-    if region_match and district_match:
-        region = region_match.group(1)
-        district = district_match.group(1)
-        result[region].add(district)
-    else:
-        # для відладки: показати що не вдалося розпарсити
-        print("⚠️ Не вдалося розпізнати адресу:", addr)
+def iter_old_addresses(db_path, chunk_size=CHUNK_SIZE):
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT address FROM companies")
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield [row[0] for row in rows]
+    finally:
+        conn.close()
 
-# перетворюємо множини на списки
-final_result = {k: sorted(list(v)) for k, v in result.items()}
 
-# Збереження у JSON
-with open("regions_districts.json", "w", encoding="utf-8") as f:
-    json.dump(final_result, f, ensure_ascii=False, indent=4)
+if __name__ == "__main__":
+    old_db = os.path.join(BASE_DIR, "old_db.sqlite3")
 
-print("✅ Дані збережено у regions_districts.json")
+    gazetteer, categories, samples = build_gazetteer(iter_old_addresses(old_db))
+    write_gazetteer(gazetteer, "regions_districts.json", counts_path="regions_districts_counts.json")
 
+    for line in format_report(categories, samples):
+        print(line)
+    print("✅ Дані збережено у regions_districts.json")